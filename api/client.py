@@ -1,19 +1,56 @@
+import asyncio
 import logging
 import aiohttp
-import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, AsyncIterator, Iterable, NamedTuple, Optional, List
 from datetime import datetime
 
-from config.config import API_BASE_URL, API_TOKEN, API_TIMEOUT
+from config.config import (
+    API_BASE_URL,
+    API_TOKEN,
+    API_TIMEOUT,
+    API_VALIDATOR_CACHE_SIZE,
+    API_VALIDATOR_TTL,
+    API_BATCH_SIZE,
+    API_BATCH_CONCURRENCY,
+    TEAM_CACHE_TTL,
+    TEAM_CACHE_SIZE,
+    MATCHES_PAGE_SIZE
+)
+from utils.phone import phone_digits
+from api.conditional import ValidatorStore
+from api.codec import dumps, loads
+from api.models import Match, Team
+from utils.cache import TTLCache
+from utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Ответы GET-запросов с ETag / Last-Modified для условных запросов
+response_validators = ValidatorStore(maxsize=API_VALIDATOR_CACHE_SIZE, ttl=API_VALIDATOR_TTL)
+
+# Команды, полученные get_teams_details: ID команды -> команда
+team_cache = TTLCache(maxsize=TEAM_CACHE_SIZE, ttl=TEAM_CACHE_TTL)
+
+# Одновременные запросы одной команды выполняются одним запросом к API
+_team_requests = SingleFlight()
+
+
+class TeamsDetails(NamedTuple):
+    """
+    Результат пакетного получения команд
+    """
+    teams: Dict[int, Team]    # Полученные команды по ID
+    errors: Dict[int, str]    # Ошибки по ID команд, которые получить не удалось
+
 
 class ApiClient:
     """
     Клиент для взаимодействия с API основного приложения
     """
 
+    # Поддерживает ли API пакетное получение команд (None — еще неизвестно)
+    teams_batch_supported: Optional[bool] = None
+
     def __init__(self):
         self.base_url = API_BASE_URL
         self.headers = {
@@ -22,7 +59,14 @@ class ApiClient:
         }
         self.timeout = aiohttp.ClientTimeout(total=API_TIMEOUT)
 
-    async def _make_request(self, method: str, endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def _make_request(
+            self,
+            method: str,
+            endpoint: str,
+            data: Dict[str, Any] = None,
+            conditional: bool = True,
+            idempotency_key: str = None
+    ) -> Dict[str, Any]:
         """
         Выполнение HTTP запроса к API
 
@@ -30,9 +74,13 @@ class ApiClient:
             method: HTTP метод (GET, POST, PUT, DELETE)
             endpoint: Конечная точка API
             data: Данные для отправки (опционально)
+            conditional: Использовать условный GET-запрос и сохранять ответ для следующих запросов
+            idempotency_key: Ключ идемпотентности POST-запроса: повтор с тем же ключом
+                не выполняет действие второй раз (опционально)
 
         Returns:
-            Ответ от API в виде словаря
+            Ответ от API в виде словаря. Ответ на GET-запрос, полученный
+            из хранилища условных запросов, общий для всех вызовов и не должен изменяться
 
         Raises:
             Exception: Если произошла ошибка при выполнении запроса
@@ -40,22 +88,42 @@ class ApiClient:
         url = f"{self.base_url}/{endpoint}"
 
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
+            async with aiohttp.ClientSession(timeout=self.timeout, json_serialize=dumps) as session:
                 if method == "GET":
-                    async with session.get(url, headers=self.headers, params=data) as response:
+                    # Если ответ уже сохранен, запрос отправляется условным
+                    key = response_validators.key(endpoint, data)
+                    stored = response_validators.get(key) if conditional else None
+                    headers = {**self.headers, **stored.conditional_headers()} if stored else self.headers
+
+                    async with session.get(url, headers=headers, params=data) as response:
+                        if response.status == 304 and stored is not None:
+                            # Данные не изменились: тело берется из хранилища
+                            response_validators.remember(
+                                key,
+                                response.headers.get("ETag") or stored.etag,
+                                response.headers.get("Last-Modified") or stored.last_modified,
+                                stored.body
+                            )
+                            return stored.body
                         if response.status != 200:
                             error_text = await response.text()
                             logger.error(f"API error {response.status}: {error_text}")
                             return {"error": f"API error {response.status}: {error_text}"}
-                        return await response.json()
+                        body = await response.json(loads=loads)
+                        if conditional:
+                            response_validators.remember(
+                                key, response.headers.get("ETag"), response.headers.get("Last-Modified"), body
+                            )
+                        return body
 
                 elif method == "POST":
-                    async with session.post(url, headers=self.headers, json=data) as response:
+                    headers = {**self.headers, "Idempotency-Key": idempotency_key} if idempotency_key else self.headers
+                    async with session.post(url, headers=headers, json=data) as response:
                         if response.status not in (200, 201):
                             error_text = await response.text()
                             logger.error(f"API error {response.status}: {error_text}")
                             return {"error": f"API error {response.status}: {error_text}"}
-                        return await response.json()
+                        return await response.json(loads=loads)
 
                 elif method == "PUT":
                     async with session.put(url, headers=self.headers, json=data) as response:
@@ -63,7 +131,7 @@ class ApiClient:
                             error_text = await response.text()
                             logger.error(f"API error {response.status}: {error_text}")
                             return {"error": f"API error {response.status}: {error_text}"}
-                        return await response.json()
+                        return await response.json(loads=loads)
 
                 elif method == "DELETE":
                     async with session.delete(url, headers=self.headers) as response:
@@ -83,17 +151,72 @@ class ApiClient:
             logger.error(f"Необработанная ошибка при запросе к {url}: {e}")
             return {"error": f"Unexpected error: {str(e)}"}
 
+    @staticmethod
+    def _page_params(params: Dict[str, Any] = None, limit: int = None, offset: int = None) -> Optional[Dict[str, Any]]:
+        """
+        Добавление параметров постраничной выборки к параметрам запроса
+
+        Args:
+            params: Параметры запроса (опционально)
+            limit: Количество элементов (опционально)
+            offset: Смещение от начала списка (опционально)
+
+        Returns:
+            Параметры запроса или None, если параметров нет
+        """
+        params = dict(params or {})
+        if limit is not None:
+            params["limit"] = limit
+        if offset is not None:
+            params["offset"] = offset
+        return params or None
+
+    @staticmethod
+    def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+        """
+        Разбор даты и времени в формате ISO, время с часовым поясом приводится к местному
+
+        Args:
+            value: Дата и время в формате ISO (опционально)
+
+        Returns:
+            Дата и время без часового пояса или None, если значение не распознано
+        """
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
+
     async def get_user_data(self, phone_number: str) -> Dict[str, Any]:
         """
         Получение данных пользователя по номеру телефона
 
         Args:
-            phone_number: Номер телефона пользователя
+            phone_number: Номер телефона пользователя в произвольном формате
 
         Returns:
             Словарь с данными пользователя
         """
-        return await self._make_request("GET", f"users/by-phone/{phone_number}")
+        # API принимает номер из цифр с кодом страны: "79991234567"
+        return await self._make_request("GET", f"users/by-phone/{phone_digits(phone_number) or phone_number}")
+
+    async def get_users(self, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Постраничное получение пользователей платформы
+
+        Args:
+            limit: Количество пользователей
+            offset: Смещение от начала списка
+
+        Returns:
+            Список пользователей
+        """
+        return await self._make_request("GET", "users", self._page_params(limit=limit, offset=offset))
 
     async def get_upcoming_matches(self, days: int = 1) -> List[Dict[str, Any]]:
         """
@@ -107,17 +230,84 @@ class ApiClient:
         """
         return await self._make_request("GET", "matches/upcoming", {"days": days})
 
-    async def get_recommended_championships(self, user_id: int) -> List[Dict[str, Any]]:
+    async def iter_upcoming_matches(
+            self,
+            date_from: datetime,
+            date_to: datetime,
+            page_size: int = MATCHES_PAGE_SIZE
+    ) -> AsyncIterator[Match]:
+        """
+        Постраничное получение матчей, которые начинаются в заданном интервале.
+        Интервал фильтруется на стороне API, в памяти находится одна страница,
+        следующая запрашивается, когда обработана текущая.
+        Ответы не сохраняются для условных запросов.
+
+        Args:
+            date_from: Начало интервала
+            date_to: Конец интервала (включительно)
+            page_size: Количество матчей на странице
+
+        Returns:
+            Асинхронный итератор матчей
+
+        Raises:
+            RuntimeError: Если API вернул ошибку
+        """
+        offset = 0
+        head = None
+        while True:
+            params = {
+                "date_from": date_from.isoformat(timespec="seconds"),
+                "date_to": date_to.isoformat(timespec="seconds")
+            }
+            result = await self._make_request(
+                "GET", "matches/upcoming", self._page_params(params, page_size, offset), conditional=False
+            )
+            if isinstance(result, dict):
+                if "error" in result:
+                    raise RuntimeError(result["error"])
+                result = result.get("items") or []
+            if not result:
+                return
+
+            # API, не поддерживающий offset, возвращает ту же страницу, начиная с первого матча
+            if offset == 0:
+                head = result[0]
+            elif result[0] == head:
+                return
+
+            for match in Match.from_list(result):
+                # Защита от API, не поддерживающего фильтр по дате
+                starts_at = self._parse_datetime(match.date_time)
+                if starts_at is not None and not date_from <= starts_at <= date_to:
+                    continue
+                yield match
+
+            # API, не поддерживающий limit и offset, возвращает все матчи сразу
+            if len(result) != page_size:
+                return
+            offset += len(result)
+
+    async def get_recommended_championships(
+            self,
+            user_id: int,
+            limit: int = None,
+            offset: int = None
+    ) -> List[Dict[str, Any]]:
         """
         Получение рекомендуемых чемпионатов для пользователя
 
         Args:
             user_id: ID пользователя
+            limit: Количество элементов (опционально)
+            offset: Смещение от начала списка (опционально)
 
         Returns:
             Список рекомендуемых чемпионатов
         """
-        return await self._make_request("GET", f"championships/recommended/{user_id}")
+        return await self._make_request(
+            "GET", f"championships/recommended/{user_id}", self._page_params(limit=limit, offset=offset)
+        )
 
     async def confirm_notification_delivery(self, notification_id: int, delivered: bool = True) -> Dict[str, Any]:
         """
@@ -137,42 +327,60 @@ class ApiClient:
         }
         return await self._make_request("POST", "notifications/confirm-delivery", data)
 
-    async def get_user_teams(self, user_id: int) -> List[Dict[str, Any]]:
+    async def get_user_teams(self, user_id: int, limit: int = None, offset: int = None) -> List[Dict[str, Any]]:
         """
         Получение команд пользователя
 
         Args:
             user_id: ID пользователя
+            limit: Количество элементов (опционально)
+            offset: Смещение от начала списка (опционально)
 
         Returns:
             Список команд пользователя
         """
-        return await self._make_request("GET", f"users/{user_id}/teams")
+        return await self._make_request(
+            "GET", f"users/{user_id}/teams", self._page_params(limit=limit, offset=offset)
+        )
 
-    async def get_user_championships(self, user_id: int) -> List[Dict[str, Any]]:
+    async def get_user_championships(self, user_id: int, limit: int = None, offset: int = None) -> List[Dict[str, Any]]:
         """
         Получение чемпионатов пользователя
 
         Args:
             user_id: ID пользователя
+            limit: Количество элементов (опционально)
+            offset: Смещение от начала списка (опционально)
 
         Returns:
             Список чемпионатов пользователя
         """
-        return await self._make_request("GET", f"users/{user_id}/championships")
+        return await self._make_request(
+            "GET", f"users/{user_id}/championships", self._page_params(limit=limit, offset=offset)
+        )
 
-    async def get_user_matches(self, user_id: int, status: str = "upcoming") -> List[Dict[str, Any]]:
+    async def get_user_matches(
+            self,
+            user_id: int,
+            status: str = "upcoming",
+            limit: int = None,
+            offset: int = None
+    ) -> List[Dict[str, Any]]:
         """
         Получение матчей пользователя
 
         Args:
             user_id: ID пользователя
             status: Статус матчей ("upcoming", "past", "all")
+            limit: Количество элементов (опционально)
+            offset: Смещение от начала списка (опционально)
 
         Returns:
             Список матчей пользователя
         """
-        return await self._make_request("GET", f"users/{user_id}/matches", {"status": status})
+        return await self._make_request(
+            "GET", f"users/{user_id}/matches", self._page_params({"status": status}, limit, offset)
+        )
 
     async def get_team_details(self, team_id: int) -> Dict[str, Any]:
         """
@@ -186,6 +394,98 @@ class ApiClient:
         """
         return await self._make_request("GET", f"teams/{team_id}")
 
+    async def get_teams_details(self, team_ids: Iterable[int]) -> TeamsDetails:
+        """
+        Получение детальной информации о нескольких командах.
+        Команды берутся из кэша, остальные запрашиваются пакетами по API_BATCH_SIZE
+        через teams/batch. Если API не поддерживает пакетный запрос, команды
+        запрашиваются по одной, не более API_BATCH_CONCURRENCY одновременно.
+
+        Args:
+            team_ids: ID команд
+
+        Returns:
+            Полученные команды и ошибки по ID команд, которые получить не удалось
+        """
+        result = TeamsDetails({}, {})
+        missing = []
+        for team_id in dict.fromkeys(int(team_id) for team_id in team_ids):
+            team = team_cache.get(team_id)
+            if team is not None:
+                result.teams[team_id] = team
+            else:
+                missing.append(team_id)
+
+        if missing and ApiClient.teams_batch_supported is not False:
+            missing = await self._get_teams_batch(missing, result)
+        if missing:
+            await self._get_teams_each(missing, result)
+        return result
+
+    async def _get_teams_batch(self, team_ids: List[int], result: TeamsDetails) -> List[int]:
+        """
+        Пакетное получение команд
+
+        Args:
+            team_ids: ID команд
+            result: Результат, в который добавляются команды и ошибки
+
+        Returns:
+            ID команд, которые нужно запросить по одной: если API не поддерживает
+            пакетный запрос или пакетный запрос части команд завершился ошибкой
+        """
+        fallback = []
+        for start in range(0, len(team_ids), API_BATCH_SIZE):
+            chunk = team_ids[start:start + API_BATCH_SIZE]
+            response = await self._make_request(
+                "GET", "teams/batch", {"ids": ",".join(map(str, chunk))}, conditional=False
+            )
+
+            if isinstance(response, dict) and "error" in response:
+                if response["error"].startswith(("API error 404", "API error 405")):
+                    logger.info("API не поддерживает пакетное получение команд, команды запрашиваются по одной")
+                    ApiClient.teams_batch_supported = False
+                    return fallback + team_ids[start:]
+                logger.warning(f"Ошибка пакетного получения {len(chunk)} команд, команды запрашиваются по одной")
+                fallback.extend(chunk)
+                continue
+
+            ApiClient.teams_batch_supported = True
+            items = response.get("items") if isinstance(response, dict) else response
+            for team in Team.from_list(items or []):
+                if team.id is not None:
+                    team_cache.set(int(team.id), team)
+                    result.teams[int(team.id)] = team
+            for team_id in chunk:
+                if team_id not in result.teams:
+                    result.errors[team_id] = "команда не найдена"
+        return fallback
+
+    async def _get_teams_each(self, team_ids: List[int], result: TeamsDetails):
+        """
+        Получение команд по одной с ограничением числа одновременных запросов
+
+        Args:
+            team_ids: ID команд
+            result: Результат, в который добавляются команды и ошибки
+        """
+        semaphore = asyncio.Semaphore(API_BATCH_CONCURRENCY)
+
+        async def fetch(team_id: int):
+            async with semaphore:
+                return await _team_requests.run(team_id, lambda: self.get_team_details(team_id))
+
+        responses = await asyncio.gather(*(fetch(team_id) for team_id in team_ids))
+        for team_id, response in zip(team_ids, responses):
+            if isinstance(response, dict) and response and "error" not in response:
+                team = Team.from_dict(response)
+                team_cache.set(team_id, team)
+                result.teams[team_id] = team
+            elif isinstance(response, dict):
+                result.errors[team_id] = response.get("error", "пустой ответ")
+            else:
+                result.errors[team_id] = "нет ответа от API"
+
     async def get_championship_details(self, tournament_id: int) -> Dict[str, Any]:
         """
         Получение детальной информации о чемпионате
@@ -198,84 +498,112 @@ class ApiClient:
         """
         return await self._make_request("GET", f"championships/{tournament_id}")
 
-    async def accept_team_invitation(self, invitation_id: int) -> Dict[str, Any]:
+    async def accept_team_invitation(self, invitation_id: int, idempotency_key: str = None) -> Dict[str, Any]:
         """
         Принятие приглашения в команду
 
         Args:
             invitation_id: ID приглашения
+            idempotency_key: Ключ идемпотентности запроса (опционально)
 
         Returns:
             Результат операции
         """
         # Добавляем отладочный лог
         print(f"Вызов API метода accept_team_invitation с ID={invitation_id}")
-        result = await self._make_request("POST", f"invitations/team/{invitation_id}/accept")
+        result = await self._make_request(
+            "POST", f"invitations/team/{invitation_id}/accept", idempotency_key=idempotency_key
+        )
         print(f"Результат API метода accept_team_invitation: {result}")
         return result
 
-    async def decline_team_invitation(self, invitation_id: int) -> Dict[str, Any]:
+    async def decline_team_invitation(self, invitation_id: int, idempotency_key: str = None) -> Dict[str, Any]:
         """
         Отклонение приглашения в команду
 
         Args:
             invitation_id: ID приглашения
+            idempotency_key: Ключ идемпотентности запроса (опционально)
 
         Returns:
             Результат операции
         """
         # Добавляем отладочный лог
         print(f"Вызов API метода decline_team_invitation с ID={invitation_id}")
-        result = await self._make_request("POST", f"invitations/team/{invitation_id}/decline")
+        result = await self._make_request(
+            "POST", f"invitations/team/{invitation_id}/decline", idempotency_key=idempotency_key
+        )
         print(f"Результат API метода decline_team_invitation: {result}")
         return result
 
-    async def accept_committee_invitation(self, invitation_id: int) -> Dict[str, Any]:
+    async def accept_committee_invitation(self, invitation_id: int, idempotency_key: str = None) -> Dict[str, Any]:
         """
         Принятие приглашения в оргкомитет
 
         Args:
             invitation_id: ID приглашения
+            idempotency_key: Ключ идемпотентности запроса (опционально)
 
         Returns:
             Результат операции
         """
         # Добавляем отладочный лог
         print(f"Вызов API метода accept_committee_invitation с ID={invitation_id}")
-        result = await self._make_request("POST", f"invitations/committee/{invitation_id}/accept")
+        result = await self._make_request(
+            "POST", f"invitations/committee/{invitation_id}/accept", idempotency_key=idempotency_key
+        )
         print(f"Результат API метода accept_committee_invitation: {result}")
         return result
 
-    async def decline_committee_invitation(self, invitation_id: int) -> Dict[str, Any]:
+    async def decline_committee_invitation(self, invitation_id: int, idempotency_key: str = None) -> Dict[str, Any]:
         """
         Отклонение приглашения в оргкомитет
 
         Args:
             invitation_id: ID приглашения
+            idempotency_key: Ключ идемпотентности запроса (опционально)
 
         Returns:
             Результат операции
         """
         # Добавляем отладочный лог
         print(f"Вызов API метода decline_committee_invitation с ID={invitation_id}")
-        result = await self._make_request("POST", f"invitations/committee/{invitation_id}/decline")
+        result = await self._make_request(
+            "POST", f"invitations/committee/{invitation_id}/decline", idempotency_key=idempotency_key
+        )
         print(f"Результат API метода decline_committee_invitation: {result}")
         return result
 
-    async def get_user_invitations(self, user_id: int, type: str = "all") -> List[Dict[str, Any]]:
+    async def get_user_invitations(
+            self,
+            user_id: int,
+            type: str = "all",
+            limit: int = None,
+            offset: int = None
+    ) -> List[Dict[str, Any]]:
         """
         Получение приглашений пользователя
 
         Args:
             user_id: ID пользователя
             type: Тип приглашений ("team", "committee", "all")
+            limit: Количество элементов (опционально)
+            offset: Смещение от начала списка (опционально)
 
         Returns:
             Список приглашений
         """
-        return await self._make_request("GET", f"users/{user_id}/invitations", {"type": type})
+        return await self._make_request(
+            "GET", f"users/{user_id}/invitations", self._page_params({"type": type}, limit, offset)
+        )
 
-    async def decline_match(self, match_id: int, team_id: int, reason: str) -> Dict[str, Any]:
+    async def decline_match(
+            self,
+            match_id: int,
+            team_id: int,
+            reason: str,
+            idempotency_key: str = None
+    ) -> Dict[str, Any]:
         """
         Отклонение участия в матче
 
@@ -283,6 +611,7 @@ class ApiClient:
             match_id: ID матча
             team_id: ID команды
             reason: Причина отказа
+            idempotency_key: Ключ идемпотентности запроса (опционально)
 
         Returns:
             Результат операции
@@ -293,7 +622,7 @@ class ApiClient:
                 "matchId": match_id,
                 "teamId": team_id,
                 "reason": reason
-            })
+            }, idempotency_key=idempotency_key)
         except Exception as e:
             logger.error(f"Ошибка при отклонении участия в матче {match_id}: {e}")
             return {"success": False, "error": str(e)}
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Кодирование и разбор JSON для обмена с API
+
+Если установлен orjson или msgspec, используется он: разбор больших
+списков матчей и чемпионатов в несколько раз быстрее стандартного json.
+Без них используется стандартный модуль json, поведение не меняется.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    CODEC_NAME = "orjson"
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+elif msgspec is not None:
+    CODEC_NAME = "msgspec"
+    _loads = msgspec.json.Decoder().decode
+    _dumps = msgspec.json.Encoder().encode
+else:
+    CODEC_NAME = "json"
+    _loads = json.loads
+    _dumps = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Разбор JSON
+
+    Args:
+        data: JSON-документ
+
+    Returns:
+        Разобранное значение
+    """
+    return _loads(data)
+
+
+def dumps(value: Any) -> str:
+    """
+    Кодирование значения в JSON
+
+    Args:
+        value: Значение
+
+    Returns:
+        JSON-документ
+    """
+    if _dumps is None:
+        return json.dumps(value, ensure_ascii=False)
+    return _dumps(value).decode("utf-8")
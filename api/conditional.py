@@ -0,0 +1,103 @@
+"""
+Условные GET-запросы к API
+
+Для ответов с заголовками ETag или Last-Modified сохраняются валидаторы и
+разобранное тело. Следующий запрос к тому же адресу с теми же параметрами
+отправляется с If-None-Match / If-Modified-Since, и при ответе 304 тело
+берется из хранилища: оно не передается по сети и не разбирается повторно.
+"""
+from typing import Any, Dict, Hashable, Optional
+
+from utils.cache import TTLCache
+
+
+class StoredResponse:
+    """
+    Сохраненный ответ API с валидаторами
+    """
+
+    __slots__ = ("etag", "last_modified", "body")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], body: Any):
+        """
+        Args:
+            etag: Значение заголовка ETag
+            last_modified: Значение заголовка Last-Modified
+            body: Разобранное тело ответа
+        """
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """
+        Заголовки условного запроса
+
+        Returns:
+            Словарь заголовков
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ValidatorStore:
+    """
+    Хранилище ответов с валидаторами, общее для всех экземпляров ApiClient.
+    Все запросы к API выполняются в цикле событий бота, поэтому блокировка не нужна.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Args:
+            maxsize: Максимальное количество сохраненных ответов
+            ttl: Срок хранения ответа (в секундах)
+        """
+        self._responses = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[Dict[str, Any]]) -> Hashable:
+        """
+        Ключ ответа: адрес и параметры запроса
+
+        Args:
+            endpoint: Конечная точка API
+            params: Параметры запроса (опционально)
+
+        Returns:
+            Ключ
+        """
+        return endpoint, tuple(sorted((params or {}).items()))
+
+    def get(self, key: Hashable) -> Optional[StoredResponse]:
+        """
+        Получение сохраненного ответа
+
+        Args:
+            key: Ключ ответа
+
+        Returns:
+            Сохраненный ответ или None
+        """
+        return self._responses.get(key)
+
+    def remember(self, key: Hashable, etag: Optional[str], last_modified: Optional[str], body: Any):
+        """
+        Сохранение ответа, если API передал валидаторы
+
+        Args:
+            key: Ключ ответа
+            etag: Значение заголовка ETag
+            last_modified: Значение заголовка Last-Modified
+            body: Разобранное тело ответа
+        """
+        if etag or last_modified:
+            self._responses.set(key, StoredResponse(etag, last_modified, body))
+        else:
+            self._responses.delete(key)
+
+    def __len__(self) -> int:
+        return len(self._responses)
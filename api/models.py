@@ -0,0 +1,275 @@
+"""
+Модели ответов API
+
+Ответ API разбирается в модель один раз, при получении: значения по
+умолчанию и альтернативные имена полей ("id" / "team_id") обрабатываются
+здесь, а не в каждом месте использования. Модели объявлены со __slots__,
+поэтому занимают заметно меньше памяти, чем словари, в больших списках.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+
+ModelT = TypeVar("ModelT", bound="ApiModel")
+
+
+def _first(data: Dict[str, Any], *fields: str) -> Any:
+    """
+    Значение первого из полей, которое присутствует в данных
+
+    Args:
+        data: Данные из API
+        fields: Имена полей в порядке приоритета
+
+    Returns:
+        Значение или None
+    """
+    for field in fields:
+        value = data.get(field)
+        if value is not None:
+            return value
+    return None
+
+
+class ApiModel(ABC):
+    """
+    Базовый класс моделей ответов API
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls: Type[ModelT], data: Dict[str, Any]) -> ModelT:
+        """
+        Создание модели из данных API
+
+        Args:
+            data: Данные из API
+
+        Returns:
+            Модель
+        """
+
+    @classmethod
+    def from_list(cls: Type[ModelT], items: Iterable[Any]) -> List[ModelT]:
+        """
+        Создание моделей из списка данных API, элементы не-словари пропускаются
+
+        Args:
+            items: Список данных из API
+
+        Returns:
+            Список моделей
+        """
+        return [cls.from_dict(item) for item in items if isinstance(item, dict)]
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"<{type(self).__name__} {fields}>"
+
+
+class Match(ApiModel):
+    """
+    Матч
+    """
+
+    __slots__ = ("id", "tournament_id", "tournament_name", "team1_id", "team2_id", "opponent_name",
+                 "location_name", "location_address", "date", "time", "date_time")
+
+    def __init__(self, id=None, tournament_id=None, tournament_name=None, team1_id=None, team2_id=None,
+                 opponent_name=None, location_name=None, location_address=None, date=None, time=None,
+                 date_time=None):
+        self.id = id
+        self.tournament_id = tournament_id
+        self.tournament_name = tournament_name
+        self.team1_id = team1_id
+        self.team2_id = team2_id
+        self.opponent_name = opponent_name
+        self.location_name = location_name
+        self.location_address = location_address
+        self.date = date
+        self.time = time
+        self.date_time = date_time
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Match":
+        return cls(
+            id=_first(data, "id", "match_id"),
+            tournament_id=data.get("tournament_id"),
+            tournament_name=data.get("tournament_name"),
+            team1_id=data.get("team1_id"),
+            team2_id=data.get("team2_id"),
+            opponent_name=data.get("opponent_name"),
+            location_name=data.get("location_name"),
+            location_address=data.get("location_address"),
+            date=data.get("date"),
+            time=data.get("time"),
+            date_time=data.get("date_time")
+        )
+
+
+class TeamMember(ApiModel):
+    """
+    Участник команды
+    """
+
+    __slots__ = ("user_id", "first_name", "last_name", "is_captain")
+
+    def __init__(self, user_id=None, first_name="", last_name="", is_captain=False):
+        self.user_id = user_id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.is_captain = is_captain
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TeamMember":
+        return cls(
+            user_id=data.get("user_id"),
+            first_name=data.get("first_name") or "",
+            last_name=data.get("last_name") or "",
+            is_captain=bool(data.get("is_captain", False))
+        )
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+
+class Team(ApiModel):
+    """
+    Команда (в списке команд пользователя или с подробной информацией)
+    """
+
+    __slots__ = ("id", "name", "sport", "is_captain", "count_member", "wins", "loss", "members", "version")
+
+    def __init__(self, id=None, name=None, sport=None, is_captain=False, count_member=0, wins=0, loss=0,
+                 members: Tuple[TeamMember, ...] = (), version=None):
+        self.id = id
+        self.name = name
+        self.sport = sport
+        self.is_captain = is_captain
+        self.count_member = count_member
+        self.wins = wins
+        self.loss = loss
+        self.members = members
+        self.version = version
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Team":
+        return cls(
+            id=_first(data, "id", "team_id"),
+            name=data.get("name"),
+            sport=data.get("sport"),
+            is_captain=bool(data.get("is_captain", False)),
+            count_member=data.get("count_member", 0),
+            wins=data.get("wins", 0),
+            loss=data.get("loss", 0),
+            members=tuple(TeamMember.from_list(data.get("members") or ())),
+            version=_version(data)
+        )
+
+
+class Stage(ApiModel):
+    """
+    Этап чемпионата
+    """
+
+    __slots__ = ("name", "is_published")
+
+    def __init__(self, name=None, is_published=False):
+        self.name = name
+        self.is_published = is_published
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Stage":
+        return cls(name=data.get("name"), is_published=bool(data.get("is_published")))
+
+
+class Championship(ApiModel):
+    """
+    Чемпионат (в списке, в рекомендациях или с подробной информацией)
+    """
+
+    __slots__ = ("id", "name", "sport", "city", "status", "position", "team_members_count",
+                 "application_deadline", "description", "org_name", "is_stopped", "stages", "version")
+
+    def __init__(self, id=None, name=None, sport=None, city=None, status=None, position=None,
+                 team_members_count=None, application_deadline=None, description="", org_name=None,
+                 is_stopped=False, stages: Tuple[Stage, ...] = (), version=None):
+        self.id = id
+        self.name = name
+        self.sport = sport
+        self.city = city
+        self.status = status
+        self.position = position
+        self.team_members_count = team_members_count
+        self.application_deadline = application_deadline
+        self.description = description
+        self.org_name = org_name
+        self.is_stopped = is_stopped
+        self.stages = stages
+        self.version = version
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Championship":
+        return cls(
+            id=_first(data, "tournament_id", "id"),
+            name=data.get("name"),
+            sport=data.get("sport"),
+            city=data.get("city"),
+            status=data.get("status"),
+            position=data.get("position"),
+            team_members_count=data.get("team_members_count"),
+            application_deadline=data.get("application_deadline"),
+            description=data.get("description") or "",
+            org_name=data.get("org_name"),
+            is_stopped=bool(data.get("is_stopped", False)),
+            stages=tuple(Stage.from_list(data.get("stages") or ())),
+            version=_version(data)
+        )
+
+
+class Invitation(ApiModel):
+    """
+    Приглашение в команду или оргкомитет
+    """
+
+    __slots__ = ("invitation_id", "type", "team_name", "sport", "inviter_name", "committee_name")
+
+    def __init__(self, invitation_id=None, type=None, team_name=None, sport=None, inviter_name=None,
+                 committee_name=None):
+        self.invitation_id = invitation_id
+        self.type = type
+        self.team_name = team_name
+        self.sport = sport
+        self.inviter_name = inviter_name
+        self.committee_name = committee_name
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Invitation":
+        return cls(
+            invitation_id=data.get("invitation_id"),
+            type=data.get("type"),
+            team_name=data.get("team_name"),
+            sport=data.get("sport"),
+            inviter_name=data.get("inviter_name"),
+            committee_name=data.get("committee_name")
+        )
+
+
+# Поля ответа API, по которым определяется версия сущности (в порядке приоритета)
+VERSION_FIELDS = ("version", "updated_at")
+
+
+def _version(data: Dict[str, Any]) -> Optional[str]:
+    """
+    Версия сущности из ответа API
+
+    Args:
+        data: Данные из API
+
+    Returns:
+        Версия или None, если API ее не передает
+    """
+    version = _first(data, *VERSION_FIELDS)
+    return str(version) if version is not None else None
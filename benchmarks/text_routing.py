@@ -0,0 +1,123 @@
+"""
+Стоимость маршрутизации текстовых сообщений
+
+Сравнивает прежнюю цепочку фильтров-лямбд, которые aiogram проверял по очереди
+в порядке регистрации обработчиков, с фильтром TextRouter.match из bot/routing.py.
+Измеряется только проверка фильтров, без накладных расходов aiogram на каждый
+обработчик (прежняя цепочка платила их еще и за каждый проверенный фильтр).
+
+Запуск из корня репозитория (нужны зависимости из requirements.txt):
+    python -m benchmarks.text_routing [--number 1000000] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import timeit
+from types import SimpleNamespace
+from typing import List, Optional
+
+# Конфигурация бота требует токен, хотя маршрутизация к Telegram не обращается
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "benchmark")
+
+from bot.routing import TextRouter  # noqa: E402
+
+# Сообщения для замера
+SAMPLES = [
+    "Помощь",
+    "Рекомендуемые чемпионаты",
+    "/championship_15",
+    "/team_12",
+    "Произвольный текст пользователя",
+]
+
+# Прежние фильтры в порядке регистрации: user, notification, championship
+LEGACY_FILTERS = [
+    lambda message: message.text == "Помощь",
+    lambda message: message.text == "Мои матчи",
+    lambda message: message.text == "Приглашения",
+    lambda message: message.text == "Мои чемпионаты",
+    lambda message: message.text == "Мои команды",
+    lambda message: re.match(r'/team_?\d+', message.text),
+    lambda message: message.text == "Приглашения",
+    lambda message: message.text == "Рекомендуемые чемпионаты",
+    lambda message: message.text.startswith('/championship_'),
+]
+
+
+async def _handler(*args):
+    pass
+
+
+def build_router() -> TextRouter:
+    """
+    Маршрутизатор с теми же кнопками и командами, что и в боте
+
+    Returns:
+        Маршрутизатор
+    """
+    router = TextRouter()
+    for label in ("Помощь", "Мои матчи", "Приглашения", "Мои чемпионаты", "Мои команды",
+                  "Рекомендуемые чемпионаты"):
+        router.label(label)(_handler)
+    router.pattern(r'/team_?(\d+)')(_handler)
+    router.pattern(r'/championship_(\S*)')(_handler)
+    return router
+
+
+def legacy_match(message: SimpleNamespace) -> Optional[int]:
+    """
+    Проверка фильтров по очереди до первого совпадения, как в диспетчере aiogram
+
+    Args:
+        message: Сообщение
+
+    Returns:
+        Номер сработавшего фильтра или None
+    """
+    for index, check in enumerate(LEGACY_FILTERS):
+        if check(message):
+            return index
+    return None
+
+
+def measure(func, message: SimpleNamespace, number: int, repeat: int) -> float:
+    """
+    Время одного вызова в наносекундах (минимум из repeat замеров)
+
+    Args:
+        func: Проверяемый фильтр
+        message: Сообщение
+        number: Количество вызовов в замере
+        repeat: Количество замеров
+
+    Returns:
+        Время одного вызова, нс
+    """
+    return min(timeit.repeat(lambda: func(message), number=number, repeat=repeat)) / number * 1e9
+
+
+def main(argv: List[str] = None):
+    """
+    Запуск замера и вывод таблицы результатов
+
+    Args:
+        argv: Аргументы командной строки
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=1_000_000, help="Вызовов в замере")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество замеров")
+    args = parser.parse_args(argv)
+
+    router = build_router()
+    print(f"{'Сообщение':<34}{'цепочка, нс':>12}{'router, нс':>12}")
+    for text in SAMPLES:
+        message = SimpleNamespace(text=text)
+        # Обе реализации должны выбирать обработчик для одних и тех же сообщений
+        assert (legacy_match(message) is None) == (router.match(message) is None), text
+        legacy = measure(legacy_match, message, args.number, args.repeat)
+        routed = measure(router.match, message, args.number, args.repeat)
+        print(f"{text!r:<34}{legacy:>12.0f}{routed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
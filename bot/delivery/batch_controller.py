@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+from utils.logger import get_logger
+
+logger = get_logger("batch_controller")
+
+
+class AdaptiveBatchController:
+    """
+    Контроллер размера страницы и числа параллельных отправок уведомлений.
+
+    Работает по схеме AIMD: пока отправка укладывается в целевую задержку,
+    не получает RetryAfter и в очереди остается больше страницы уведомлений,
+    размер страницы и параллелизм растут линейно; при перегрузке они уменьшаются вдвое.
+    """
+
+    def __init__(
+            self,
+            min_batch: int,
+            max_batch: int,
+            max_concurrency: int,
+            target_latency: float,
+            max_error_rate: float = 0.1,
+            batch_step: int = 10
+    ):
+        """
+        Args:
+            min_batch: Минимальный размер страницы
+            max_batch: Максимальный размер страницы
+            max_concurrency: Максимальное число параллельных отправок
+            target_latency: Целевая средняя задержка отправки сообщения (в секундах)
+            max_error_rate: Допустимая доля ошибок Telegram API в окне
+            batch_step: Шаг линейного увеличения размера страницы
+        """
+        self.min_batch = min_batch
+        self.max_batch = max(min_batch, max_batch)
+        self.max_concurrency = max(1, max_concurrency)
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.batch_step = batch_step
+
+        self.batch_size = min_batch
+        self.concurrency = 1
+
+        self._paused_until = 0.0
+        self._reset_window()
+
+    def _reset_window(self):
+        """
+        Сброс статистики текущего окна наблюдения
+        """
+        self._sent = 0
+        self._errors = 0
+        self._retry_after = 0
+        self._latency_total = 0.0
+
+    def record_send(self, latency: float):
+        """
+        Учет успешной отправки сообщения
+
+        Args:
+            latency: Время отправки сообщения (в секундах)
+        """
+        self._sent += 1
+        self._latency_total += latency
+
+    def record_error(self):
+        """
+        Учет ошибки Telegram API при отправке сообщения
+        """
+        self._errors += 1
+
+    def record_retry_after(self, timeout: float):
+        """
+        Учет ответа RetryAfter: все отправки приостанавливаются на указанное время
+
+        Args:
+            timeout: Время ожидания, запрошенное Telegram (в секундах)
+        """
+        self._retry_after += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + timeout)
+
+    async def wait_if_paused(self):
+        """
+        Ожидание окончания паузы, запрошенной Telegram
+        """
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def adjust(self, backlog: int):
+        """
+        Пересчет размера страницы и параллелизма по итогам отправки страницы
+
+        Args:
+            backlog: Количество уведомлений, оставшихся в очереди
+        """
+        attempts = self._sent + self._errors
+        error_rate = self._errors / attempts if attempts else 0.0
+        average_latency = self._latency_total / self._sent if self._sent else 0.0
+
+        if self._retry_after or error_rate > self.max_error_rate or average_latency > self.target_latency:
+            # Мультипликативное уменьшение при признаках перегрузки
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+            self.concurrency = max(1, self.concurrency // 2)
+            logger.info(
+                f"Снижение нагрузки: страница {self.batch_size}, параллелизм {self.concurrency} "
+                f"(RetryAfter: {self._retry_after}, ошибки: {error_rate:.0%}, задержка: {average_latency:.2f} с)"
+            )
+        elif backlog > self.batch_size:
+            # Аддитивное увеличение, пока в очереди больше страницы уведомлений
+            self.batch_size = min(self.max_batch, self.batch_size + self.batch_step)
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+        self._reset_window()
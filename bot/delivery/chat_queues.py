@@ -0,0 +1,57 @@
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+
+class ChatRoundRobin:
+    """
+    Разбиение страницы уведомлений на очереди по чатам с обходом чатов по кругу.
+
+    Уведомления одного чата выдаются строго по порядку и никогда не
+    отправляются параллельно: чат возвращается в круг только после того,
+    как отправка его предыдущего уведомления завершилась.
+    """
+
+    def __init__(self, notifications: Iterable):
+        """
+        Args:
+            notifications: Записи уведомлений в порядке очереди
+        """
+        self._queues: Dict[str, deque] = {}
+        for notification in notifications:
+            self._queues.setdefault(notification.telegram_id, deque()).append(notification)
+        self._ready = deque(self._queues)
+
+    @property
+    def chat_count(self) -> int:
+        """
+        Количество чатов с неотправленными уведомлениями
+        """
+        return len(self._queues)
+
+    def next(self) -> Optional[object]:
+        """
+        Получение следующего уведомления из очереди очередного готового чата
+
+        Returns:
+            Запись уведомления или None, если готовых чатов нет
+        """
+        if not self._ready:
+            return None
+        chat_id = self._ready.popleft()
+        return self._queues[chat_id].popleft()
+
+    def release(self, chat_id: str, sent: bool = True):
+        """
+        Возврат чата в круг после завершения отправки его уведомления
+
+        Args:
+            chat_id: Идентификатор чата
+            sent: False, если отправка не удалась. Оставшиеся уведомления чата
+                в этом случае пропускаются, чтобы не нарушить порядок доставки;
+                они останутся в базе и будут отправлены в следующем цикле
+        """
+        queue = self._queues.get(chat_id)
+        if queue and sent:
+            self._ready.append(chat_id)
+        else:
+            self._queues.pop(chat_id, None)
@@ -0,0 +1,252 @@
+import asyncio
+from typing import Any, Dict, Optional
+from aiogram.utils.exceptions import MessageNotModified, TelegramAPIError
+
+from config.config import OUTBOX_BATCH_SIZE, OUTBOX_CONCURRENCY, OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_DELAY
+from utils.logger import get_logger
+from database.models import OutboxAction
+from database.records import OutboxRecord
+from database.repositories.outbox_repository import OutboxRepository
+from database.repositories.user_repository import UserRepository
+from api.client import ApiClient
+from utils.inflight import inflight_actions
+from bot.pagination import LISTS_CHANGED_BY_ACTION, invalidate_user_lists
+
+logger = get_logger("outbox_worker")
+
+# Сигнал о новой записи outbox: обработчик просыпается сразу, не дожидаясь интервала проверки
+outbox_wakeup = asyncio.Event()
+
+
+def notify_enqueued():
+    """
+    Пробуждение обработчика outbox после записи нового действия
+    """
+    outbox_wakeup.set()
+
+
+async def wait_for_entries(timeout: float):
+    """
+    Ожидание новой записи outbox или истечения интервала проверки
+
+    Args:
+        timeout: Максимальное время ожидания (в секундах)
+    """
+    try:
+        await asyncio.wait_for(outbox_wakeup.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    outbox_wakeup.clear()
+
+
+def _call_api(api_client: ApiClient, entry: OutboxRecord):
+    """
+    Вызов метода API, соответствующего действию записи.
+    Все попытки одной записи передают один ключ идемпотентности: если ответ
+    на предыдущую попытку потерялся, API не выполнит действие повторно.
+
+    Args:
+        api_client: Клиент API
+        entry: Запись outbox
+
+    Returns:
+        Корутина вызова API
+    """
+    payload = entry.payload
+    action = OutboxAction(entry.action)
+    key = f"outbox-{entry.id}"
+
+    if action == OutboxAction.ACCEPT_TEAM_INVITATION:
+        return api_client.accept_team_invitation(payload["invitation_id"], idempotency_key=key)
+    if action == OutboxAction.DECLINE_TEAM_INVITATION:
+        return api_client.decline_team_invitation(payload["invitation_id"], idempotency_key=key)
+    if action == OutboxAction.ACCEPT_COMMITTEE_INVITATION:
+        return api_client.accept_committee_invitation(payload["invitation_id"], idempotency_key=key)
+    if action == OutboxAction.DECLINE_COMMITTEE_INVITATION:
+        return api_client.decline_committee_invitation(payload["invitation_id"], idempotency_key=key)
+    return api_client.decline_match(
+        payload["match_id"], payload["team_id"], payload.get("reason", ""), idempotency_key=key
+    )
+
+
+def _success_text(action: OutboxAction, result: Dict[str, Any]) -> str:
+    """
+    Текст сообщения об успешном выполнении действия
+
+    Args:
+        action: Действие
+        result: Ответ API
+
+    Returns:
+        Текст сообщения
+    """
+    if action == OutboxAction.ACCEPT_TEAM_INVITATION:
+        return f"✅ Вы приняли приглашение! Вы теперь участник команды {result.get('team_name', '')}."
+    if action == OutboxAction.ACCEPT_COMMITTEE_INVITATION:
+        return f"✅ Вы приняли приглашение! Вы теперь член оргкомитета {result.get('committee_name', '')}."
+    if action == OutboxAction.DECLINE_MATCH:
+        return "✅ Вы успешно отклонили участие в матче. Организаторы чемпионата будут уведомлены."
+    return "❌ Вы отклонили приглашение."
+
+
+def _failure_text(action: OutboxAction, error: str) -> str:
+    """
+    Текст сообщения о невозможности выполнить действие
+
+    Args:
+        action: Действие
+        error: Описание ошибки
+
+    Returns:
+        Текст сообщения
+    """
+    if action in (OutboxAction.ACCEPT_TEAM_INVITATION, OutboxAction.ACCEPT_COMMITTEE_INVITATION):
+        return f"❌ Не удалось принять приглашение: {error}"
+    if action == OutboxAction.DECLINE_MATCH:
+        return f"❌ Не удалось отклонить участие в матче: {error}"
+    return f"❌ Не удалось отклонить приглашение: {error}"
+
+
+def _is_permanent_error(error: str) -> bool:
+    """
+    Проверка, что ошибка не исправится при повторном вызове (ответ 4xx от API)
+
+    Args:
+        error: Описание ошибки из ответа ApiClient
+
+    Returns:
+        True, если повторять вызов бессмысленно
+    """
+    return error.startswith("API error 4")
+
+
+def _is_already_done(entry: OutboxRecord, error: str) -> bool:
+    """
+    Проверка, что повторная попытка отклонена, потому что действие уже выполнено
+    предыдущей попыткой, ответ на которую потерялся (API без поддержки ключа идемпотентности)
+
+    Args:
+        entry: Запись outbox
+        error: Описание ошибки из ответа ApiClient
+
+    Returns:
+        True, если действие следует считать выполненным
+    """
+    return entry.attempts > 1 and error.startswith("API error 409")
+
+
+async def _report(bot, entry: OutboxRecord, text: str):
+    """
+    Сообщение пользователю о результате: редактирование исходного сообщения
+    с кнопками или отдельное сообщение, если исходного нет
+
+    Args:
+        bot: Объект бота Telegram
+        entry: Запись outbox
+        text: Текст результата
+    """
+    try:
+        if entry.message_id:
+            await bot.edit_message_text(
+                f"{entry.message_text or ''}\n\n{text}",
+                chat_id=entry.chat_id,
+                message_id=entry.message_id,
+                reply_markup=None
+            )
+        else:
+            await bot.send_message(entry.chat_id, text)
+    except MessageNotModified:
+        pass
+    except TelegramAPIError as e:
+        logger.warning(f"Не удалось сообщить результат действия {entry.action} в чат {entry.chat_id}: {e}")
+
+
+async def _invalidate_lists(action: OutboxAction, chat_id: str):
+    """
+    Сброс кэшированных списков пользователя, изменившихся после действия
+
+    Args:
+        action: Выполненное действие
+        chat_id: ID чата пользователя
+    """
+    view_codes = LISTS_CHANGED_BY_ACTION.get(action)
+    if not view_codes:
+        return
+
+    loop = asyncio.get_running_loop()
+    user = await loop.run_in_executor(None, UserRepository.get_by_telegram_id, str(chat_id))
+    if user:
+        invalidate_user_lists(user["id"], view_codes)
+
+
+async def process_entry(bot, api_client: ApiClient, entry: OutboxRecord):
+    """
+    Обработка одной записи outbox: вызов API и сообщение о результате.
+    Временные ошибки откладывают запись с экспоненциальной задержкой,
+    после OUTBOX_MAX_ATTEMPTS попыток или при ответе 4xx запись считается неудачной.
+    Ответ 409 на повторную попытку означает, что действие уже выполнено.
+
+    Args:
+        bot: Объект бота Telegram
+        api_client: Клиент API
+        entry: Запись outbox
+    """
+    action = OutboxAction(entry.action)
+    loop = asyncio.get_running_loop()
+
+    try:
+        result: Optional[Dict[str, Any]] = await _call_api(api_client, entry)
+    except Exception as e:
+        result = {"error": str(e)}
+
+    error = result.get("error", "неизвестная ошибка") if result else "нет ответа от API"
+    if result and not result.get("success") and _is_already_done(entry, error):
+        logger.info(f"Действие {entry.action} (запись {entry.id}) уже выполнено предыдущей попыткой")
+        result = {"success": True}
+
+    if result and result.get("success"):
+        await loop.run_in_executor(None, OutboxRepository.mark_done, entry.id, result)
+        inflight_actions.release(entry.dedup_key)
+        await _invalidate_lists(action, entry.chat_id)
+        await _report(bot, entry, _success_text(action, result))
+        return
+
+    if entry.attempts < OUTBOX_MAX_ATTEMPTS and not _is_permanent_error(error):
+        delay = OUTBOX_RETRY_DELAY * 2 ** (entry.attempts - 1)
+        logger.warning(f"Действие {entry.action} (запись {entry.id}) не выполнено, повтор через {delay} с: {error}")
+        await loop.run_in_executor(None, OutboxRepository.mark_retry, entry.id, error, delay)
+        return
+
+    logger.error(f"Действие {entry.action} (запись {entry.id}) не выполнено: {error}")
+    await loop.run_in_executor(None, OutboxRepository.mark_failed, entry.id, error)
+    inflight_actions.release(entry.dedup_key)
+    await _report(bot, entry, _failure_text(action, error))
+
+
+async def process_outbox(bot, api_client: ApiClient) -> int:
+    """
+    Обработка пачки записей outbox с ограниченным параллелизмом
+
+    Args:
+        bot: Объект бота Telegram
+        api_client: Клиент API
+
+    Returns:
+        Количество обработанных записей
+    """
+    loop = asyncio.get_running_loop()
+    entries = await loop.run_in_executor(None, OutboxRepository.claim_due, OUTBOX_BATCH_SIZE)
+    if not entries:
+        return 0
+
+    semaphore = asyncio.Semaphore(OUTBOX_CONCURRENCY)
+
+    async def process_with_limit(entry: OutboxRecord):
+        async with semaphore:
+            try:
+                await process_entry(bot, api_client, entry)
+            except Exception as e:
+                logger.error(f"Ошибка при обработке записи outbox {entry.id}: {e}")
+
+    await asyncio.gather(*(process_with_limit(entry) for entry in entries))
+    return len(entries)
@@ -0,0 +1,210 @@
+"""
+Страницы подробной информации о команде и чемпионате
+
+Страница не зависит от того, кто ее запросил, поэтому готовый HTML-текст
+хранится в общем кэше. В течение DETAIL_CACHE_TTL страница отдается без
+обращения к API. После этого данные загружаются заново, но если версия
+сущности в ответе API (поле version или updated_at) не изменилась, текст берется из кэша без повторного
+формирования. Одновременные запросы одной страницы выполняют одну загрузку.
+"""
+import html
+from typing import Any, Awaitable, Callable, Optional, Type
+
+from config.config import DETAIL_CACHE_TTL, DETAIL_CACHE_SIZE, DETAIL_RENDER_TTL
+from utils.cache import TTLCache
+from utils.singleflight import SingleFlight
+from api.client import ApiClient
+from api.models import ApiModel, Championship, Team
+
+_MISSING = object()
+
+# Актуальные версии страниц: (код страницы, ID сущности) -> версия
+fresh_versions = TTLCache(maxsize=DETAIL_CACHE_SIZE, ttl=DETAIL_CACHE_TTL)
+
+# Готовые страницы: (код страницы, ID сущности, версия) -> HTML-текст
+rendered_pages = TTLCache(maxsize=DETAIL_CACHE_SIZE, ttl=DETAIL_RENDER_TTL)
+
+_loads = SingleFlight()
+
+
+class DetailView:
+    """
+    Описание страницы подробной информации
+    """
+
+    __slots__ = ("code", "fetch", "model", "render")
+
+    def __init__(
+            self,
+            code: str,
+            fetch: Callable[[ApiClient, int], Awaitable[Any]],
+            model: Type[ApiModel],
+            render: Callable[[Any], str]
+    ):
+        """
+        Args:
+            code: Короткий код страницы
+            fetch: Загрузка сущности из API (клиент, ID сущности)
+            model: Модель сущности (с полем version)
+            render: Формирование HTML-текста страницы
+        """
+        self.code = code
+        self.fetch = fetch
+        self.model = model
+        self.render = render
+
+
+def _escape(value: Any) -> str:
+    return html.escape(str(value), quote=False)
+
+
+def render_team(team: Team) -> str:
+    """
+    Формирование страницы команды
+
+    Args:
+        team: Команда
+
+    Returns:
+        HTML-текст
+    """
+    parts = [
+        f"👥 <b>{_escape(team.name or 'Без названия')}</b>\n\n",
+        f"⚽ Вид спорта: {_escape(team.sport or 'Не указан')}\n",
+        f"👨‍👩‍👧‍👦 Участников: {_escape(team.count_member)}\n",
+        f"🏆 Побед: {_escape(team.wins)}\n",
+        f"❌ Поражений: {_escape(team.loss)}\n\n"
+    ]
+
+    # Список участников команды
+    if team.members:
+        parts.append("<b>Состав команды:</b>\n")
+        for member in team.members:
+            member_name = _escape(member.full_name)
+            if member.is_captain:
+                member_name += " 👑"
+            parts.append(f"- {member_name}\n")
+
+    return "".join(parts)
+
+
+def render_championship(championship: Championship) -> str:
+    """
+    Формирование страницы чемпионата
+
+    Args:
+        championship: Чемпионат
+
+    Returns:
+        HTML-текст
+    """
+    parts = [
+        f"🏆 <b>{_escape(championship.name or 'Без названия')}</b>\n\n",
+        f"⚽ Вид спорта: {_escape(championship.sport or 'Не указан')}\n",
+        f"🌆 Город: {_escape(championship.city or 'Не указан')}\n",
+        f"👥 Размер команды: {_escape(championship.team_members_count or '-')} участников\n",
+        f"📅 Дедлайн подачи заявок: {_escape(championship.application_deadline or 'Не указан')}\n\n"
+    ]
+
+    # Информация о стадиях чемпионата
+    if championship.stages:
+        parts.append("📊 <b>Этапы чемпионата:</b>\n")
+        for stage in championship.stages:
+            status = "✅ Опубликован" if stage.is_published else "⏳ Не опубликован"
+            parts.append(f"- {_escape(stage.name or 'Этап')}: {status}\n")
+
+    # Полное описание
+    description = championship.description
+    if description:
+        if len(description) > 500:
+            description = description[:497] + "..."
+        parts.append(f"\n📝 <b>Описание:</b>\n{_escape(description)}\n")
+
+    # Организатор
+    parts.append(f"\n👔 Организатор: {_escape(championship.org_name or 'Не указан')}\n")
+
+    # Статус чемпионата
+    if championship.is_stopped:
+        parts.append("⚠️ Чемпионат остановлен\n")
+
+    return "".join(parts)
+
+
+TEAM_PAGE = DetailView(
+    code="team",
+    fetch=lambda api, team_id: api.get_team_details(team_id),
+    model=Team,
+    render=render_team
+)
+
+CHAMPIONSHIP_PAGE = DetailView(
+    code="championship",
+    fetch=lambda api, championship_id: api.get_championship_details(championship_id),
+    model=Championship,
+    render=render_championship
+)
+
+
+def cached_page(view: DetailView, entity_id: int) -> Optional[str]:
+    """
+    Готовая страница из кэша, если она еще актуальна
+
+    Args:
+        view: Описание страницы
+        entity_id: ID сущности
+
+    Returns:
+        HTML-текст или None, если страницу нужно загрузить
+    """
+    version = fresh_versions.get((view.code, entity_id), _MISSING)
+    if version is _MISSING:
+        return None
+    return rendered_pages.get((view.code, entity_id, version))
+
+
+async def _load(api_client: ApiClient, view: DetailView, entity_id: int) -> Optional[str]:
+    entity = await view.fetch(api_client, entity_id)
+    if not isinstance(entity, dict) or not entity or "error" in entity:
+        return None
+
+    entity = view.model.from_dict(entity)
+    version = entity.version
+    key = (view.code, entity_id, version)
+
+    # Сущность не изменилась: формировать текст заново не нужно
+    page = rendered_pages.get(key) if version is not None else None
+    if page is None:
+        page = view.render(entity)
+        rendered_pages.set(key, page)
+    fresh_versions.set((view.code, entity_id), version)
+    return page
+
+
+async def get_page(api_client: ApiClient, view: DetailView, entity_id: int) -> Optional[str]:
+    """
+    Получение страницы: из кэша или загрузкой из API
+
+    Args:
+        api_client: Клиент API
+        view: Описание страницы
+        entity_id: ID сущности
+
+    Returns:
+        HTML-текст или None, если сущность не найдена или API вернул ошибку
+    """
+    page = cached_page(view, entity_id)
+    if page is not None:
+        return page
+    return await _loads.run((view.code, entity_id), lambda: _load(api_client, view, entity_id))
+
+
+def invalidate_page(view: DetailView, entity_id: int):
+    """
+    Сброс актуальности страницы: следующий запрос загрузит данные из API
+
+    Args:
+        view: Описание страницы
+        entity_id: ID сущности
+    """
+    fresh_versions.delete((view.code, entity_id))
+
@@ -1,8 +1,16 @@
+import asyncio
 import logging
+from functools import partial
 from aiogram import Dispatcher, types
 
 from utils.logger import get_logger
 from api.client import ApiClient
+from database.models import OutboxAction
+from database.repositories.outbox_repository import OutboxRepository, outbox_dedup_key
+from utils.inflight import inflight_actions
+from bot.keyboards.callback_data import CallbackAction
+from bot.routing import callback_router
+from bot.delivery.outbox_worker import notify_enqueued
 
 logger = get_logger("callback_handlers")
 api_client = None
@@ -19,7 +27,7 @@ def register_callback_handlers(dp: Dispatcher):
     api_client = ApiClient()
 
     # Обработчики для меню помощи
-    @dp.callback_query_handler(lambda c: c.data == 'about')
+    @callback_router.register(CallbackAction.HELP_ABOUT)
     async def help_about_callback(callback_query: types.CallbackQuery):
         await callback_query.answer()
         await callback_query.message.reply(
@@ -30,7 +38,7 @@ def register_callback_handlers(dp: Dispatcher):
             "матчах и командах, в которых вы участвуете."
         )
 
-    @dp.callback_query_handler(lambda c: c.data == 'types')
+    @callback_router.register(CallbackAction.HELP_TYPES)
     async def help_notification_types_callback(callback_query: types.CallbackQuery):
         await callback_query.answer()
         await callback_query.message.reply(
@@ -48,7 +56,7 @@ def register_callback_handlers(dp: Dispatcher):
             "• Приглашения в оргкомитеты"
         )
 
-    @dp.callback_query_handler(lambda c: c.data == 'phone')
+    @callback_router.register(CallbackAction.HELP_PHONE)
     async def help_change_phone_callback(callback_query: types.CallbackQuery):
         await callback_query.answer()
         await callback_query.message.reply(
@@ -59,7 +67,7 @@ def register_callback_handlers(dp: Dispatcher):
             "Обратите внимание, что номер телефона должен быть зарегистрирован в системе."
         )
 
-    @dp.callback_query_handler(lambda c: c.data == 'support')
+    @callback_router.register(CallbackAction.HELP_SUPPORT)
     async def help_support_callback(callback_query: types.CallbackQuery):
         await callback_query.answer()
         await callback_query.message.reply(
@@ -71,118 +79,68 @@ def register_callback_handlers(dp: Dispatcher):
             "+7 (800) 123-45-67"
         )
 
-    # Обработчик для принятия приглашения в команду
-    @dp.callback_query_handler(lambda c: c.data and c.data.startswith('accept_team_'))
-    async def accept_team_invitation_callback(callback_query: types.CallbackQuery):
-        await callback_query.answer("Обрабатываем ваше решение...")
-
-        try:
-            invitation_id = int(callback_query.data.split('_')[2])
-
-            # Вызываем API для принятия приглашения
-            result = await api_client.accept_team_invitation(invitation_id)
-
-            if result and result.get('success'):
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n✅ Вы приняли приглашение! Вы теперь участник команды {result.get('team_name', '')}.",
-                    reply_markup=None
-                )
-            else:
-                error_msg = result.get('error', 'неизвестная ошибка') if result else 'нет ответа от API'
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Не удалось принять приглашение: {error_msg}",
-                    reply_markup=None
-                )
-        except Exception as e:
-            logger.error(f"Ошибка при обработке принятия приглашения в команду: {e}")
-            await callback_query.message.edit_text(
-                f"{callback_query.message.text}\n\n❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже.",
-                reply_markup=None
-            )
-
-    # Обработчик для отклонения приглашения в команду
-    @dp.callback_query_handler(lambda c: c.data and c.data.startswith('decline_team_'))
-    async def decline_team_invitation_callback(callback_query: types.CallbackQuery):
-        await callback_query.answer("Обрабатываем ваше решение...")
-
-        try:
-            invitation_id = int(callback_query.data.split('_')[2])
-
-            # Вызываем API для отклонения приглашения
-            result = await api_client.decline_team_invitation(invitation_id)
-
-            if result and result.get('success'):
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Вы отклонили приглашение.",
-                    reply_markup=None
-                )
-            else:
-                error_msg = result.get('error', 'неизвестная ошибка') if result else 'нет ответа от API'
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Не удалось отклонить приглашение: {error_msg}",
-                    reply_markup=None
-                )
-        except Exception as e:
-            logger.error(f"Ошибка при обработке отклонения приглашения в команду: {e}")
-            await callback_query.message.edit_text(
-                f"{callback_query.message.text}\n\n❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже.",
-                reply_markup=None
-            )
-
-    # Обработчик для принятия приглашения в оргкомитет
-    @dp.callback_query_handler(lambda c: c.data and c.data.startswith('accept_committee_'))
-    async def accept_committee_invitation_callback(callback_query: types.CallbackQuery):
-        await callback_query.answer("Обрабатываем ваше решение...")
-
-        try:
-            invitation_id = int(callback_query.data.split('_')[2])
-
-            # Вызываем API для принятия приглашения
-            result = await api_client.accept_committee_invitation(invitation_id)
-
-            if result and result.get('success'):
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n✅ Вы приняли приглашение! Вы теперь член оргкомитета {result.get('committee_name', '')}.",
-                    reply_markup=None
-                )
-            else:
-                error_msg = result.get('error', 'неизвестная ошибка') if result else 'нет ответа от API'
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Не удалось принять приглашение: {error_msg}",
-                    reply_markup=None
-                )
-        except Exception as e:
-            logger.error(f"Ошибка при обработке принятия приглашения в оргкомитет: {e}")
-            await callback_query.message.edit_text(
-                f"{callback_query.message.text}\n\n❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже.",
-                reply_markup=None
-            )
-
-    # Обработчик для отклонения приглашения в оргкомитет
-    @dp.callback_query_handler(lambda c: c.data and c.data.startswith('decline_committee_'))
-    async def decline_committee_invitation_callback(callback_query: types.CallbackQuery):
-        await callback_query.answer("Обрабатываем ваше решение...")
-
-        try:
-            invitation_id = int(callback_query.data.split('_')[2])
-
-            # Вызываем API для отклонения приглашения
-            result = await api_client.decline_committee_invitation(invitation_id)
-
-            if result and result.get('success'):
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Вы отклонили приглашение.",
-                    reply_markup=None
-                )
-            else:
-                error_msg = result.get('error', 'неизвестная ошибка') if result else 'нет ответа от API'
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Не удалось отклонить приглашение: {error_msg}",
-                    reply_markup=None
-                )
-        except Exception as e:
-            logger.error(f"Ошибка при обработке отклонения приглашения в оргкомитет: {e}")
-            await callback_query.message.edit_text(
-                f"{callback_query.message.text}\n\n❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже.",
-                reply_markup=None
-            )
\ No newline at end of file
+    # Обработчики ответа на приглашения: решение записывается в outbox,
+    # вызов API и итоговое сообщение выполняет фоновый обработчик
+    @callback_router.register(CallbackAction.ACCEPT_TEAM_INVITATION)
+    async def accept_team_invitation_callback(callback_query: types.CallbackQuery, invitation_id: int):
+        await enqueue_invitation_decision(callback_query, OutboxAction.ACCEPT_TEAM_INVITATION, invitation_id)
+
+    @callback_router.register(CallbackAction.DECLINE_TEAM_INVITATION)
+    async def decline_team_invitation_callback(callback_query: types.CallbackQuery, invitation_id: int):
+        await enqueue_invitation_decision(callback_query, OutboxAction.DECLINE_TEAM_INVITATION, invitation_id)
+
+    @callback_router.register(CallbackAction.ACCEPT_COMMITTEE_INVITATION)
+    async def accept_committee_invitation_callback(callback_query: types.CallbackQuery, invitation_id: int):
+        await enqueue_invitation_decision(callback_query, OutboxAction.ACCEPT_COMMITTEE_INVITATION, invitation_id)
+
+    @callback_router.register(CallbackAction.DECLINE_COMMITTEE_INVITATION)
+    async def decline_committee_invitation_callback(callback_query: types.CallbackQuery, invitation_id: int):
+        await enqueue_invitation_decision(callback_query, OutboxAction.DECLINE_COMMITTEE_INVITATION, invitation_id)
+
+
+async def enqueue_invitation_decision(callback_query: types.CallbackQuery, action: OutboxAction, invitation_id: int):
+    """
+    Запись ответа на приглашение в outbox и немедленное подтверждение пользователю.
+    Кнопки убираются сразу; если записать решение не удалось, сообщение
+    и кнопки остаются без изменений. Повторные нажатия, пока решение
+    по приглашению обрабатывается, отклоняются без обращения к базе и API.
+
+    Args:
+        callback_query: Запрос от кнопки
+        action: Действие с приглашением
+        invitation_id: ID приглашения
+    """
+    payload = {"invitation_id": invitation_id}
+    key = outbox_dedup_key(action, payload)
+    if not inflight_actions.try_acquire(key):
+        await callback_query.answer("Ваше решение уже обрабатывается")
+        return
+
+    message = callback_query.message
+    loop = asyncio.get_running_loop()
+    entry_id = await loop.run_in_executor(
+        None,
+        partial(
+            OutboxRepository.enqueue,
+            action,
+            payload,
+            str(message.chat.id),
+            message_id=message.message_id,
+            message_text=message.text
+        )
+    )
+
+    if entry_id is None:
+        inflight_actions.release(key)
+        await callback_query.answer(
+            "Не удалось сохранить ваше решение. Пожалуйста, попробуйте позже.",
+            show_alert=True
+        )
+        return
+
+    notify_enqueued()
+    await callback_query.answer("Ваше решение принято")
+    await message.edit_text(
+        f"{message.text}\n\n⏳ Ваше решение принято, обрабатываем...",
+        reply_markup=None
+    )
@@ -1,11 +1,18 @@
+import asyncio
 from aiogram import Dispatcher, types
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 
 from utils.logger import get_logger
 from database.repositories.user_repository import UserRepository
+from database.repositories.outbox_repository import OutboxRepository, outbox_dedup_key
+from utils.inflight import inflight_actions
+from database.models import OutboxAction
 from api.client import ApiClient
 from bot.keyboards.keyboards import get_start_keyboard
+from bot.keyboards.callback_data import CallbackAction
+from bot.routing import callback_router
+from bot.delivery.outbox_worker import notify_enqueued
 
 logger = get_logger("match_handler")
 
@@ -33,21 +40,24 @@ def register_match_handlers(dp: Dispatcher):
     api_client = ApiClient()
 
     # Обработчик для отклонения участия в матче
-    @dp.callback_query_handler(lambda c: c.data and c.data.startswith('decline_match_'))
-    async def decline_match_start(callback_query: types.CallbackQuery, state: FSMContext):
+    @callback_router.register(CallbackAction.DECLINE_MATCH)
+    async def decline_match_start(callback_query: types.CallbackQuery, match_id: int, team_id: int, state: FSMContext):
         """
         Обработчик для начала процесса отклонения участия в матче
 
         Args:
             callback_query: Запрос от кнопки
+            match_id: ID матча
+            team_id: ID команды
             state: Состояние FSM
         """
-        await callback_query.answer("Отклонение участия в матче...")
+        # Повторное нажатие, пока отказ от этого матча обрабатывается, ничего не запрашивает
+        key = outbox_dedup_key(OutboxAction.DECLINE_MATCH, {"match_id": match_id, "team_id": team_id})
+        if key in inflight_actions:
+            await callback_query.answer("Ваш отказ от участия в матче уже обрабатывается")
+            return
 
-        # Получаем ID матча и команды из callback_data
-        _, _, match_id, team_id = callback_query.data.split('_')
-        match_id = int(match_id)
-        team_id = int(team_id)
+        await callback_query.answer("Отклонение участия в матче...")
 
         # Сохраняем данные для последующего использования
         async with state.proxy() as data:
@@ -80,22 +90,36 @@ def register_match_handlers(dp: Dispatcher):
         # Получаем причину отклонения
         reason = message.text
 
-        try:
-            # Вызываем API для отклонения участия в матче
-            result = await api_client.decline_match(match_id, team_id, reason)
-
-            if result.get('success'):
-                await message.answer(
-                    "✅ Вы успешно отклонили участие в матче. Организаторы чемпионата будут уведомлены.",
-                    reply_markup=get_start_keyboard()
-                )
-            else:
-                await message.answer(
-                    f"❌ Не удалось отклонить участие в матче: {result.get('error', 'неизвестная ошибка')}",
-                    reply_markup=get_start_keyboard()
-                )
-        except Exception as e:
-            logger.error(f"Ошибка при отклонении участия в матче {match_id}: {e}")
+        payload = {"match_id": match_id, "team_id": team_id, "reason": reason}
+        key = outbox_dedup_key(OutboxAction.DECLINE_MATCH, payload)
+        if not inflight_actions.try_acquire(key):
+            await message.answer(
+                "⏳ Ваш отказ от участия в матче уже обрабатывается.",
+                reply_markup=get_start_keyboard()
+            )
+            await state.finish()
+            return
+
+        # Решение записывается в outbox, вызов API выполняет фоновый обработчик,
+        # он же сообщит итоговый результат отдельным сообщением
+        loop = asyncio.get_running_loop()
+        entry_id = await loop.run_in_executor(
+            None,
+            OutboxRepository.enqueue,
+            OutboxAction.DECLINE_MATCH,
+            payload,
+            str(message.chat.id)
+        )
+
+        if entry_id is not None:
+            notify_enqueued()
+            await message.answer(
+                "⏳ Ваше решение принято, обрабатываем...",
+                reply_markup=get_start_keyboard()
+            )
+        else:
+            inflight_actions.release(key)
+            logger.error(f"Не удалось записать отклонение участия в матче {match_id}")
             await message.answer(
                 "❌ Произошла ошибка при отклонении участия в матче. Пожалуйста, попробуйте позже.",
                 reply_markup=get_start_keyboard()
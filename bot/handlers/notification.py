@@ -1,289 +1,272 @@
+import asyncio
 import logging
-import json
 import re
-from aiogram import Dispatcher, types
-from aiogram.utils.exceptions import BotBlocked, ChatNotFound, UserDeactivated, TelegramAPIError
-
-from config.config import MAX_RPS
+import time
+from aiogram import Dispatcher
+from aiogram.utils.exceptions import BotBlocked, ChatNotFound, UserDeactivated, RetryAfter, TelegramAPIError
+
+from config.config import (
+    DELIVERY_MIN_BATCH,
+    DELIVERY_MAX_BATCH,
+    DELIVERY_MAX_CONCURRENCY,
+    DELIVERY_TARGET_LATENCY
+)
 from utils.logger import get_logger
 from database.models import NotificationType
 from database.repositories.notification_repository import NotificationRepository
 from api.client import ApiClient
-from bot.messages.templates import (
-    TEAM_APPLICATION_MESSAGE,
-    APPLICATION_CANCEL_MESSAGE,
-    CHAMPIONSHIP_CANCEL_MESSAGE,
-    NEW_MATCH_MESSAGE,
-    MATCH_RESCHEDULE_MESSAGE,
-    PLAYOFF_RESULT_MESSAGE,
-    MATCH_REMINDER_MESSAGE,
-    NEW_CHAMPIONSHIP_MESSAGE,
-    COMMITTEE_MESSAGE,
-    TEAM_INVITATION_MESSAGE,
-    COMMITTEE_INVITATION_MESSAGE
-)
-from bot.keyboards.keyboards import get_invitation_keyboard
+from bot.messages.renderers import render_notification
+from bot.pagination import LISTS_CHANGED_BY_NOTIFICATION, invalidate_user_lists
+from bot.details import CHAMPIONSHIP_PAGE, invalidate_page
+from bot.delivery.batch_controller import AdaptiveBatchController
+from bot.delivery.chat_queues import ChatRoundRobin
 
 logger = get_logger("notification_handler")
 api_client = None  # Глобальная переменная для API клиента
 
+# Контроллер размера страницы и параллелизма отправки уведомлений
+batch_controller = AdaptiveBatchController(
+    min_batch=DELIVERY_MIN_BATCH,
+    max_batch=DELIVERY_MAX_BATCH,
+    max_concurrency=DELIVERY_MAX_CONCURRENCY,
+    target_latency=DELIVERY_TARGET_LATENCY
+)
 
-async def send_notification(bot, notification, user):
+
+async def send_notification(bot, notification):
     """
-    Отправка уведомления пользователю
+    Отправка уведомления пользователю.
+    Отметка об отправке записывается в базу пачкой после отправки страницы (см. send_page).
 
     Args:
         bot: Объект бота Telegram
-        notification: Объект уведомления
-        user: Объект пользователя
+        notification: Запись неотправленного уведомления
 
     Returns:
         bool: True, если уведомление успешно отправлено, иначе False
     """
-    if not user.telegram_id:
-        logger.warning(f"Пользователь {user.id} не имеет привязанного Telegram ID")
+    user_id = notification.user_id
+    if not notification.telegram_id:
+        logger.warning(f"Пользователь {user_id} не имеет привязанного Telegram ID")
         return False
 
     try:
-        metadata = json.loads(notification.metadata_json) if notification.metadata_json else {}
-        message_text = ""
-        markup = None
-
-        if notification.type == NotificationType.TEAM_APPLICATION:
-            message_text = TEAM_APPLICATION_MESSAGE.format(
-                team_name=metadata.get("team_name", ""),
-                championship_name=metadata.get("championship_name", ""),
-                application_deadline=metadata.get("application_deadline", "")
-            )
-
-        elif notification.type == NotificationType.APPLICATION_CANCEL:
-            message_text = APPLICATION_CANCEL_MESSAGE.format(
-                status=metadata.get("status", "отклонена"),
-                team_name=metadata.get("team_name", ""),
-                championship_name=metadata.get("championship_name", ""),
-                reason=metadata.get("reason", "Причина не указана")
-            )
-
-        elif notification.type == NotificationType.CHAMPIONSHIP_CANCEL:
-            message_text = CHAMPIONSHIP_CANCEL_MESSAGE.format(
-                status=metadata.get("status", "отменен"),
-                championship_name=metadata.get("championship_name", ""),
-                additional_info=metadata.get("additional_info", "")
-            )
-
-        elif notification.type == NotificationType.NEW_MATCH:
-            message_text = NEW_MATCH_MESSAGE.format(
-                championship_name=metadata.get("championship_name", ""),
-                opponent_name=metadata.get("opponent_name", ""),
-                match_date=metadata.get("match_date", ""),
-                match_time=metadata.get("match_time", ""),
-                venue=metadata.get("venue", ""),
-                address=metadata.get("address", "")
-            )
-
-        elif notification.type == NotificationType.MATCH_RESCHEDULE:
-            message_text = MATCH_RESCHEDULE_MESSAGE.format(
-                championship_name=metadata.get("championship_name", ""),
-                opponent_name=metadata.get("opponent_name", ""),
-                new_date=metadata.get("new_date", ""),
-                new_time=metadata.get("new_time", ""),
-                new_venue=metadata.get("new_venue", ""),
-                new_address=metadata.get("new_address", ""),
-                old_date=metadata.get("old_date", ""),
-                old_time=metadata.get("old_time", "")
-            )
-
-        elif notification.type == NotificationType.PLAYOFF_RESULT:
-            message_text = PLAYOFF_RESULT_MESSAGE.format(
-                team_name=metadata.get("team_name", ""),
-                result=metadata.get("result", "прошла"),
-                championship_name=metadata.get("championship_name", ""),
-                additional_info=metadata.get("additional_info", "")
-            )
-
-        elif notification.type == NotificationType.MATCH_REMINDER:
-            message_text = MATCH_REMINDER_MESSAGE.format(
-                championship_name=metadata.get("championship_name", ""),
-                opponent_name=metadata.get("opponent_name", ""),
-                match_date=metadata.get("match_date", ""),
-                match_time=metadata.get("match_time", ""),
-                venue=metadata.get("venue", ""),
-                address=metadata.get("address", "")
-            )
-
-        elif notification.type == NotificationType.NEW_CHAMPIONSHIP:
-            message_text = NEW_CHAMPIONSHIP_MESSAGE.format(
-                championship_name=metadata.get("championship_name", ""),
-                sport_type=metadata.get("sport_type", ""),
-                deadline=metadata.get("deadline", ""),
-                city=metadata.get("city", ""),
-                description=metadata.get("description", "")
-            )
-
-        elif notification.type == NotificationType.COMMITTEE_MESSAGE:
-            message_text = COMMITTEE_MESSAGE.format(
-                championship_name=metadata.get("championship_name", ""),
-                message=metadata.get("message", "")
-            )
-
-        elif notification.type == NotificationType.TEAM_INVITATION:
-            message_text = TEAM_INVITATION_MESSAGE.format(
-                team_name=metadata.get("team_name", ""),
-                sport_type=metadata.get("sport_type", ""),
-                captain_name=metadata.get("captain_name", "")
-            )
-            invitation_id = metadata.get("invitation_id")
-            if invitation_id:
-                markup = get_invitation_keyboard(invitation_id, "team")
-                logger.info(f"Создана клавиатура для приглашения в команду id={invitation_id}")
-
-        elif notification.type == NotificationType.COMMITTEE_INVITATION:
-            message_text = COMMITTEE_INVITATION_MESSAGE.format(
-                committee_name=metadata.get("committee_name", ""),
-                inviter_name=metadata.get("inviter_name", "")
-            )
-            invitation_id = metadata.get("invitation_id")
-            if invitation_id:
-                markup = get_invitation_keyboard(invitation_id, "committee")
-                logger.info(f"Создана клавиатура для приглашения в оргкомитет id={invitation_id}")
-        else:
-            message_text = notification.content
+        message_text, markup = render_notification(notification.type, notification.metadata, notification.content)
 
         # Отправляем сообщение пользователю
+        await batch_controller.wait_if_paused()
+        started_at = time.monotonic()
         await bot.send_message(
-            chat_id=user.telegram_id,
+            chat_id=notification.telegram_id,
             text=message_text,
             reply_markup=markup,
             parse_mode="HTML"
         )
-
-        # Помечаем уведомление как отправленное
-        NotificationRepository.mark_as_sent(notification.id)
-        return True
+        batch_controller.record_send(time.monotonic() - started_at)
 
     except BotBlocked:
-        logger.warning(f"Бот заблокирован пользователем {user.id}")
+        logger.warning(f"Бот заблокирован пользователем {user_id}")
         return False
     except ChatNotFound:
-        logger.warning(f"Чат с пользователем {user.id} не найден")
+        logger.warning(f"Чат с пользователем {user_id} не найден")
         return False
     except UserDeactivated:
-        logger.warning(f"Пользователь {user.id} деактивировал свой аккаунт")
+        logger.warning(f"Пользователь {user_id} деактивировал свой аккаунт")
+        return False
+    except RetryAfter as e:
+        # Уведомление останется в очереди и будет отправлено в следующем цикле
+        logger.warning(f"Превышен лимит Telegram, отправка приостановлена на {e.timeout} с")
+        batch_controller.record_retry_after(e.timeout)
         return False
     except TelegramAPIError as e:
-        logger.error(f"Ошибка Telegram API при отправке уведомления пользователю {user.id}: {e}")
+        logger.error(f"Ошибка Telegram API при отправке уведомления пользователю {user_id}: {e}")
+        batch_controller.record_error()
         return False
     except Exception as e:
-        logger.error(f"Необработанная ошибка при отправке уведомления пользователю {user.id}: {e}")
+        logger.error(f"Необработанная ошибка при отправке уведомления пользователю {user_id}: {e}")
         return False
 
+    # Сообщение доставлено: ошибка сброса кэша не должна вернуть уведомление в очередь
+    invalidate_caches(notification)
+    return True
 
-async def process_pending_notifications(bot):
+
+def invalidate_caches(notification):
     """
-    Обработка ожидающих отправки уведомлений
+    Сброс кэшированных страниц, которые изменились вместе с доставленным уведомлением:
+    списков пользователя и страницы отмененного чемпионата.
+    Ошибки записываются в лог и не влияют на результат отправки.
 
     Args:
-        bot: Объект бота Telegram
+        notification: Запись доставленного уведомления
     """
     try:
-        notifications = NotificationRepository.get_pending_notifications(limit=MAX_RPS)
+        invalidate_user_lists(notification.user_id, LISTS_CHANGED_BY_NOTIFICATION.get(notification.type, ()))
+        if notification.type == NotificationType.CHAMPIONSHIP_CANCEL and notification.metadata:
+            championship_id = notification.metadata.get("championship_id")
+            if championship_id:
+                try:
+                    invalidate_page(CHAMPIONSHIP_PAGE, int(championship_id))
+                except (TypeError, ValueError):
+                    logger.warning(
+                        f"Некорректный ID чемпионата в уведомлении {notification.id}: {championship_id!r}"
+                    )
+    except Exception as e:
+        logger.error(f"Ошибка при сбросе кэша после уведомления {notification.id}: {e}")
 
-        if not notifications:
-            return
 
-        logger.info(f"Найдено {len(notifications)} неотправленных уведомлений")
+async def fetch_pending_page(limit: int, after=None):
+    """
+    Получение страницы неотправленных уведомлений в пуле потоков,
+    чтобы запрос к базе данных не блокировал цикл событий
 
-        for notification in notifications:
-            user = notification.user
-            if not user or not user.telegram_id:
-                logger.warning(f"Уведомление {notification.id}: пользователь не найден или не имеет Telegram ID")
-                NotificationRepository.mark_as_sent(notification.id)
-                continue
+    Args:
+        limit: Размер страницы
+        after: Курсор (created_at, id) последней записи предыдущей страницы (опционально)
 
-            await send_notification(bot, notification, user)
+    Returns:
+        Список записей уведомлений
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, NotificationRepository.get_pending_notifications, limit, after)
 
-    except Exception as e:
-        logger.error(f"Ошибка при обработке неотправленных уведомлений: {e}")
 
+async def count_pending(after, limit: int) -> int:
+    """
+    Оценка глубины очереди после курсора в пуле потоков
 
-def register_notification_handlers(dp: Dispatcher):
+    Args:
+        after: Курсор (created_at, id) последней выбранной записи
+        limit: Максимальное значение результата
+
+    Returns:
+        Количество уведомлений в очереди (не больше limit)
     """
-    Регистрация обработчиков для колбэков от уведомлений
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, NotificationRepository.count_pending, after, limit)
+
+
+async def send_page(bot, page):
+    """
+    Отправка страницы уведомлений.
+    Страница разбивается на очереди по чатам, чаты обслуживаются по кругу,
+    чтобы пользователь с большим числом уведомлений не задерживал остальных.
+    Порядок уведомлений внутри чата сохраняется. Отправленные уведомления
+    помечаются в базе одним запросом после отправки страницы.
 
     Args:
-        dp: Диспетчер Aiogram
+        bot: Объект бота Telegram
+        page: Список записей уведомлений
     """
-    global api_client
-    api_client = ApiClient()
+    queues = ChatRoundRobin(page)
+    sent_ids = []
 
-    logger.info("Регистрация обработчиков для уведомлений")
+    async def worker():
+        while True:
+            notification = queues.next()
+            if notification is None:
+                return
+            sent = False
+            try:
+                sent = await send_notification(bot, notification)
+            finally:
+                queues.release(notification.telegram_id, sent)
+            if sent:
+                sent_ids.append(notification.id)
+
+    workers = min(batch_controller.concurrency, queues.chat_count)
+    try:
+        await asyncio.gather(*(worker() for _ in range(workers)))
+    finally:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, NotificationRepository.mark_many_as_sent, sent_ids)
 
-    @dp.message_handler(commands=['invitations'])
-    @dp.message_handler(lambda message: message.text == "Приглашения")
-    async def my_invitations(message: types.Message):
-        """
-        Обработчик запроса информации о приглашениях пользователя
 
-        Args:
-            message: Сообщение от пользователя
-        """
-        telegram_id = str(message.from_user.id)
-        user = UserRepository.get_by_telegram_id(telegram_id)
+async def process_pending_notifications(bot) -> int:
+    """
+    Обработка ожидающих отправки уведомлений.
+    Очередь вычитывается постранично по курсору (created_at, id) до конца.
+    Пока отправляется страница, загружается следующая и оценивается глубина
+    оставшейся очереди; по ней и по итогам отправки batch_controller подбирает
+    размер следующей страницы и параллелизм отправки, и загруженная страница
+    обрезается или догружается до этого размера.
 
-        if not user:
-            await message.answer(
-                "Ваш аккаунт не привязан к боту. Отправьте /start для привязки."
-            )
-            return
+    Args:
+        bot: Объект бота Telegram
 
-        await message.answer("Ищем ваши приглашения...")
+    Returns:
+        Количество обработанных уведомлений
+    """
+    processed = 0
+    next_page = None
+    backlog = None
+    loop = asyncio.get_running_loop()
 
-        try:
-            # Если user это словарь, используем user['id'], иначе user.id
-            user_id = user['id'] if isinstance(user, dict) else user.id
+    try:
+        # Неактуальные и просроченные уведомления закрываются до выборки очереди
+        superseded = await loop.run_in_executor(None, NotificationRepository.supersede_queued)
+        if superseded:
+            logger.info(f"Отменено {superseded} неактуальных уведомлений")
+        expired = await loop.run_in_executor(None, NotificationRepository.close_expired_notifications)
+        if expired:
+            logger.info(f"Закрыто {expired} просроченных уведомлений")
+
+        limit = batch_controller.batch_size
+        page = await fetch_pending_page(limit)
+
+        while page:
+            # Неполная страница означает, что очередь закончилась
+            full = len(page) == limit
+            if full:
+                # Следующая страница и глубина очереди загружаются параллельно с отправкой текущей
+                last = page[-1]
+                cursor = (last.created_at, last.id)
+                next_page = asyncio.ensure_future(fetch_pending_page(limit, cursor))
+                backlog = asyncio.ensure_future(count_pending(cursor, batch_controller.max_batch + 1))
+
+            await send_page(bot, page)
+            processed += len(page)
+
+            if not full:
+                batch_controller.adjust(0)
+                break
+
+            prefetched = await next_page
+            remaining = await backlog
+            next_page = backlog = None
+            batch_controller.adjust(remaining)
+
+            # Загруженная заранее страница приводится к размеру после подстройки:
+            # лишние записи войдут в следующую страницу, недостающие догружаются
+            new_limit = batch_controller.batch_size
+            if len(prefetched) > new_limit:
+                prefetched = prefetched[:new_limit]
+            elif len(prefetched) == limit and new_limit > limit:
+                tail = prefetched[-1]
+                prefetched += await fetch_pending_page(new_limit - limit, (tail.created_at, tail.id))
+            page, limit = prefetched, new_limit
+
+        if processed:
+            logger.info(f"Обработано {processed} неотправленных уведомлений")
 
-            # Получаем список приглашений пользователя через API
-            invitations = await api_client.get_user_invitations(user_id)
+    except Exception as e:
+        logger.error(f"Ошибка при обработке неотправленных уведомлений: {e}")
+    finally:
+        for future in (next_page, backlog):
+            if future is not None:
+                future.cancel()
 
-            if not invitations:
-                await message.answer("У вас нет активных приглашений.")
-                return
+    return processed
 
-            # Сообщаем о количестве найденных приглашений
-            await message.answer(f"📨 Найдено {len(invitations)} приглашений:")
 
-            for invitation in invitations:
-                try:
-                    if invitation['type'] == 'team':
-                        # Создаем клавиатуру для этого приглашения
-                        markup = get_invitation_keyboard(invitation['invitation_id'], "team")
-
-                        # Отправляем сообщение
-                        await message.answer(
-                            TEAM_INVITATION_MESSAGE.format(
-                                team_name=invitation.get('team_name', ''),
-                                sport_type=invitation.get('sport', ''),
-                                captain_name=invitation.get('inviter_name', '')
-                            ),
-                            reply_markup=markup
-                        )
-                    elif invitation['type'] == 'committee':
-                        # Создаем клавиатуру для этого приглашения
-                        markup = get_invitation_keyboard(invitation['invitation_id'], "committee")
-
-                        # Отправляем сообщение
-                        await message.answer(
-                            COMMITTEE_INVITATION_MESSAGE.format(
-                                committee_name=invitation.get('committee_name', ''),
-                                inviter_name=invitation.get('inviter_name', '')
-                            ),
-                            reply_markup=markup
-                        )
-                except Exception as e:
-                    logger.error(f"Ошибка при обработке приглашения: {e}")
-
-        except Exception as e:
-            logger.error(f"Ошибка при получении приглашений пользователя {telegram_id}: {e}")
-            await message.answer(
-                "Произошла ошибка при получении информации о приглашениях. Пожалуйста, попробуйте позже."
-            )
\ No newline at end of file
+def register_notification_handlers(dp: Dispatcher):
+    """
+    Регистрация обработчиков для колбэков от уведомлений
+
+    Args:
+        dp: Диспетчер Aiogram
+    """
+    global api_client
+    api_client = ApiClient()
+
+    logger.info("Регистрация обработчиков для уведомлений")
@@ -7,21 +7,23 @@ from aiogram.dispatcher.filters.state import State, StatesGroup
 from utils.logger import get_logger
 from database.repositories.user_repository import UserRepository
 from api.client import ApiClient
+from utils.phone import normalize_phone
 from bot.messages.templates import (
     WELCOME_MESSAGE,
     PHONE_LINKED_MESSAGE,
     PHONE_NOT_FOUND_MESSAGE,
     PHONE_LINK_ERROR_MESSAGE,
-    INVALID_PHONE_FORMAT_MESSAGE,
-    TEAM_INVITATION_MESSAGE,  # Добавить импорт
-    COMMITTEE_INVITATION_MESSAGE  # Добавить импорт
+    INVALID_PHONE_FORMAT_MESSAGE
 )
 from bot.keyboards.keyboards import (
     get_phone_keyboard,
     get_start_keyboard,
-    get_help_keyboard,
-    get_invitation_keyboard  # Добавить импорт
+    get_help_keyboard
 )
+from bot.routing import callback_router, text_router
+from bot.keyboards.callback_data import CallbackAction
+from bot.pagination import LIST_VIEWS, send_list, turn_page
+from bot.details import TEAM_PAGE, cached_page, get_page
 
 logger = get_logger("user_handler")
 
@@ -38,6 +40,36 @@ PHONE_REGEX = r'^(\+7|7|8)[0-9]{10}$'
 api_client = None
 
 
+async def show_user_list(message: types.Message, api: ApiClient, view_code: str):
+    """
+    Отправка первой страницы списка пользователя
+
+    Args:
+        message: Сообщение от пользователя
+        api: Клиент API
+        view_code: Код списка
+    """
+    user = UserRepository.get_by_telegram_id(str(message.from_user.id))
+    if not user:
+        await message.answer(
+            "Ваш аккаунт не привязан к боту. Отправьте /start для привязки."
+        )
+        return
+
+    user_id = user.get('id')
+    if not user_id:
+        await message.answer(
+            "Не удалось определить ID пользователя. Пожалуйста, попробуйте заново привязать аккаунт, отправив /start."
+        )
+        return
+
+    try:
+        await send_list(message, api, view_code, user_id)
+    except Exception as e:
+        logger.error(f"Ошибка при получении списка {view_code} пользователя {user_id}: {e}")
+        await message.answer(LIST_VIEWS[view_code].error_text, reply_markup=get_start_keyboard())
+
+
 def register_user_handlers(dp: Dispatcher):
     """
     Регистрация обработчиков команд пользователя
@@ -87,12 +119,11 @@ def register_user_handlers(dp: Dispatcher):
             message: Сообщение с контактом от пользователя
             state: Состояние конечного автомата
         """
-        # Получаем номер телефона из контакта
-        phone_number = message.contact.phone_number
-
-        # Форматируем номер телефона
-        if phone_number.startswith('+'):
-            phone_number = phone_number[1:]  # Убираем плюс
+        # Получаем номер телефона из контакта и приводим к формату E.164
+        phone_number = normalize_phone(message.contact.phone_number)
+        if not phone_number:
+            await message.answer(INVALID_PHONE_FORMAT_MESSAGE)
+            return
 
         # Проверяем, зарегистрирован ли пользователь с таким номером телефона
         await process_phone_number(message, phone_number, state)
@@ -115,17 +146,14 @@ def register_user_handlers(dp: Dispatcher):
             await message.answer(INVALID_PHONE_FORMAT_MESSAGE)
             return
 
-        # Форматируем номер телефона
-        if phone_number.startswith('+'):
-            phone_number = phone_number[1:]  # Убираем плюс
-        elif phone_number.startswith('8'):
-            phone_number = '7' + phone_number[1:]  # Заменяем 8 на 7
+        # Приводим номер телефона к формату E.164
+        phone_number = normalize_phone(phone_number)
 
         # Проверяем, зарегистрирован ли пользователь с таким номером телефона
         await process_phone_number(message, phone_number, state)
 
     @dp.message_handler(commands=['help'])
-    @dp.message_handler(lambda message: message.text == "Помощь")
+    @text_router.label("Помощь")
     async def cmd_help(message: types.Message):
         """
         Обработчик команды /help
@@ -140,7 +168,7 @@ def register_user_handlers(dp: Dispatcher):
 
         print("Отправлено меню помощи с клавиатурой")
 
-    @dp.message_handler(lambda message: message.text == "Мои матчи")
+    @text_router.label("Мои матчи")
     async def my_matches(message: types.Message):
         """
         Обработчик запроса информации о предстоящих матчах
@@ -148,53 +176,10 @@ def register_user_handlers(dp: Dispatcher):
         Args:
             message: Сообщение от пользователя
         """
-        user = UserRepository.get_by_telegram_id(str(message.from_user.id))
-        if not user:
-            await message.answer(
-                "Ваш аккаунт не привязан к боту. Отправьте /start для привязки."
-            )
-            return
-
-        try:
-            # Получаем ID пользователя
-            user_id = user.id if hasattr(user, 'id') else user.get('id')
-
-            if not user_id:
-                await message.answer(
-                    "Не удалось определить ID пользователя. Пожалуйста, попробуйте заново привязать аккаунт, отправив /start."
-                )
-                return
-
-            # Получаем список матчей пользователя через API
-            matches = await api_client.get_user_matches(user_id, status="upcoming")
-
-            if not matches:
-                await message.answer("У вас нет предстоящих матчей.")
-                return
-
-            # Формируем сообщение с информацией о матчах
-            response = "📅 Ваши предстоящие матчи:\n\n"
-
-            for match in matches:
-                response += f"🏆 *{match['tournament_name']}*\n"
-                response += f"🆚 Соперник: {match['opponent_name']}\n"
-                response += f"📍 Место: {match['location_name']}\n"
-                response += f"📆 Дата: {match['date']} в {match['time']}\n\n"
-
-            # Отправляем сообщение с форматированием Markdown
-            await message.answer(response, parse_mode="Markdown")
-
-        except Exception as e:
-            # Безопасное логирование
-            user_id_str = str(user.id if hasattr(user, 'id') else user.get('id', 'unknown'))
-            logger.error(f"Ошибка при получении матчей пользователя {user_id_str}: {e}")
-
-            await message.answer(
-                "Произошла ошибка при получении информации о матчах. Пожалуйста, попробуйте позже."
-            )
+        await show_user_list(message, api_client, "m")
 
     @dp.message_handler(commands=['invitations'])
-    @dp.message_handler(lambda message: message.text == "Приглашения")
+    @text_router.label("Приглашения")
     async def my_invitations(message: types.Message):
         """
         Обработчик запроса информации о приглашениях пользователя
@@ -202,67 +187,9 @@ def register_user_handlers(dp: Dispatcher):
         Args:
             message: Сообщение от пользователя
         """
-        telegram_id = str(message.from_user.id)
-        user = UserRepository.get_by_telegram_id(telegram_id)
-
-        if not user:
-            await message.answer(
-                "Ваш аккаунт не привязан к боту. Отправьте /start для привязки."
-            )
-            return
-
-        await message.answer("Ищем ваши приглашения...")
-
-        try:
-            # Если user это словарь, используем user['id'], иначе user.id
-            user_id = user['id'] if isinstance(user, dict) else user.id
-
-            # Получаем список приглашений пользователя через API
-            invitations = await api_client.get_user_invitations(user_id)
-
-            if not invitations:
-                await message.answer("У вас нет активных приглашений.")
-                return
-
-            # Сообщаем о количестве найденных приглашений
-            await message.answer(f"📨 Найдено {len(invitations)} приглашений:")
-
-            for invitation in invitations:
-                if invitation['type'] == 'team':
-                    # Создаем клавиатуру для этого приглашения
-                    markup = get_invitation_keyboard(invitation['invitation_id'], "team")
-
-                    # Отправляем отдельное сообщение для каждого приглашения в команду
-                    await message.answer(
-                        TEAM_INVITATION_MESSAGE.format(
-                            team_name=invitation.get('team_name', ''),
-                            sport_type=invitation.get('sport', ''),
-                            captain_name=invitation.get('inviter_name', '')
-                        ),
-                        reply_markup=markup,
-                        parse_mode="Markdown"  # Используем Markdown для форматирования
-                    )
-                elif invitation['type'] == 'committee':
-                    # Создаем клавиатуру для этого приглашения
-                    markup = get_invitation_keyboard(invitation['invitation_id'], "committee")
-
-                    # Отправляем отдельное сообщение для каждого приглашения в оргкомитет
-                    await message.answer(
-                        COMMITTEE_INVITATION_MESSAGE.format(
-                            committee_name=invitation.get('committee_name', ''),
-                            inviter_name=invitation.get('inviter_name', '')
-                        ),
-                        reply_markup=markup,
-                        parse_mode="Markdown"  # Используем Markdown для форматирования
-                    )
+        await show_user_list(message, api_client, "i")
 
-        except Exception as e:
-            logger.error(f"Ошибка при получении приглашений пользователя {telegram_id}: {e}")
-            await message.answer(
-                "Произошла ошибка при получении информации о приглашениях. Пожалуйста, попробуйте позже."
-            )
-
-    @dp.message_handler(lambda message: message.text == "Мои чемпионаты")
+    @text_router.label("Мои чемпионаты")
     async def my_championships(message: types.Message):
         """
         Обработчик запроса информации о чемпионатах пользователя
@@ -270,66 +197,9 @@ def register_user_handlers(dp: Dispatcher):
         Args:
             message: Сообщение от пользователя
         """
-        user = UserRepository.get_by_telegram_id(str(message.from_user.id))
-        if not user:
-            await message.answer(
-                "Ваш аккаунт не привязан к боту. Отправьте /start для привязки."
-            )
-            return
-
-        try:
-            # Получаем ID пользователя
-            user_id = user.id if hasattr(user, 'id') else user.get('id')
-
-            if not user_id:
-                await message.answer(
-                    "Не удалось определить ID пользователя. Пожалуйста, попробуйте заново привязать аккаунт, отправив /start."
-                )
-                return
-
-            # Получаем список чемпионатов пользователя через API
-            championships = await api_client.get_user_championships(user_id)
-
-            if not championships:
-                await message.answer("Вы не участвуете ни в одном чемпионате.")
-                return
-
-            # Формируем сообщение с информацией о чемпионатах
-            response = "🏆 Ваши чемпионаты:\n\n"
-
-            for championship in championships:
-                response += f"*{championship['name']}*\n"
-                response += f"⚽ Вид спорта: {championship['sport']}\n"
-                response += f"🌆 Город: {championship['city']}\n"
-
-                if championship['status'] == "active":
-                    status = "Активный"
-                elif championship['status'] == "past":
-                    status = "Завершен"
-                else:
-                    status = "Неизвестно"
-
-                response += f"📊 Статус: {status}\n"
-
-                if 'position' in championship and championship['position']:
-                    response += f"🏅 Позиция: {championship['position']}\n"
-
-                response += "\n"
-
-            # Отправляем сообщение с форматированием Markdown
-            await message.answer(response, parse_mode="Markdown")
-
-        except Exception as e:
-            # Безопасное логирование
-            user_id_str = str(user.id if hasattr(user, 'id') else user.get('id', 'unknown'))
-            logger.error(f"Ошибка при получении чемпионатов пользователя {user_id_str}: {e}")
-
-            await message.answer(
-                "Произошла ошибка при получении информации о чемпионатах. Пожалуйста, попробуйте позже."
-            )
+        await show_user_list(message, api_client, "c")
 
-    # Обновленный обработчик запроса "Мои команды"
-    @dp.message_handler(lambda message: message.text == "Мои команды")
+    @text_router.label("Мои команды")
     async def my_teams(message: types.Message):
         """
         Обработчик запроса информации о командах пользователя
@@ -337,55 +207,30 @@ def register_user_handlers(dp: Dispatcher):
         Args:
             message: Сообщение от пользователя
         """
-        user = UserRepository.get_by_telegram_id(str(message.from_user.id))
-        if not user:
-            await message.answer(
-                "Ваш аккаунт не привязан к боту. Отправьте /start для привязки."
-            )
-            return
-
-        try:
-            # Получаем список команд пользователя через API
-            user_id = user.id if hasattr(user, 'id') else user['id'] if isinstance(user,
-                                                                                   dict) and 'id' in user else None
-            if user_id is None:
-                raise ValueError("Не удалось определить ID пользователя")
-
-            teams = await api_client.get_user_teams(user_id)
-
-            if not teams:
-                await message.answer("Вы не состоите ни в одной команде.")
-                return
-
-            # Формируем сообщение с информацией о командах
-            response = "👥 Ваши команды:\n\n"
-
-            for team in teams:
-                response += f"<b>{team.get('name', 'Без названия')}</b>\n"
-                response += f"⚽ Вид спорта: {team.get('sport', 'Не указан')}\n"
-
-                if team.get('is_captain', False):
-                    response += "👑 Вы капитан этой команды\n"
+        await show_user_list(message, api_client, "t")
 
-                # Добавляем команду для просмотра деталей с правильным ID
-                team_id = team.get('id', team.get('team_id', ''))
-                if team_id:
-                    response += f"Для просмотра подробной информации: /team_{team_id}\n"
-
-                response += "\n"
-
-            # Добавляем инструкцию с правильным форматом команды
-            response += "Чтобы просмотреть подробную информацию о команде, отправьте /team_ID (например, /team_123)"
+    # Обработчик листания постраничных списков
+    @callback_router.register(CallbackAction.LIST_PAGE)
+    async def list_page_callback(callback_query: types.CallbackQuery, view_code: str, page: int):
+        """
+        Обработчик кнопок "Назад" и "Вперед" постраничного списка
 
-            # Отправляем сообщение с форматированием HTML
-            await message.answer(response, parse_mode="HTML")
+        Args:
+            callback_query: Запрос от кнопки
+            view_code: Код списка
+            page: Номер страницы (с нуля)
+        """
+        user = UserRepository.get_by_telegram_id(str(callback_query.from_user.id))
+        user_id = user.get('id') if user else None
+        if not user_id:
+            await callback_query.answer("Ваш аккаунт не привязан к боту. Отправьте /start для привязки.", show_alert=True)
+            return
 
+        try:
+            await turn_page(callback_query, api_client, view_code, page, user_id)
         except Exception as e:
-            logger.error(f"Ошибка при получении команд пользователя: {e}")
-            await message.answer(
-                "Произошла ошибка при получении информации о командах. Пожалуйста, попробуйте позже.",
-                reply_markup=get_start_keyboard()
-            )
+            logger.error(f"Ошибка при листании списка {view_code} пользователя {user_id}: {e}")
+            await callback_query.answer("Произошла ошибка. Пожалуйста, попробуйте позже.", show_alert=True)
 
     # Обработчик команды изменения номера телефона
     @dp.message_handler(commands=['changephone'])
@@ -417,9 +262,9 @@ def register_user_handlers(dp: Dispatcher):
             user = UserRepository.get_by_phone(phone_number)
 
             if user:
-                # Получаем имя и фамилию пользователя безопасно
-                first_name = user.first_name if hasattr(user, 'first_name') else user.get('first_name', 'Пользователь')
-                last_name = user.last_name if hasattr(user, 'last_name') else user.get('last_name', '')
+                # Репозиторий возвращает словарь с данными пользователя
+                first_name = user.get('first_name', 'Пользователь')
+                last_name = user.get('last_name', '')
 
                 # Обновляем Telegram ID пользователя
                 success = UserRepository.update_telegram_id(phone_number, str(message.from_user.id))
@@ -456,10 +301,9 @@ def register_user_handlers(dp: Dispatcher):
 
                     # Проверяем результат создания пользователя
                     if user:
-                        # Получаем имя и фамилию пользователя безопасно
-                        first_name = user.first_name if hasattr(user, 'first_name') else user.get('first_name',
-                                                                                                  'Пользователь')
-                        last_name = user.last_name if hasattr(user, 'last_name') else user.get('last_name', '')
+                        # Репозиторий возвращает словарь с данными пользователя
+                        first_name = user.get('first_name', 'Пользователь')
+                        last_name = user.get('last_name', '')
 
                         # Отправляем сообщение об успешной привязке
                         await message.answer(
@@ -493,13 +337,14 @@ def register_user_handlers(dp: Dispatcher):
             )
 
     # Обработчик для команды /team_ID и /teamID
-    @dp.message_handler(lambda message: re.match(r'/team_?\d+', message.text))
-    async def team_details(message: types.Message):
+    @text_router.pattern(r'/team_?(\d+)')
+    async def team_details(message: types.Message, match: re.Match):
         """
         Обработчик запроса информации о конкретной команде
 
         Args:
             message: Сообщение от пользователя
+            match: Результат сопоставления команды с шаблоном
         """
         user = UserRepository.get_by_telegram_id(str(message.from_user.id))
         if not user:
@@ -509,55 +354,21 @@ def register_user_handlers(dp: Dispatcher):
             return
 
         try:
-            # Сообщаем пользователю, что идет загрузка данных
-            wait_message = await message.answer("Загружаем информацию о команде...")
-
-            # Извлекаем ID команды из команды (поддержка обоих форматов /team_ID и /teamID)
-            command_text = message.text
-            if '_' in command_text:
-                team_id = int(command_text.split('_')[1])
-            else:
-                # Формат /teamXXX без подчеркивания
-                team_id = int(command_text[5:])
-
-            # Получаем ID пользователя
-            user_id = user.id if hasattr(user, 'id') else user['id'] if isinstance(user,
-                                                                                   dict) and 'id' in user else None
-            if user_id is None:
-                raise ValueError("Не удалось определить ID пользователя")
-
-            # Получаем детальную информацию о команде через API
-            team = await api_client.get_team_details(team_id)
+            # ID команды из команды (поддерживаются оба формата /team_ID и /teamID)
+            team_id = int(match.group(1))
+
+            # Страница общая для всех пользователей и, если она актуальна, берется из кэша
+            response = cached_page(TEAM_PAGE, team_id)
+            if response is None:
+                # Сообщаем пользователю, что идет загрузка данных
+                await message.answer("Загружаем информацию о команде...")
+                response = await get_page(api_client, TEAM_PAGE, team_id)
 
             # Проверяем, получены ли данные
-            if not team or not isinstance(team, dict):
+            if response is None:
                 await message.answer("Команда не найдена или у вас нет доступа к ней.")
                 return
 
-            # Подготовка данных
-            name = team.get('name', 'Без названия')
-            sport = team.get('sport', 'Не указан')
-            count_member = team.get('count_member', 0)
-            wins = team.get('wins', 0)
-            loss = team.get('loss', 0)
-            members = team.get('members', [])
-
-            # Формируем ответ в формате HTML
-            response = f"👥 <b>{name}</b>\n\n"
-            response += f"⚽ Вид спорта: {sport}\n"
-            response += f"👨‍👩‍👧‍👦 Участников: {count_member}\n"
-            response += f"🏆 Побед: {wins}\n"
-            response += f"❌ Поражений: {loss}\n\n"
-
-            # Список участников команды
-            if members:
-                response += "<b>Состав команды:</b>\n"
-                for member in members:
-                    member_name = f"{member.get('first_name', '')} {member.get('last_name', '')}"
-                    if member.get('is_captain', False):
-                        member_name += " 👑"
-                    response += f"- {member_name}\n"
-
             # Отправляем сообщение с форматированием HTML
             await message.answer(response, parse_mode="HTML")
 
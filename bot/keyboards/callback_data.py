@@ -0,0 +1,136 @@
+"""
+Формат данных инлайн-кнопок
+
+Данные кнопки имеют вид "<версия>:<код действия>:<аргумент>:...", например
+"1:at:42" — принятие приглашения в команду 42. Код действия определяет
+количество и типы аргументов, поэтому обработчик получает уже разобранные
+значения. Кнопки в ранее отправленных сообщениях содержат данные старого
+формата ("accept_team_42", "about") и продолжают распознаваться.
+"""
+import enum
+from typing import Dict, NamedTuple, Optional, Tuple
+
+CALLBACK_VERSION = "1"
+CALLBACK_SEPARATOR = ":"
+
+# Ограничение Telegram на размер данных кнопки (в байтах)
+MAX_CALLBACK_DATA_LENGTH = 64
+
+
+class CallbackAction(enum.Enum):
+    HELP_ABOUT = "about"                                  # О боте
+    HELP_TYPES = "types"                                  # Типы уведомлений
+    HELP_PHONE = "phone"                                  # Как привязать другой номер
+    HELP_SUPPORT = "support"                              # Связаться с поддержкой
+    ACCEPT_TEAM_INVITATION = "at"                         # Принятие приглашения в команду
+    DECLINE_TEAM_INVITATION = "dt"                        # Отклонение приглашения в команду
+    ACCEPT_COMMITTEE_INVITATION = "ac"                    # Принятие приглашения в оргкомитет
+    DECLINE_COMMITTEE_INVITATION = "dc"                   # Отклонение приглашения в оргкомитет
+    DECLINE_MATCH = "dm"                                  # Отказ от участия в матче
+    LIST_PAGE = "lp"                                      # Страница списка
+
+
+# Типы аргументов каждого действия
+CALLBACK_ARGUMENTS: Dict[CallbackAction, Tuple[type, ...]] = {
+    CallbackAction.HELP_ABOUT: (),
+    CallbackAction.HELP_TYPES: (),
+    CallbackAction.HELP_PHONE: (),
+    CallbackAction.HELP_SUPPORT: (),
+    CallbackAction.ACCEPT_TEAM_INVITATION: (int,),                 # ID приглашения
+    CallbackAction.DECLINE_TEAM_INVITATION: (int,),                # ID приглашения
+    CallbackAction.ACCEPT_COMMITTEE_INVITATION: (int,),            # ID приглашения
+    CallbackAction.DECLINE_COMMITTEE_INVITATION: (int,),           # ID приглашения
+    CallbackAction.DECLINE_MATCH: (int, int),                      # ID матча, ID команды
+    CallbackAction.LIST_PAGE: (str, int),                          # Код списка, номер страницы
+}
+
+# Префиксы данных старого формата ("<префикс>_<аргумент>_...")
+LEGACY_PREFIXES: Dict[str, CallbackAction] = {
+    "about": CallbackAction.HELP_ABOUT,
+    "types": CallbackAction.HELP_TYPES,
+    "phone": CallbackAction.HELP_PHONE,
+    "support": CallbackAction.HELP_SUPPORT,
+    "accept_team": CallbackAction.ACCEPT_TEAM_INVITATION,
+    "decline_team": CallbackAction.DECLINE_TEAM_INVITATION,
+    "accept_committee": CallbackAction.ACCEPT_COMMITTEE_INVITATION,
+    "decline_committee": CallbackAction.DECLINE_COMMITTEE_INVITATION,
+    "decline_match": CallbackAction.DECLINE_MATCH,
+}
+
+_ACTIONS_BY_CODE: Dict[str, CallbackAction] = {action.value: action for action in CallbackAction}
+
+
+class DecodedCallback(NamedTuple):
+    action: CallbackAction
+    args: Tuple
+
+
+def encode_callback(action: CallbackAction, *args) -> str:
+    """
+    Формирование данных инлайн-кнопки
+
+    Args:
+        action: Действие
+        args: Аргументы действия
+
+    Returns:
+        Данные кнопки
+
+    Raises:
+        ValueError: Если аргументы не соответствуют действию или данные слишком длинные
+    """
+    arg_types = CALLBACK_ARGUMENTS[action]
+    if len(args) != len(arg_types):
+        raise ValueError(f"Действие {action.name} ожидает {len(arg_types)} аргументов, передано {len(args)}")
+
+    data = CALLBACK_SEPARATOR.join((CALLBACK_VERSION, action.value) + tuple(str(arg) for arg in args))
+    if len(data.encode("utf-8")) > MAX_CALLBACK_DATA_LENGTH:
+        raise ValueError(f"Данные кнопки длиннее {MAX_CALLBACK_DATA_LENGTH} байт: {data}")
+    return data
+
+
+def _convert(action: CallbackAction, raw_args) -> Optional[DecodedCallback]:
+    """
+    Приведение аргументов к типам действия
+
+    Args:
+        action: Действие
+        raw_args: Аргументы в виде строк
+
+    Returns:
+        Разобранные данные или None, если аргументы не подходят
+    """
+    arg_types = CALLBACK_ARGUMENTS[action]
+    if len(raw_args) != len(arg_types):
+        return None
+    try:
+        return DecodedCallback(action, tuple(arg_type(arg) for arg_type, arg in zip(arg_types, raw_args)))
+    except ValueError:
+        return None
+
+
+def decode_callback(data: Optional[str]) -> Optional[DecodedCallback]:
+    """
+    Разбор данных инлайн-кнопки текущего или старого формата
+
+    Args:
+        data: Данные кнопки
+
+    Returns:
+        Разобранные данные или None, если данные не распознаны
+    """
+    if not data:
+        return None
+
+    parts = data.split(CALLBACK_SEPARATOR)
+    if len(parts) >= 2 and parts[0] == CALLBACK_VERSION:
+        action = _ACTIONS_BY_CODE.get(parts[1])
+        return _convert(action, parts[2:]) if action else None
+
+    # Старый формат: префикс из слов, затем числовые аргументы
+    parts = data.split("_")
+    split_at = len(parts)
+    while split_at > 0 and parts[split_at - 1].isdigit():
+        split_at -= 1
+    action = LEGACY_PREFIXES.get("_".join(parts[:split_at]))
+    return _convert(action, parts[split_at:]) if action else None
@@ -1,5 +1,13 @@
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 
+from bot.keyboards.callback_data import CallbackAction, encode_callback
+
+# Действия кнопок ответа на приглашение по типу приглашения
+INVITATION_ACTIONS = {
+    "team": (CallbackAction.ACCEPT_TEAM_INVITATION, CallbackAction.DECLINE_TEAM_INVITATION),
+    "committee": (CallbackAction.ACCEPT_COMMITTEE_INVITATION, CallbackAction.DECLINE_COMMITTEE_INVITATION),
+}
+
 def get_phone_keyboard() -> ReplyKeyboardMarkup:
     """
     Клавиатура для запроса номера телефона
@@ -11,20 +19,6 @@ def get_phone_keyboard() -> ReplyKeyboardMarkup:
     keyboard.add(KeyboardButton("Отправить номер телефона", request_contact=True))
     return keyboard
 
-def get_start_keyboard() -> ReplyKeyboardMarkup:
-    """
-    Основная клавиатура для работы с ботом
-
-    Returns:
-        ReplyKeyboardMarkup: Основная клавиатура с кнопками меню
-    """
-    keyboard = ReplyKeyboardMarkup(resize_keyboard=True)
-    keyboard.add(KeyboardButton("Мои матчи"))
-    keyboard.add(KeyboardButton("Мои чемпионаты"), KeyboardButton("Мои команды"))
-    keyboard.add(KeyboardButton("Приглашения"))
-    keyboard.add(KeyboardButton("Помощь"))
-    return keyboard
-
 def get_help_keyboard() -> InlineKeyboardMarkup:
     """
     Клавиатура для меню помощи
@@ -34,10 +28,10 @@ def get_help_keyboard() -> InlineKeyboardMarkup:
     """
     keyboard = InlineKeyboardMarkup(row_width=1)
     keyboard.add(
-        InlineKeyboardButton("О боте", callback_data="about"),
-        InlineKeyboardButton("Типы уведомлений", callback_data="types"),
-        InlineKeyboardButton("Как привязать другой номер", callback_data="phone"),
-        InlineKeyboardButton("Связаться с поддержкой", callback_data="support")
+        InlineKeyboardButton("О боте", callback_data=encode_callback(CallbackAction.HELP_ABOUT)),
+        InlineKeyboardButton("Типы уведомлений", callback_data=encode_callback(CallbackAction.HELP_TYPES)),
+        InlineKeyboardButton("Как привязать другой номер", callback_data=encode_callback(CallbackAction.HELP_PHONE)),
+        InlineKeyboardButton("Связаться с поддержкой", callback_data=encode_callback(CallbackAction.HELP_SUPPORT))
     )
     return keyboard
 
@@ -52,10 +46,11 @@ def get_invitation_keyboard(invitation_id: int, invitation_type: str) -> InlineK
     Returns:
         InlineKeyboardMarkup: Клавиатура с кнопками принятия или отказа от приглашения
     """
+    accept_action, decline_action = INVITATION_ACTIONS[invitation_type]
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton("Принять", callback_data=f"accept_{invitation_type}_{invitation_id}"),
-        InlineKeyboardButton("Отклонить", callback_data=f"decline_{invitation_type}_{invitation_id}")
+        InlineKeyboardButton("Принять", callback_data=encode_callback(accept_action, invitation_id)),
+        InlineKeyboardButton("Отклонить", callback_data=encode_callback(decline_action, invitation_id))
     )
     return keyboard
 
@@ -74,52 +69,7 @@ def get_match_actions_keyboard(match_id: int, team_id: int) -> InlineKeyboardMar
     """
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton("Отклонить участие", callback_data=f"decline_match_{match_id}_{team_id}")
-    )
-    return keyboard
-
-
-def get_team_menu_keyboard() -> ReplyKeyboardMarkup:
-    """
-    Расширенная клавиатура для работы с командами
-
-    Returns:
-        ReplyKeyboardMarkup: Клавиатура с кнопками меню команд
-    """
-    keyboard = ReplyKeyboardMarkup(resize_keyboard=True)
-    keyboard.add(KeyboardButton("Мои команды"))
-    keyboard.add(KeyboardButton("Приглашения"), KeyboardButton("Мои матчи"))
-    keyboard.add(KeyboardButton("Главное меню"))
-    return keyboard
-
-
-def get_championship_menu_keyboard() -> ReplyKeyboardMarkup:
-    """
-    Клавиатура для работы с чемпионатами
-
-    Returns:
-        ReplyKeyboardMarkup: Клавиатура с кнопками меню чемпионатов
-    """
-    keyboard = ReplyKeyboardMarkup(resize_keyboard=True)
-    keyboard.add(KeyboardButton("Мои чемпионаты"))
-    keyboard.add(KeyboardButton("Рекомендуемые чемпионаты"))
-    keyboard.add(KeyboardButton("Главное меню"))
-    return keyboard
-
-def get_match_actions_keyboard(match_id: int, team_id: int) -> InlineKeyboardMarkup:
-    """
-    Клавиатура для действий с матчем
-
-    Args:
-        match_id: ID матча
-        team_id: ID команды пользователя
-
-    Returns:
-        InlineKeyboardMarkup: Клавиатура с действиями для матча
-    """
-    keyboard = InlineKeyboardMarkup(row_width=2)
-    keyboard.add(
-        InlineKeyboardButton("Отклонить участие", callback_data=f"decline_match_{match_id}_{team_id}")
+        InlineKeyboardButton("Отклонить участие", callback_data=encode_callback(CallbackAction.DECLINE_MATCH, match_id, team_id))
     )
     return keyboard
 
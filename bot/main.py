@@ -5,7 +5,15 @@ import datetime
 from aiogram import Bot, Dispatcher, executor
 from aiogram.contrib.fsm_storage.memory import MemoryStorage
 
-from config.config import TELEGRAM_BOT_TOKEN
+from config.config import (
+    TELEGRAM_BOT_TOKEN,
+    NOTIFICATIONS_RETENTION_DAYS,
+    NOTIFICATION_PARTITIONS_AHEAD,
+    USER_SYNC_BATCH_SIZE,
+    USER_SYNC_HOUR,
+    REMINDER_BATCH_SIZE,
+    OUTBOX_IDLE_INTERVAL
+)
 from utils.logger import setup_logger
 from database.connection import init_db
 from bot.handlers.user import register_user_handlers
@@ -13,8 +21,13 @@ from bot.handlers.notification import register_notification_handlers, process_pe
 from bot.handlers.match import register_match_handlers
 from bot.handlers.championship import register_championship_handlers
 from bot.handlers.callback_handlers import register_callback_handlers
+from bot.routing import callback_router, text_router
 
 from database.repositories.notification_repository import NotificationRepository
+from database.repositories.user_repository import UserRepository
+from database.partitions import ensure_partitions, drop_expired_partitions
+from bot.delivery.outbox_worker import process_outbox, wait_for_entries
+from api.client import ApiClient
 
 # Настройка логирования
 logger = setup_logger("bot")
@@ -25,7 +38,9 @@ storage = MemoryStorage()
 dp = Dispatcher(bot, storage=storage)
 
 # Регистрация обработчиков
-register_callback_handlers(dp)  # Важно: регистрируем первыми для приоритетной обработки колбэков
+callback_router.install(dp)  # Единый обработчик инлайн-кнопок, действия регистрируются в маршрутизаторе
+text_router.install(dp)  # Единый обработчик кнопок меню и команд с параметрами
+register_callback_handlers(dp)
 register_user_handlers(dp)
 register_notification_handlers(dp)
 register_match_handlers(dp)
@@ -34,30 +49,189 @@ register_championship_handlers(dp)
 # Флаг для контроля фоновых задач
 background_tasks_running = False
 
+# Даты последнего запуска ежедневных задач
+daily_tasks_last_run = {}
+
+
+def is_daily_task_due(name: str, hour: int, now: datetime.datetime) -> bool:
+    """
+    Проверка, нужно ли запустить ежедневную задачу.
+    Задача запускается один раз в течение указанного часа, даже если
+    вычитывание очереди уведомлений заняло больше минуты.
+
+    Args:
+        name: Имя задачи
+        hour: Час запуска
+        now: Текущее время
+
+    Returns:
+        True, если задачу нужно запустить
+    """
+    if now.hour != hour or daily_tasks_last_run.get(name) == now.date():
+        return False
+    daily_tasks_last_run[name] = now.date()
+    return True
+
+
+async def cleanup_notifications():
+    """
+    Обслуживание таблицы уведомлений: создание секций на следующие месяцы,
+    удаление устаревших секций целиком и порционное удаление оставшихся
+    старых отправленных уведомлений. Запросы выполняются в пуле потоков.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, ensure_partitions, NOTIFICATION_PARTITIONS_AHEAD)
+
+        dropped = await loop.run_in_executor(None, drop_expired_partitions, NOTIFICATIONS_RETENTION_DAYS)
+        if dropped:
+            logger.info(f"Удалены секции уведомлений: {', '.join(dropped)}")
+
+        count = await loop.run_in_executor(
+            None, NotificationRepository.delete_old_sent_notifications, NOTIFICATIONS_RETENTION_DAYS
+        )
+        logger.info(f"Удалено {count} старых уведомлений")
+    except Exception as e:
+        logger.error(f"Ошибка при обслуживании таблицы уведомлений: {e}")
+
+
+async def sync_users():
+    """
+    Синхронизация пользователей с платформой: пользователи запрашиваются
+    у API пачками по USER_SYNC_BATCH_SIZE и записываются в базу одним запросом
+    на пачку, поэтому привязка номера телефона обходится без обращения к API.
+    Запись в базу выполняется в пуле потоков.
+    """
+    loop = asyncio.get_running_loop()
+    api_client = ApiClient()
+    offset = 0
+    synced = 0
+    head = None
+    try:
+        while True:
+            result = await api_client.get_users(USER_SYNC_BATCH_SIZE, offset)
+            if isinstance(result, dict):
+                if "error" in result:
+                    logger.error(f"Ошибка при получении пользователей платформы: {result['error']}")
+                    break
+                result = result.get("items") or []
+            if not result:
+                break
+
+            # API, не поддерживающий offset, возвращает ту же пачку, начиная с первого пользователя
+            if offset == 0:
+                head = result[0]
+            elif result[0] == head:
+                break
+
+            # API, не поддерживающий limit и offset, возвращает всех пользователей сразу
+            for start in range(0, len(result), USER_SYNC_BATCH_SIZE):
+                synced += await loop.run_in_executor(
+                    None, UserRepository.bulk_upsert, result[start:start + USER_SYNC_BATCH_SIZE]
+                )
+
+            if len(result) != USER_SYNC_BATCH_SIZE:
+                break
+            offset += len(result)
+
+        logger.info(f"Синхронизировано {synced} пользователей платформы")
+    except Exception as e:
+        logger.error(f"Ошибка при синхронизации пользователей: {e}")
+
+
+async def create_match_reminders():
+    """
+    Создание напоминаний о матчах, которые состоятся завтра.
+    Матчи запрашиваются у API постранично с фильтром по дате и обрабатываются
+    по мере получения пачками по REMINDER_BATCH_SIZE: команды всех матчей пачки
+    запрашиваются одним вызовом get_teams_details, напоминания записываются
+    в базу в пуле потоков.
+    """
+    loop = asyncio.get_running_loop()
+    api_client = ApiClient()
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    date_from = datetime.datetime.combine(tomorrow, datetime.time.min)
+    date_to = datetime.datetime.combine(tomorrow, datetime.time(23, 59, 59))
+
+    async def create_for_batch(matches) -> int:
+        details = await api_client.get_teams_details(
+            team_id for match in matches for team_id in (match.team1_id, match.team2_id) if team_id is not None
+        )
+        if details.errors:
+            logger.warning(f"Не удалось получить команды: {details.errors}")
+
+        reminders = []
+        for match in matches:
+            team1 = details.teams.get(int(match.team1_id)) if match.team1_id is not None else None
+            team2 = details.teams.get(int(match.team2_id)) if match.team2_id is not None else None
+            if team1 is None or team2 is None:
+                logger.warning(f"Не удалось получить команды матча {match.id}, напоминания не созданы")
+                continue
+            reminders.append((match, team1, team2))
+
+        if not reminders:
+            return 0
+        return await loop.run_in_executor(None, NotificationRepository.create_match_reminders, reminders)
+
+    batch = []
+    created = 0
+    try:
+        async for match in api_client.iter_upcoming_matches(date_from, date_to):
+            batch.append(match)
+            if len(batch) >= REMINDER_BATCH_SIZE:
+                created += await create_for_batch(batch)
+                batch = []
+
+        if batch:
+            created += await create_for_batch(batch)
+
+        logger.info(f"Создано {created} напоминаний о матчах")
+    except Exception as e:
+        logger.error(f"Ошибка при создании напоминаний о матчах (создано {created}): {e}")
+
+
 # Асинхронная функция для периодической проверки уведомлений
 async def check_notifications_periodically():
     while background_tasks_running:
         try:
-            # Проверка и отправка уведомлений
+            # Отправка уведомлений: очередь вычитывается полностью за один вызов
             await process_pending_notifications(bot)
 
             # Создание напоминаний о матчах (раз в день в 12:00)
             now = datetime.datetime.now()
-            if now.hour == 12 and now.minute == 0:
-                count = NotificationRepository.create_match_reminder_notifications()
-                logger.info(f"Создано {count} напоминаний о матчах")
+            if is_daily_task_due("match_reminders", 12, now):
+                asyncio.create_task(create_match_reminders())
 
-            # Удаление старых уведомлений (раз в день в 3:00)
-            if now.hour == 3 and now.minute == 0:
-                count = NotificationRepository.delete_old_sent_notifications(days=30)
-                logger.info(f"Удалено {count} старых уведомлений")
+            # Обслуживание таблицы уведомлений (раз в день в 3:00) выполняется
+            # отдельной задачей, чтобы не останавливать рассылку
+            if is_daily_task_due("cleanup", 3, now):
+                asyncio.create_task(cleanup_notifications())
+
+            # Синхронизация пользователей с платформой (раз в день)
+            if is_daily_task_due("user_sync", USER_SYNC_HOUR, now):
+                asyncio.create_task(sync_users())
 
         except Exception as e:
             logger.error(f"Ошибка при выполнении фоновых задач: {e}")
 
-        # Ждем 10 секунд перед следующей проверкой
+        # Очередь пуста, ждем 10 секунд перед следующей проверкой
         await asyncio.sleep(10)
 
+
+# Асинхронная функция для обработки отложенных вызовов API
+async def process_outbox_periodically():
+    api_client = ApiClient()
+    while background_tasks_running:
+        try:
+            # Пока есть готовые записи, обрабатываем их без паузы
+            if await process_outbox(bot, api_client):
+                continue
+        except Exception as e:
+            logger.error(f"Ошибка при обработке отложенных вызовов API: {e}")
+
+        # Записи этого процесса будят обработчик сразу, интервал нужен для повторов
+        await wait_for_entries(OUTBOX_IDLE_INTERVAL)
+
 async def on_startup(dispatcher):
     """
     Функция, выполняемая при запуске бота
@@ -77,6 +251,12 @@ async def on_startup(dispatcher):
         asyncio.create_task(check_notifications_periodically())
         logger.info("Фоновая задача проверки уведомлений запущена")
 
+        asyncio.create_task(process_outbox_periodically())
+        logger.info("Фоновая задача обработки отложенных вызовов API запущена")
+
+        # Первичная синхронизация пользователей с платформой
+        asyncio.create_task(sync_users())
+
         # Оповещение об успешном запуске бота
         logger.info("Бот успешно запущен")
     except Exception as e:
@@ -0,0 +1,251 @@
+"""
+Реестр рендереров уведомлений
+
+Каждому типу уведомления соответствует предкомпилированный рендерер:
+шаблон разбирается один раз при импорте модуля, а при отправке остается
+только подставить экранированные значения полей из метаданных.
+"""
+import html
+from string import Formatter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from aiogram.types import InlineKeyboardMarkup
+
+from database.models import NotificationType
+from bot.messages.templates import (
+    TEAM_APPLICATION_MESSAGE,
+    APPLICATION_CANCEL_MESSAGE,
+    CHAMPIONSHIP_CANCEL_MESSAGE,
+    NEW_MATCH_MESSAGE,
+    MATCH_RESCHEDULE_MESSAGE,
+    PLAYOFF_RESULT_MESSAGE,
+    MATCH_REMINDER_MESSAGE,
+    NEW_CHAMPIONSHIP_MESSAGE,
+    COMMITTEE_MESSAGE,
+    TEAM_INVITATION_MESSAGE,
+    COMMITTEE_INVITATION_MESSAGE
+)
+from bot.keyboards.keyboards import get_invitation_keyboard
+
+KeyboardFactory = Callable[[Dict[str, Any]], Optional[InlineKeyboardMarkup]]
+
+
+class NotificationRenderer:
+    """
+    Предкомпилированный рендерер шаблона уведомления
+    """
+
+    __slots__ = ("fields", "keyboard_factory", "_parts")
+
+    def __init__(self, template: str, fields: Dict[str, str], keyboard_factory: KeyboardFactory = None):
+        """
+        Args:
+            template: Шаблон сообщения в формате str.format
+            fields: Объявленные поля шаблона и их значения по умолчанию
+            keyboard_factory: Функция построения клавиатуры по метаданным (опционально)
+
+        Raises:
+            ValueError: Если шаблон использует необъявленное поле
+        """
+        self.fields = fields
+        self.keyboard_factory = keyboard_factory
+
+        # Разбиваем шаблон на литералы и имена полей один раз
+        parts = []
+        for literal, field_name, _, _ in Formatter().parse(template):
+            if literal:
+                parts.append((literal, None))
+            if field_name is not None:
+                if field_name not in fields:
+                    raise ValueError(f"Поле {field_name} не объявлено для шаблона")
+                parts.append((None, field_name))
+        self._parts = tuple(parts)
+
+    def _values(self, metadata: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Подготовка экранированных значений полей
+
+        Args:
+            metadata: Метаданные уведомления
+
+        Returns:
+            Словарь значений полей, готовых к подстановке в HTML
+        """
+        values = {}
+        for name, default in self.fields.items():
+            value = metadata.get(name)
+            if value is None:
+                value = default
+            values[name] = html.escape(str(value), quote=False)
+        return values
+
+    def render_text(self, metadata: Dict[str, Any]) -> str:
+        """
+        Формирование текста уведомления
+
+        Args:
+            metadata: Метаданные уведомления
+
+        Returns:
+            Текст сообщения в формате HTML
+        """
+        values = self._values(metadata)
+        return "".join(literal if name is None else values[name] for literal, name in self._parts)
+
+    def render(self, metadata: Dict[str, Any]) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        """
+        Формирование текста и клавиатуры уведомления
+
+        Args:
+            metadata: Метаданные уведомления
+
+        Returns:
+            Кортеж (текст сообщения, клавиатура или None)
+        """
+        markup = self.keyboard_factory(metadata) if self.keyboard_factory else None
+        return self.render_text(metadata), markup
+
+    def render_many(self, metadata_list: Iterable[Dict[str, Any]]) -> List[Tuple[str, Optional[InlineKeyboardMarkup]]]:
+        """
+        Пакетное формирование уведомлений одного типа
+
+        Args:
+            metadata_list: Метаданные уведомлений
+
+        Returns:
+            Список кортежей (текст сообщения, клавиатура или None)
+        """
+        return [self.render(metadata) for metadata in metadata_list]
+
+
+def _invitation_keyboard(invitation_type: str) -> KeyboardFactory:
+    """
+    Фабрика клавиатуры ответа на приглашение
+
+    Args:
+        invitation_type: Тип приглашения ("team" или "committee")
+
+    Returns:
+        Функция построения клавиатуры по метаданным уведомления
+    """
+    def factory(metadata: Dict[str, Any]) -> Optional[InlineKeyboardMarkup]:
+        invitation_id = metadata.get("invitation_id")
+        if not invitation_id:
+            return None
+        return get_invitation_keyboard(invitation_id, invitation_type)
+
+    return factory
+
+
+_MATCH_FIELDS = {
+    "championship_name": "",
+    "opponent_name": "",
+    "match_date": "",
+    "match_time": "",
+    "venue": "",
+    "address": ""
+}
+
+NOTIFICATION_RENDERERS: Dict[NotificationType, NotificationRenderer] = {
+    NotificationType.TEAM_APPLICATION: NotificationRenderer(TEAM_APPLICATION_MESSAGE, {
+        "team_name": "",
+        "championship_name": "",
+        "application_deadline": ""
+    }),
+    NotificationType.APPLICATION_CANCEL: NotificationRenderer(APPLICATION_CANCEL_MESSAGE, {
+        "status": "отклонена",
+        "team_name": "",
+        "championship_name": "",
+        "reason": "Причина не указана"
+    }),
+    NotificationType.CHAMPIONSHIP_CANCEL: NotificationRenderer(CHAMPIONSHIP_CANCEL_MESSAGE, {
+        "status": "отменен",
+        "championship_name": "",
+        "additional_info": ""
+    }),
+    NotificationType.NEW_MATCH: NotificationRenderer(NEW_MATCH_MESSAGE, _MATCH_FIELDS),
+    NotificationType.MATCH_RESCHEDULE: NotificationRenderer(MATCH_RESCHEDULE_MESSAGE, {
+        "championship_name": "",
+        "opponent_name": "",
+        "new_date": "",
+        "new_time": "",
+        "new_venue": "",
+        "new_address": "",
+        "old_date": "",
+        "old_time": ""
+    }),
+    NotificationType.PLAYOFF_RESULT: NotificationRenderer(PLAYOFF_RESULT_MESSAGE, {
+        "team_name": "",
+        "result": "прошла",
+        "championship_name": "",
+        "additional_info": ""
+    }),
+    NotificationType.MATCH_REMINDER: NotificationRenderer(MATCH_REMINDER_MESSAGE, _MATCH_FIELDS),
+    NotificationType.NEW_CHAMPIONSHIP: NotificationRenderer(NEW_CHAMPIONSHIP_MESSAGE, {
+        "championship_name": "",
+        "sport_type": "",
+        "deadline": "",
+        "city": "",
+        "description": ""
+    }),
+    NotificationType.COMMITTEE_MESSAGE: NotificationRenderer(COMMITTEE_MESSAGE, {
+        "championship_name": "",
+        "message": ""
+    }),
+    NotificationType.TEAM_INVITATION: NotificationRenderer(TEAM_INVITATION_MESSAGE, {
+        "team_name": "",
+        "sport_type": "",
+        "captain_name": ""
+    }, keyboard_factory=_invitation_keyboard("team")),
+    NotificationType.COMMITTEE_INVITATION: NotificationRenderer(COMMITTEE_INVITATION_MESSAGE, {
+        "committee_name": "",
+        "inviter_name": ""
+    }, keyboard_factory=_invitation_keyboard("committee")),
+}
+
+
+def render_notification(
+        notification_type: NotificationType,
+        metadata: Dict[str, Any],
+        content: str = ""
+) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+    """
+    Формирование сообщения для уведомления
+
+    Args:
+        notification_type: Тип уведомления
+        metadata: Метаданные уведомления
+        content: Содержание уведомления, используется для типов без шаблона
+
+    Returns:
+        Кортеж (текст сообщения, клавиатура или None)
+    """
+    renderer = NOTIFICATION_RENDERERS.get(notification_type)
+    if renderer is None:
+        return content, None
+    return renderer.render(metadata)
+
+
+def render_notifications(
+        notification_type: NotificationType,
+        metadata_list: Iterable[Dict[str, Any]],
+        contents: Iterable[str] = None
+) -> List[Tuple[str, Optional[InlineKeyboardMarkup]]]:
+    """
+    Пакетное формирование сообщений для уведомлений одного типа
+
+    Args:
+        notification_type: Тип уведомлений
+        metadata_list: Метаданные уведомлений
+        contents: Содержание уведомлений, используется для типов без шаблона
+            (если не передано, текст таких уведомлений пустой)
+
+    Returns:
+        Список кортежей (текст сообщения, клавиатура или None), по одному на каждое уведомление
+    """
+    renderer = NOTIFICATION_RENDERERS.get(notification_type)
+    if renderer is None:
+        if contents is None:
+            return [("", None) for _ in metadata_list]
+        return [(content, None) for content in contents]
+    return renderer.render_many(metadata_list)
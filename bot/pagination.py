@@ -0,0 +1,531 @@
+"""
+Постраничные списки: матчи, команды, чемпионаты и приглашения пользователя
+
+Список показывается одним сообщением с кнопками "Назад" и "Вперед".
+У API запрашивается только текущая страница (с одним лишним элементом,
+чтобы узнать, есть ли следующая), а при листании сообщение редактируется на месте.
+Готовые страницы (текст и клавиатура) кэшируются для каждого пользователя и
+сбрасываются при доставке уведомлений и выполнении действий, которые меняют список.
+"""
+import html
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from aiogram import types
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.exceptions import MessageNotModified
+
+from config.config import LIST_PAGE_SIZE, LIST_CACHE_TTL, LIST_CACHE_SIZE, USER_LIST_CACHE_TTL
+from utils.cache import TTLCache
+from utils.paging import slice_page
+from utils.logger import get_logger
+from api.client import ApiClient
+from api.models import ApiModel, Championship, Invitation, Match, Team
+from database.models import NotificationType, OutboxAction
+from bot.keyboards.callback_data import CallbackAction, encode_callback
+from bot.keyboards.keyboards import get_invitation_keyboard
+from bot.messages.renderers import NOTIFICATION_RENDERERS
+
+logger = get_logger("pagination")
+
+# Страница списка: элементы и признак наличия следующей страницы
+Page = Tuple[List[ApiModel], bool]
+
+# Готовая страница: HTML-текст и клавиатура
+RenderedPage = Tuple[str, Optional[InlineKeyboardMarkup]]
+
+Fetcher = Callable[[ApiClient, int, int, int], Awaitable[Any]]
+
+# Готовые страницы списков: (код списка, ID пользователя, номер страницы) -> готовая страница
+page_cache = TTLCache(maxsize=LIST_CACHE_SIZE, ttl=LIST_CACHE_TTL)
+
+# Номера страниц в кэше: (код списка, ID пользователя) -> множество номеров страниц.
+# По нему сбрасываются страницы пользователя без обхода всего кэша.
+cached_pages = TTLCache(maxsize=LIST_CACHE_SIZE, ttl=LIST_CACHE_TTL)
+
+# Первые элементы списков: (код списка, ID пользователя) -> первый элемент из ответа API
+page_heads = TTLCache(maxsize=LIST_CACHE_SIZE, ttl=LIST_CACHE_TTL)
+
+_MISSING = object()
+
+
+class ListView:
+    """
+    Описание постраничного списка
+    """
+
+    __slots__ = ("code", "title", "empty_text", "error_text", "footer", "page_size",
+                 "fetch", "model", "render_item", "item_keyboard", "cache_ttl")
+
+    def __init__(
+            self,
+            code: str,
+            title: str,
+            empty_text: str,
+            error_text: str,
+            fetch: Fetcher,
+            model: Type[ApiModel],
+            render_item: Callable[[Any], str],
+            footer: str = "",
+            page_size: int = LIST_PAGE_SIZE,
+            item_keyboard: Callable[[Any], Optional[InlineKeyboardMarkup]] = None,
+            cache_ttl: int = LIST_CACHE_TTL
+    ):
+        """
+        Args:
+            code: Короткий код списка для данных кнопок
+            title: Заголовок сообщения
+            empty_text: Текст для пустого списка
+            error_text: Текст при ошибке загрузки
+            fetch: Загрузка элементов из API (клиент, ID пользователя, limit, offset)
+            model: Модель элемента списка
+            render_item: Формирование HTML-текста элемента
+            footer: Текст под списком (опционально)
+            page_size: Количество элементов на странице
+            item_keyboard: Клавиатура элемента, для списков с одним элементом на странице (опционально)
+            cache_ttl: Срок жизни готовых страниц в кэше (в секундах)
+        """
+        self.code = code
+        self.title = title
+        self.empty_text = empty_text
+        self.error_text = error_text
+        self.fetch = fetch
+        self.model = model
+        self.render_item = render_item
+        self.footer = footer
+        self.page_size = page_size
+        self.item_keyboard = item_keyboard
+        self.cache_ttl = cache_ttl
+
+
+def _escape(value: Any, default: str = "") -> str:
+    """
+    Экранирование значения для HTML
+
+    Args:
+        value: Значение
+        default: Значение по умолчанию для пустых значений
+
+    Returns:
+        Экранированная строка
+    """
+    if value is None or value == "":
+        value = default
+    return html.escape(str(value), quote=False)
+
+
+def _render_match(match: Match) -> str:
+    return (
+        f"🏆 <b>{_escape(match.tournament_name)}</b>\n"
+        f"🆚 Соперник: {_escape(match.opponent_name)}\n"
+        f"📍 Место: {_escape(match.location_name)}\n"
+        f"📆 Дата: {_escape(match.date)} в {_escape(match.time)}"
+    )
+
+
+_CHAMPIONSHIP_STATUSES = {"active": "Активный", "past": "Завершен"}
+
+
+def _render_championship(championship: Championship) -> str:
+    text = (
+        f"<b>{_escape(championship.name)}</b>\n"
+        f"⚽ Вид спорта: {_escape(championship.sport)}\n"
+        f"🌆 Город: {_escape(championship.city)}\n"
+        f"📊 Статус: {_CHAMPIONSHIP_STATUSES.get(championship.status, 'Неизвестно')}"
+    )
+    if championship.position:
+        text += f"\n🏅 Позиция: {_escape(championship.position)}"
+    return text
+
+
+def _render_team(team: Team) -> str:
+    text = (
+        f"<b>{_escape(team.name, 'Без названия')}</b>\n"
+        f"⚽ Вид спорта: {_escape(team.sport, 'Не указан')}"
+    )
+    if team.is_captain:
+        text += "\n👑 Вы капитан этой команды"
+    if team.id:
+        text += f"\nДля просмотра подробной информации: /team_{team.id}"
+    return text
+
+
+def _render_recommended(championship: Championship) -> str:
+    description = championship.description
+    if len(description) > 200:
+        description = description[:197] + "..."
+
+    text = (
+        f"🏆 <b>{_escape(championship.name, 'Без названия')}</b>\n"
+        f"⚽ Вид спорта: {_escape(championship.sport, 'Не указан')}\n"
+        f"🌆 Город: {_escape(championship.city, 'Не указан')}\n"
+        f"👥 Размер команды: {_escape(championship.team_members_count, '-')} участников\n"
+        f"📅 Дедлайн подачи заявок: {_escape(championship.application_deadline, 'Не указан')}"
+    )
+    if description:
+        text += f"\n📝 {_escape(description)}"
+    if championship.id:
+        text += f"\nПодробнее: /championship_{championship.id}"
+    return text
+
+
+def _invitation_metadata(invitation: Invitation) -> Dict[str, Any]:
+    """
+    Приведение приглашения из API к полям шаблона уведомления
+
+    Args:
+        invitation: Приглашение из API
+
+    Returns:
+        Метаданные для рендерера приглашения
+    """
+    return {
+        "team_name": invitation.team_name,
+        "sport_type": invitation.sport,
+        "captain_name": invitation.inviter_name,
+        "committee_name": invitation.committee_name,
+        "inviter_name": invitation.inviter_name
+    }
+
+
+def _render_invitation(invitation: Invitation) -> str:
+    if invitation.type == 'committee':
+        renderer = NOTIFICATION_RENDERERS[NotificationType.COMMITTEE_INVITATION]
+    else:
+        renderer = NOTIFICATION_RENDERERS[NotificationType.TEAM_INVITATION]
+    return renderer.render_text(_invitation_metadata(invitation)).strip()
+
+
+def _invitation_keyboard(invitation: Invitation) -> Optional[InlineKeyboardMarkup]:
+    if not invitation.invitation_id or invitation.type not in ('team', 'committee'):
+        return None
+    return get_invitation_keyboard(invitation.invitation_id, invitation.type)
+
+
+LIST_VIEWS: Dict[str, ListView] = {view.code: view for view in (
+    ListView(
+        code="m",
+        title="📅 Ваши предстоящие матчи",
+        empty_text="У вас нет предстоящих матчей.",
+        error_text="Произошла ошибка при получении информации о матчах. Пожалуйста, попробуйте позже.",
+        fetch=lambda api, user_id, limit, offset: api.get_user_matches(user_id, "upcoming", limit, offset),
+        model=Match,
+        render_item=_render_match
+    ),
+    ListView(
+        code="c",
+        title="🏆 Ваши чемпионаты",
+        empty_text="Вы не участвуете ни в одном чемпионате.",
+        error_text="Произошла ошибка при получении информации о чемпионатах. Пожалуйста, попробуйте позже.",
+        fetch=lambda api, user_id, limit, offset: api.get_user_championships(user_id, limit, offset),
+        model=Championship,
+        render_item=_render_championship,
+        cache_ttl=USER_LIST_CACHE_TTL
+    ),
+    ListView(
+        code="t",
+        title="👥 Ваши команды",
+        empty_text="Вы не состоите ни в одной команде.",
+        error_text="Произошла ошибка при получении информации о командах. Пожалуйста, попробуйте позже.",
+        fetch=lambda api, user_id, limit, offset: api.get_user_teams(user_id, limit, offset),
+        model=Team,
+        render_item=_render_team,
+        cache_ttl=USER_LIST_CACHE_TTL,
+        footer="Чтобы просмотреть подробную информацию о команде, отправьте /team_ID (например, /team_123)"
+    ),
+    ListView(
+        code="r",
+        title="🏆 Чемпионаты, которые могут вас заинтересовать",
+        empty_text="На данный момент у нас нет рекомендаций для вас. Пожалуйста, проверьте позже.",
+        error_text="Произошла ошибка при получении рекомендаций. Пожалуйста, попробуйте позже.",
+        fetch=lambda api, user_id, limit, offset: api.get_recommended_championships(user_id, limit, offset),
+        model=Championship,
+        render_item=_render_recommended
+    ),
+    ListView(
+        code="i",
+        title="📨 Ваши приглашения",
+        empty_text="У вас нет активных приглашений.",
+        error_text="Произошла ошибка при получении информации о приглашениях. Пожалуйста, попробуйте позже.",
+        fetch=lambda api, user_id, limit, offset: api.get_user_invitations(user_id, "all", limit, offset),
+        model=Invitation,
+        render_item=_render_invitation,
+        page_size=1,
+        item_keyboard=_invitation_keyboard
+    ),
+)}
+
+# Списки, которые меняются при доставке уведомления данного типа
+LISTS_CHANGED_BY_NOTIFICATION: Dict[NotificationType, Tuple[str, ...]] = {
+    NotificationType.TEAM_APPLICATION: ("c",),
+    NotificationType.APPLICATION_CANCEL: ("c",),
+    NotificationType.CHAMPIONSHIP_CANCEL: ("c", "m"),
+    NotificationType.NEW_MATCH: ("m",),
+    NotificationType.MATCH_RESCHEDULE: ("m",),
+    NotificationType.PLAYOFF_RESULT: ("c", "m"),
+    NotificationType.NEW_CHAMPIONSHIP: ("r",),
+    NotificationType.TEAM_INVITATION: ("i",),
+    NotificationType.COMMITTEE_INVITATION: ("i",),
+}
+
+# Списки, которые меняются после успешного выполнения действия пользователя
+LISTS_CHANGED_BY_ACTION: Dict[OutboxAction, Tuple[str, ...]] = {
+    OutboxAction.ACCEPT_TEAM_INVITATION: ("i", "t", "c", "m"),
+    OutboxAction.DECLINE_TEAM_INVITATION: ("i",),
+    OutboxAction.ACCEPT_COMMITTEE_INVITATION: ("i", "c"),
+    OutboxAction.DECLINE_COMMITTEE_INVITATION: ("i",),
+    OutboxAction.DECLINE_MATCH: ("m",),
+}
+
+
+def items_from_response(result: Any) -> Optional[List[Dict[str, Any]]]:
+    """
+    Элементы списка из ответа API
+
+    Args:
+        result: Ответ API (список или словарь с ключом items)
+
+    Returns:
+        Элементы-словари или None, если API вернул ошибку
+    """
+    if isinstance(result, dict):
+        if "error" in result:
+            return None
+        result = result.get("items")
+    if not isinstance(result, list):
+        return None
+    return [item for item in result if isinstance(item, dict)]
+
+
+def page_from_response(
+        result: Any,
+        offset: int,
+        page_size: int,
+        model: Type[ApiModel],
+        head: Optional[Dict[str, Any]] = None
+) -> Optional[Page]:
+    """
+    Страница из ответа API на запрос page_size + 1 элементов.
+    Если API вернул список целиком, без учета limit и offset, страница вырезается из него.
+    В модели разбираются только элементы страницы.
+
+    Args:
+        result: Ответ API (список или словарь с ключом items)
+        offset: Смещение страницы
+        page_size: Размер страницы
+        model: Модель элемента списка
+        head: Первый элемент списка (из ответа для первой страницы), если известен
+
+    Returns:
+        Страница или None, если API вернул ошибку
+    """
+    items = items_from_response(result)
+    if items is None:
+        return None
+    page_items, has_next = slice_page(items, offset, page_size, head)
+    return model.from_list(page_items), has_next
+
+
+async def _page_head(api_client: ApiClient, view: ListView, user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Первый элемент списка: по нему распознается API, игнорирующий offset
+
+    Args:
+        api_client: Клиент API
+        view: Описание списка
+        user_id: ID пользователя
+
+    Returns:
+        Первый элемент или None, если список пуст или не загружен
+    """
+    key = (view.code, user_id)
+    head = page_heads.get(key, _MISSING)
+    if head is _MISSING:
+        items = items_from_response(await view.fetch(api_client, user_id, 1, 0))
+        if items is None:
+            return None
+        head = items[0] if items else None
+        page_heads.set(key, head, ttl=view.cache_ttl)
+    return head
+
+
+async def load_page(api_client: ApiClient, view: ListView, user_id: int, page: int) -> Optional[Page]:
+    """
+    Загрузка страницы списка из API
+
+    Args:
+        api_client: Клиент API
+        view: Описание списка
+        user_id: ID пользователя
+        page: Номер страницы (с нуля)
+
+    Returns:
+        Страница или None в случае ошибки
+    """
+    offset = page * view.page_size
+    result = await view.fetch(api_client, user_id, view.page_size + 1, offset)
+
+    if page == 0:
+        items = items_from_response(result)
+        if items is not None:
+            page_heads.set((view.code, user_id), items[0] if items else None, ttl=view.cache_ttl)
+        head = None
+    else:
+        head = await _page_head(api_client, view, user_id)
+    return page_from_response(result, offset, view.page_size, view.model, head)
+
+
+def render_page(view: ListView, page: int, loaded: Page) -> RenderedPage:
+    """
+    Формирование текста и клавиатуры страницы списка
+
+    Args:
+        view: Описание списка
+        page: Номер страницы (с нуля)
+        loaded: Загруженная страница
+
+    Returns:
+        Кортеж (HTML-текст, клавиатура или None)
+    """
+    items, has_next = loaded
+    if not items and page == 0:
+        return view.empty_text, None
+
+    parts = [f"{view.title} (стр. {page + 1}):"]
+    if items:
+        parts.extend(view.render_item(item) for item in items)
+    else:
+        parts.append("Больше ничего нет.")
+    if view.footer:
+        parts.append(view.footer)
+    text = "\n\n".join(parts)
+
+    markup = InlineKeyboardMarkup(row_width=2)
+    if view.item_keyboard and len(items) == 1:
+        item_markup = view.item_keyboard(items[0])
+        if item_markup:
+            markup.inline_keyboard.extend(item_markup.inline_keyboard)
+
+    navigation = []
+    if page > 0:
+        navigation.append(InlineKeyboardButton(
+            "◀️ Назад", callback_data=encode_callback(CallbackAction.LIST_PAGE, view.code, page - 1)
+        ))
+    if has_next:
+        navigation.append(InlineKeyboardButton(
+            "Вперед ▶️", callback_data=encode_callback(CallbackAction.LIST_PAGE, view.code, page + 1)
+        ))
+    if navigation:
+        markup.row(*navigation)
+
+    return text, markup if markup.inline_keyboard else None
+
+
+async def get_page(api_client: ApiClient, view: ListView, user_id: int, page: int) -> Optional[RenderedPage]:
+    """
+    Получение готовой страницы списка: из кэша или загрузкой из API с формированием текста
+
+    Args:
+        api_client: Клиент API
+        view: Описание списка
+        user_id: ID пользователя
+        page: Номер страницы (с нуля)
+
+    Returns:
+        Готовая страница или None в случае ошибки
+    """
+    key = (view.code, user_id, page)
+    cached = page_cache.get(key)
+    if cached is not None:
+        # Индекс страниц используется не реже самих страниц и не вытесняется раньше них
+        cached_pages.get((view.code, user_id))
+        return cached
+
+    loaded = await load_page(api_client, view, user_id, page)
+    if loaded is None:
+        return None
+
+    rendered = render_page(view, page, loaded)
+    page_cache.set(key, rendered, ttl=view.cache_ttl)
+    pages = cached_pages.get((view.code, user_id)) or set()
+    pages.add(page)
+    cached_pages.set((view.code, user_id), pages, ttl=view.cache_ttl)
+    return rendered
+
+
+def invalidate_user_lists(user_id: int, view_codes: Iterable[str]) -> int:
+    """
+    Сброс готовых страниц списков пользователя по индексу cached_pages
+
+    Args:
+        user_id: ID пользователя
+        view_codes: Коды списков
+
+    Returns:
+        Количество сброшенных страниц
+    """
+    deleted = 0
+    for view_code in frozenset(view_codes):
+        page_heads.delete((view_code, user_id))
+        pages = cached_pages.get((view_code, user_id)) or ()
+        cached_pages.delete((view_code, user_id))
+        for page in pages:
+            key = (view_code, user_id, page)
+            if key in page_cache:
+                page_cache.delete(key)
+                deleted += 1
+    return deleted
+
+
+async def send_list(message: types.Message, api_client: ApiClient, view_code: str, user_id: int):
+    """
+    Отправка первой страницы списка новым сообщением
+
+    Args:
+        message: Сообщение от пользователя
+        api_client: Клиент API
+        view_code: Код списка
+        user_id: ID пользователя
+    """
+    view = LIST_VIEWS[view_code]
+    rendered = await get_page(api_client, view, user_id, 0)
+    if rendered is None:
+        await message.answer(view.error_text)
+        return
+
+    text, markup = rendered
+    await message.answer(text, parse_mode="HTML", reply_markup=markup)
+
+
+async def turn_page(
+        callback_query: types.CallbackQuery,
+        api_client: ApiClient,
+        view_code: str,
+        page: int,
+        user_id: int
+):
+    """
+    Переход на другую страницу списка с редактированием сообщения на месте
+
+    Args:
+        callback_query: Запрос от кнопки
+        api_client: Клиент API
+        view_code: Код списка
+        page: Номер страницы (с нуля)
+        user_id: ID пользователя
+    """
+    view = LIST_VIEWS.get(view_code)
+    if view is None or page < 0:
+        await callback_query.answer()
+        return
+
+    rendered = await get_page(api_client, view, user_id, page)
+    if rendered is None:
+        await callback_query.answer(view.error_text, show_alert=True)
+        return
+
+    await callback_query.answer()
+    text, markup = rendered
+    try:
+        await callback_query.message.edit_text(text, parse_mode="HTML", reply_markup=markup)
+    except MessageNotModified:
+        pass
@@ -0,0 +1,218 @@
+"""
+Маршрутизация входящих обновлений
+
+Вместо цепочки фильтров, которые aiogram проверяет по очереди для каждого
+обновления, регистрируется один обработчик: данные разбираются один раз,
+а обработчик выбирается поиском в словаре, поэтому стоимость маршрутизации
+не растет с количеством действий и кнопок меню.
+"""
+import inspect
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Pattern, Tuple
+
+from aiogram import Dispatcher, types
+from aiogram.dispatcher import FSMContext
+
+from utils.logger import get_logger
+from bot.keyboards.callback_data import CallbackAction, DecodedCallback, decode_callback
+
+logger = get_logger("routing")
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class CallbackRouter:
+    """
+    Маршрутизатор нажатий инлайн-кнопок по коду действия
+    """
+
+    def __init__(self):
+        # Действие -> (обработчик, нужно ли передавать состояние FSM)
+        self._handlers: Dict[CallbackAction, tuple] = {}
+
+    def register(self, action: CallbackAction) -> Callable[[Handler], Handler]:
+        """
+        Декоратор регистрации обработчика действия.
+        Обработчик получает запрос, разобранные аргументы действия и,
+        если объявляет параметр state, состояние FSM.
+
+        Args:
+            action: Действие
+
+        Returns:
+            Декоратор
+
+        Raises:
+            ValueError: Если для действия уже зарегистрирован обработчик
+        """
+        def decorator(handler: Handler) -> Handler:
+            if action in self._handlers:
+                raise ValueError(f"Обработчик действия {action.name} уже зарегистрирован")
+            wants_state = "state" in inspect.signature(handler).parameters
+            self._handlers[action] = (handler, wants_state)
+            return handler
+
+        return decorator
+
+    def match(self, callback_query: types.CallbackQuery) -> Optional[Dict[str, DecodedCallback]]:
+        """
+        Фильтр aiogram: разбор данных кнопки и проверка наличия обработчика
+
+        Args:
+            callback_query: Запрос от кнопки
+
+        Returns:
+            Аргументы для обработчика aiogram или None, если действие не обрабатывается
+        """
+        decoded = decode_callback(callback_query.data)
+        if decoded is None or decoded.action not in self._handlers:
+            return None
+        return {"decoded": decoded}
+
+    async def dispatch(self, callback_query: types.CallbackQuery, decoded: DecodedCallback, state: FSMContext):
+        """
+        Вызов обработчика действия
+
+        Args:
+            callback_query: Запрос от кнопки
+            decoded: Разобранные данные кнопки
+            state: Состояние FSM
+        """
+        handler, wants_state = self._handlers[decoded.action]
+        if wants_state:
+            await handler(callback_query, *decoded.args, state=state)
+        else:
+            await handler(callback_query, *decoded.args)
+
+    def install(self, dp: Dispatcher):
+        """
+        Регистрация маршрутизатора в диспетчере
+
+        Args:
+            dp: Диспетчер Aiogram
+        """
+        dp.register_callback_query_handler(self.dispatch, self.match)
+
+
+class TextRouter:
+    """
+    Маршрутизатор текстовых сообщений: кнопки меню ищутся в словаре
+    по точному тексту, команды с параметрами — по заранее скомпилированным шаблонам
+    """
+
+    def __init__(self):
+        self._labels: Dict[str, Handler] = {}
+        self._patterns: List[Tuple[Pattern, Handler]] = []
+
+    def label(self, text: str) -> Callable[[Handler], Handler]:
+        """
+        Декоратор регистрации обработчика кнопки меню
+
+        Args:
+            text: Текст кнопки
+
+        Returns:
+            Декоратор
+
+        Raises:
+            ValueError: Если для кнопки уже зарегистрирован обработчик
+        """
+        def decorator(handler: Handler) -> Handler:
+            if text in self._labels:
+                raise ValueError(f"Обработчик кнопки \"{text}\" уже зарегистрирован")
+            self._labels[text] = handler
+            return handler
+
+        return decorator
+
+    def pattern(self, regex: str) -> Callable[[Handler], Handler]:
+        """
+        Декоратор регистрации обработчика команды с параметрами.
+        Шаблон сопоставляется с началом текста, обработчик получает результат сопоставления.
+
+        Args:
+            regex: Регулярное выражение
+
+        Returns:
+            Декоратор
+
+        Raises:
+            ValueError: Если шаблон не начинается с "/"
+        """
+        if not regex.startswith("/"):
+            raise ValueError(f"Шаблон команды должен начинаться с \"/\": {regex}")
+        compiled = re.compile(regex)
+
+        def decorator(handler: Handler) -> Handler:
+            self._patterns.append((compiled, handler))
+            return handler
+
+        return decorator
+
+    def resolve(self, text: Optional[str]) -> Optional[Tuple[Handler, Optional[re.Match]]]:
+        """
+        Поиск обработчика текста
+
+        Args:
+            text: Текст сообщения
+
+        Returns:
+            Кортеж (обработчик, результат сопоставления шаблона или None) или None
+        """
+        if not text:
+            return None
+
+        handler = self._labels.get(text)
+        if handler is not None:
+            return handler, None
+
+        # Все команды с параметрами начинаются с "/", остальной текст шаблоны не проверяют
+        if text[0] == "/":
+            for compiled, handler in self._patterns:
+                match = compiled.match(text)
+                if match:
+                    return handler, match
+        return None
+
+    def match(self, message: types.Message) -> Optional[Dict[str, tuple]]:
+        """
+        Фильтр aiogram: поиск обработчика текста сообщения
+
+        Args:
+            message: Сообщение от пользователя
+
+        Returns:
+            Аргументы для обработчика aiogram или None, если текст не обрабатывается
+        """
+        route = self.resolve(message.text)
+        if route is None:
+            return None
+        return {"route": route}
+
+    async def dispatch(self, message: types.Message, route: tuple):
+        """
+        Вызов обработчика текста
+
+        Args:
+            message: Сообщение от пользователя
+            route: Обработчик и результат сопоставления шаблона
+        """
+        handler, match = route
+        if match is None:
+            await handler(message)
+        else:
+            await handler(message, match)
+
+    def install(self, dp: Dispatcher):
+        """
+        Регистрация маршрутизатора в диспетчере
+
+        Args:
+            dp: Диспетчер Aiogram
+        """
+        dp.register_message_handler(self.dispatch, self.match)
+
+
+# Маршрутизаторы бота
+callback_router = CallbackRouter()
+text_router = TextRouter()
@@ -26,10 +26,83 @@ API_TOKEN = os.getenv("API_TOKEN")
 # Таймаут для запросов к API (в секундах)
 API_TIMEOUT = int(os.getenv("API_TIMEOUT", "2"))
 
+# Условные GET-запросы к API: максимальное количество сохраненных ответов
+# с ETag / Last-Modified и срок их хранения (в секундах)
+API_VALIDATOR_CACHE_SIZE = int(os.getenv("API_VALIDATOR_CACHE_SIZE", "5000"))
+API_VALIDATOR_TTL = int(os.getenv("API_VALIDATOR_TTL", "3600"))
+
+# Пакетное получение данных из API: количество ID в одном пакетном запросе
+# и число одновременных запросов, если API не поддерживает пакетные запросы
+API_BATCH_SIZE = int(os.getenv("API_BATCH_SIZE", "100"))
+API_BATCH_CONCURRENCY = int(os.getenv("API_BATCH_CONCURRENCY", "10"))
+
+# Кэш команд, полученных пакетно: срок жизни (в секундах) и максимальное количество
+TEAM_CACHE_TTL = int(os.getenv("TEAM_CACHE_TTL", "300"))
+TEAM_CACHE_SIZE = int(os.getenv("TEAM_CACHE_SIZE", "5000"))
+
 # Настройки логирования
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 # Максимальное количество сообщений в секунду
-MAX_RPS = int(os.getenv("MAX_RPS", "1000"))
\ No newline at end of file
+MAX_RPS = int(os.getenv("MAX_RPS", "1000"))
+
+# Адаптивная отправка уведомлений: границы размера страницы и параллелизма,
+# целевая средняя задержка отправки одного сообщения (в секундах)
+DELIVERY_MIN_BATCH = int(os.getenv("DELIVERY_MIN_BATCH", "20"))
+DELIVERY_MAX_BATCH = int(os.getenv("DELIVERY_MAX_BATCH", str(MAX_RPS)))
+DELIVERY_MAX_CONCURRENCY = int(os.getenv("DELIVERY_MAX_CONCURRENCY", "30"))
+DELIVERY_TARGET_LATENCY = float(os.getenv("DELIVERY_TARGET_LATENCY", "1.0"))
+
+# Срок хранения уведомлений (в днях) и количество месячных секций
+# таблицы уведомлений, создаваемых заранее
+NOTIFICATIONS_RETENTION_DAYS = int(os.getenv("NOTIFICATIONS_RETENTION_DAYS", "30"))
+NOTIFICATION_PARTITIONS_AHEAD = int(os.getenv("NOTIFICATION_PARTITIONS_AHEAD", "2"))
+
+# Очистка старых уведомлений порциями: размер порции и пауза между порциями (в секундах)
+PURGE_CHUNK_SIZE = int(os.getenv("PURGE_CHUNK_SIZE", "5000"))
+PURGE_CHUNK_PAUSE = float(os.getenv("PURGE_CHUNK_PAUSE", "0.5"))
+
+# Каталог архива удаляемых уведомлений (NOTIFICATIONS_ARCHIVE_DIR) читается в database/archive.py:
+# поиск по архиву из командной строки не должен требовать токена бота
+# Отложенные вызовы API (outbox): размер пачки, параллелизм, число попыток
+# и базовая задержка перед повтором (в секундах, удваивается с каждой попыткой)
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "10"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_DELAY = int(os.getenv("OUTBOX_RETRY_DELAY", "5"))
+# Интервал проверки outbox, когда новых записей нет (в секундах): записи
+# этого процесса обрабатываются сразу, интервал нужен для повторов и других процессов
+OUTBOX_IDLE_INTERVAL = int(os.getenv("OUTBOX_IDLE_INTERVAL", "15"))
+
+# Срок, в течение которого повторные нажатия на кнопку того же действия
+# отклоняются без вызова API (в секундах)
+INFLIGHT_TTL = int(os.getenv("INFLIGHT_TTL", "300"))
+
+# Постраничные списки: количество элементов на странице, срок жизни
+# загруженных страниц в кэше (в секундах) и максимальное количество страниц в кэше
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "5"))
+LIST_CACHE_TTL = int(os.getenv("LIST_CACHE_TTL", "60"))
+LIST_CACHE_SIZE = int(os.getenv("LIST_CACHE_SIZE", "10000"))
+
+# Срок жизни страниц списков команд и чемпионатов пользователя (в секундах).
+# Эти списки сбрасываются при доставке связанных уведомлений и успешных ответах
+# на приглашения, поэтому могут храниться дольше остальных
+USER_LIST_CACHE_TTL = int(os.getenv("USER_LIST_CACHE_TTL", "3600"))
+
+# Страницы команд и чемпионатов: срок, в течение которого страница отдается
+# без обращения к API, срок хранения готового текста каждой версии
+# (в секундах) и максимальное количество страниц в кэше
+DETAIL_CACHE_TTL = int(os.getenv("DETAIL_CACHE_TTL", "60"))
+DETAIL_RENDER_TTL = int(os.getenv("DETAIL_RENDER_TTL", "3600"))
+DETAIL_CACHE_SIZE = int(os.getenv("DETAIL_CACHE_SIZE", "2000"))
+
+# Синхронизация пользователей с платформой: размер пачки и час ежедневного запуска
+USER_SYNC_BATCH_SIZE = int(os.getenv("USER_SYNC_BATCH_SIZE", "1000"))
+USER_SYNC_HOUR = int(os.getenv("USER_SYNC_HOUR", "4"))
+
+# Напоминания о матчах: количество матчей на странице ответа API и
+# количество матчей, напоминания о которых записываются в базу одной транзакцией
+MATCHES_PAGE_SIZE = int(os.getenv("MATCHES_PAGE_SIZE", "500"))
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "50"))
@@ -0,0 +1,228 @@
+"""
+Архив удаляемых уведомлений.
+
+Перед удалением уведомления записываются в сжатые файлы JSONL,
+разложенные по дате создания: <каталог>/YYYY/MM/DD.jsonl.gz.
+Рядом с каждым файлом хранится небольшой индекс DD.idx.json с количеством
+строк по user_id, поэтому поиск истории пользователя читает только файлы,
+в которых он есть, и читает их построчно, не загружая целиком в память.
+
+Поиск истории пользователя из командной строки:
+    python -m database.archive <user_id> [--since YYYY-MM-DD] [--until YYYY-MM-DD] [--dir КАТАЛОГ]
+Модуль не импортирует config.config, поэтому поиск не требует токена бота.
+"""
+import argparse
+import enum
+import gzip
+import json
+import logging
+import os
+import sys
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+from dotenv import load_dotenv
+
+# Загрузка переменных окружения из .env файла
+load_dotenv()
+
+# Каталог архива удаляемых уведомлений (пустое значение отключает архивирование)
+NOTIFICATIONS_ARCHIVE_DIR = os.getenv("NOTIFICATIONS_ARCHIVE_DIR", os.path.join(os.getcwd(), "archive"))
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(value: Any) -> Any:
+    """
+    Преобразование значений, которые не сериализуются в JSON напрямую
+
+    Args:
+        value: Значение
+
+    Returns:
+        Сериализуемое значение
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+def _row_date(row: Dict[str, Any]) -> date:
+    """
+    Дата, по которой строка попадает в файл архива
+
+    Args:
+        row: Строка уведомления
+
+    Returns:
+        Дата создания уведомления
+    """
+    created_at = row.get("created_at")
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return created_at.date() if created_at else date.today()
+
+
+class NotificationArchive:
+    """
+    Архив уведомлений в сжатых файлах JSONL с индексом по user_id
+    """
+
+    def __init__(self, root: str = NOTIFICATIONS_ARCHIVE_DIR):
+        """
+        Args:
+            root: Каталог архива
+        """
+        self.root = root
+
+    def _paths(self, day: date):
+        """
+        Пути к файлу данных и индексу за день
+
+        Args:
+            day: Дата
+
+        Returns:
+            Кортеж (путь к файлу данных, путь к индексу)
+        """
+        directory = os.path.join(self.root, f"{day.year:04d}", f"{day.month:02d}")
+        return (
+            os.path.join(directory, f"{day.day:02d}.jsonl.gz"),
+            os.path.join(directory, f"{day.day:02d}.idx.json")
+        )
+
+    @staticmethod
+    def _read_index(index_path: str) -> Dict[str, int]:
+        """
+        Чтение индекса файла архива
+
+        Args:
+            index_path: Путь к индексу
+
+        Returns:
+            Количество строк по user_id
+        """
+        if not os.path.exists(index_path):
+            return {}
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            return json.load(index_file)
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Запись уведомлений в архив.
+        Каждый вызов дописывает в файл дня новый gzip-блок, поэтому
+        существующие данные не перечитываются и не пересжимаются.
+
+        Args:
+            rows: Строки уведомлений
+
+        Returns:
+            Количество записанных строк
+        """
+        by_day = defaultdict(list)
+        for row in rows:
+            row = dict(row)
+            by_day[_row_date(row)].append(row)
+
+        written = 0
+        for day, day_rows in by_day.items():
+            data_path, index_path = self._paths(day)
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+            index = self._read_index(index_path)
+            with gzip.open(data_path, "at", encoding="utf-8") as data_file:
+                for row in day_rows:
+                    data_file.write(json.dumps(row, ensure_ascii=False, default=_encode))
+                    data_file.write("\n")
+                    user_key = str(row.get("user_id"))
+                    index[user_key] = index.get(user_key, 0) + 1
+
+            # Индекс заменяется атомарно, чтобы не оставить его поврежденным
+            temporary_path = f"{index_path}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as index_file:
+                json.dump(index, index_file)
+            os.replace(temporary_path, index_path)
+
+            written += len(day_rows)
+
+        return written
+
+    def _days(self, since: Optional[date], until: Optional[date]) -> Iterator[date]:
+        """
+        Даты, за которые в архиве есть файлы, в хронологическом порядке
+
+        Args:
+            since: Начальная дата (опционально)
+            until: Конечная дата (опционально)
+
+        Returns:
+            Итератор дат
+        """
+        if not os.path.isdir(self.root):
+            return
+        for year in sorted(os.listdir(self.root)):
+            if not year.isdigit():
+                continue
+            for month in sorted(os.listdir(os.path.join(self.root, year))):
+                if not month.isdigit():
+                    continue
+                for name in sorted(os.listdir(os.path.join(self.root, year, month))):
+                    if not name.endswith(".idx.json"):
+                        continue
+                    day = date(int(year), int(month), int(name.split(".")[0]))
+                    if since and day < since or until and day > until:
+                        continue
+                    yield day
+
+    def lookup(self, user_id: int, since: date = None, until: date = None) -> Iterator[Dict[str, Any]]:
+        """
+        Потоковый поиск уведомлений пользователя в архиве
+
+        Args:
+            user_id: ID пользователя
+            since: Начальная дата создания уведомлений (опционально)
+            until: Конечная дата создания уведомлений (опционально)
+
+        Returns:
+            Итератор строк уведомлений пользователя
+        """
+        user_key = str(user_id)
+        for day in self._days(since, until):
+            data_path, index_path = self._paths(day)
+            if user_key not in self._read_index(index_path):
+                continue
+            with gzip.open(data_path, "rt", encoding="utf-8") as data_file:
+                for line in data_file:
+                    row = json.loads(line)
+                    if row.get("user_id") == user_id:
+                        yield row
+
+
+# Архив, в который очистка сохраняет удаляемые уведомления (None, если архивирование отключено)
+notification_archive = NotificationArchive() if NOTIFICATIONS_ARCHIVE_DIR else None
+
+
+def main(argv=None):
+    """
+    Поиск истории уведомлений пользователя в архиве из командной строки
+
+    Args:
+        argv: Аргументы командной строки (опционально)
+    """
+    parser = argparse.ArgumentParser(description="Поиск уведомлений пользователя в архиве")
+    parser.add_argument("user_id", type=int, help="ID пользователя")
+    parser.add_argument("--since", type=date.fromisoformat, help="Начальная дата (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="Конечная дата (YYYY-MM-DD)")
+    parser.add_argument("--dir", default=NOTIFICATIONS_ARCHIVE_DIR, help="Каталог архива")
+    args = parser.parse_args(argv)
+
+    archive = NotificationArchive(args.dir)
+    for row in archive.lookup(args.user_id, args.since, args.until):
+        sys.stdout.write(json.dumps(row, ensure_ascii=False))
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
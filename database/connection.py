@@ -4,7 +4,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
 from contextlib import contextmanager
 
-from config.config import DATABASE_URL
+from config.config import DATABASE_URL, NOTIFICATION_PARTITIONS_AHEAD
+from database.migrations import apply_migrations
 
 # Создаем базовый класс для моделей
 Base = declarative_base()
@@ -51,6 +52,15 @@ def init_db():
     try:
         # Создаем все таблицы
         Base.metadata.create_all(engine)
+
+        from database.partitions import convert_to_partitioned, ensure_partitions
+
+        # Приводим существующие таблицы к актуальной схеме
+        apply_migrations(engine)
+
+        # Секционируем таблицу уведомлений и создаем секции на ближайшие месяцы
+        convert_to_partitioned(NOTIFICATION_PARTITIONS_AHEAD)
+        ensure_partitions(NOTIFICATION_PARTITIONS_AHEAD)
         logger.info("База данных успешно инициализирована")
     except Exception as e:
         logger.error(f"Ошибка при инициализации базы данных: {e}")
@@ -0,0 +1,173 @@
+import logging
+from typing import List, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Условие частичных индексов очереди: неотправленные и неотмененные уведомления
+PENDING_PREDICATE = "is_sent = false AND cancelled_at IS NULL"
+
+
+def _pending_index(name: str, expression: str) -> str:
+    """
+    Шаг миграции для частичного индекса по очереди уведомлений.
+    Индекс с устаревшим условием пересоздается.
+
+    Args:
+        name: Имя индекса
+        expression: Индексируемые колонки или выражения
+
+    Returns:
+        SQL шага миграции
+    """
+    return f"""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_indexes
+                WHERE indexname = '{name}' AND indexdef NOT LIKE '%cancelled_at%'
+            ) THEN
+                DROP INDEX {name};
+            END IF;
+        END $$;
+        CREATE INDEX IF NOT EXISTS {name} ON notifications ({expression}) WHERE {PENDING_PREDICATE};
+    """
+
+
+# Идемпотентные шаги миграции схемы для уже существующих баз данных.
+# Новые базы получают актуальную схему через create_all, поэтому каждый шаг
+# должен безопасно выполняться повторно.
+MIGRATIONS: List[Tuple[str, str]] = [
+    (
+        # Строки с некорректным JSON не прерывают миграцию: исходный текст
+        # сохраняется в метаданных под ключом raw
+        "notifications_metadata_jsonb",
+        """
+        CREATE OR REPLACE FUNCTION pg_temp.notifications_safe_jsonb(value TEXT) RETURNS JSONB AS $$
+        DECLARE parsed JSONB;
+        BEGIN
+            IF value IS NULL OR btrim(value) = '' THEN
+                RETURN NULL;
+            END IF;
+            parsed := value::jsonb;
+            IF jsonb_typeof(parsed) <> 'object' THEN
+                RETURN jsonb_build_object('raw', value);
+            END IF;
+            RETURN parsed;
+        EXCEPTION WHEN invalid_text_representation THEN
+            RETURN jsonb_build_object('raw', value);
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE;
+
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'notifications'
+                  AND column_name = 'metadata_json'
+                  AND data_type = 'text'
+            ) THEN
+                ALTER TABLE notifications
+                    ALTER COLUMN metadata_json TYPE JSONB
+                    USING pg_temp.notifications_safe_jsonb(metadata_json);
+            END IF;
+        END $$;
+        """
+    ),
+    (
+        "notifications_cancellation_columns",
+        """
+        ALTER TABLE notifications
+            ADD COLUMN IF NOT EXISTS cancelled_at TIMESTAMP WITHOUT TIME ZONE,
+            ADD COLUMN IF NOT EXISTS cancel_reason VARCHAR(30)
+        """
+    ),
+    (
+        "notifications_expires_at_column",
+        """
+        ALTER TABLE notifications ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP WITHOUT TIME ZONE
+        """
+    ),
+    (
+        "notifications_pending_created_at_id_index",
+        _pending_index("ix_notifications_pending_created_at_id", "created_at, id")
+    ),
+    (
+        "notifications_pending_expires_at_index",
+        _pending_index("ix_notifications_pending_expires_at", "expires_at")
+    ),
+    (
+        "notifications_pending_match_id_index",
+        _pending_index("ix_notifications_pending_match_id", "(metadata_json ->> 'match_id')")
+    ),
+    (
+        "notifications_pending_championship_id_index",
+        _pending_index("ix_notifications_pending_championship_id", "(metadata_json ->> 'championship_id')")
+    ),
+    (
+        "api_outbox_dedup_key",
+        """
+        ALTER TABLE api_outbox ADD COLUMN IF NOT EXISTS dedup_key VARCHAR(60);
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_api_outbox_pending_dedup_key
+            ON api_outbox (dedup_key) WHERE status = 'pending';
+        """
+    ),
+    (
+        # Заполнение номера в формате E.164 по тем же правилам, что и utils.phone.normalize_phone.
+        # Если несколько строк дают один номер, номер получает строка с привязанным
+        # Telegram ID (иначе обновленная последней), остальные остаются без него
+        "users_phone_e164",
+        """
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS phone_e164 VARCHAR(16);
+        WITH normalized AS (
+            SELECT id, telegram_id, updated_at,
+                CASE
+                    WHEN btrim(phone_number) LIKE '+%' THEN
+                        CASE WHEN digits ~ '^[0-9]{8,15}$' THEN '+' || digits END
+                    WHEN digits ~ '^[78][0-9]{10}$' THEN '+7' || substr(digits, 2)
+                    WHEN digits ~ '^9[0-9]{9}$' THEN '+7' || digits
+                END AS e164
+            FROM (
+                SELECT id, phone_number, telegram_id, updated_at,
+                       regexp_replace(phone_number, '[^0-9]', '', 'g') AS digits
+                FROM users
+                WHERE phone_e164 IS NULL
+            ) AS candidates
+        ), ranked AS (
+            SELECT id, e164, row_number() OVER (
+                PARTITION BY e164
+                ORDER BY (telegram_id IS NOT NULL) DESC, updated_at DESC NULLS LAST, id
+            ) AS position
+            FROM normalized
+            WHERE e164 IS NOT NULL
+        )
+        UPDATE users SET phone_e164 = ranked.e164
+        FROM ranked
+        WHERE users.id = ranked.id
+          AND ranked.position = 1
+          AND NOT EXISTS (SELECT 1 FROM users AS taken WHERE taken.phone_e164 = ranked.e164);
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_users_phone_e164 ON users (phone_e164);
+        """
+    ),
+]
+
+
+def apply_migrations(engine: Engine):
+    """
+    Применение миграций схемы базы данных
+
+    Args:
+        engine: Движок SQLAlchemy
+
+    Raises:
+        Exception: Если не удалось применить миграцию
+    """
+    for name, statement in MIGRATIONS:
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(statement))
+            logger.debug(f"Миграция {name} применена")
+        except Exception as e:
+            logger.error(f"Ошибка при применении миграции {name}: {e}")
+            raise
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Enum, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import enum
 from datetime import datetime
 
@@ -19,12 +20,30 @@ class NotificationType(enum.Enum):
     TEAM_INVITATION = "team_invitation"                  # Приглашение в команду
     COMMITTEE_INVITATION = "committee_invitation"        # Приглашение в оргкомитет
 
+class CancelReason(enum.Enum):
+    SUPERSEDED = "superseded"                            # Заменено более новым уведомлением
+    CHAMPIONSHIP_CANCELLED = "championship_cancelled"    # Чемпионат отменен
+    EXPIRED = "expired"                                  # Истек срок актуальности
+
+class OutboxAction(enum.Enum):
+    ACCEPT_TEAM_INVITATION = "accept_team_invitation"            # Принятие приглашения в команду
+    DECLINE_TEAM_INVITATION = "decline_team_invitation"          # Отклонение приглашения в команду
+    ACCEPT_COMMITTEE_INVITATION = "accept_committee_invitation"  # Принятие приглашения в оргкомитет
+    DECLINE_COMMITTEE_INVITATION = "decline_committee_invitation"  # Отклонение приглашения в оргкомитет
+    DECLINE_MATCH = "decline_match"                              # Отказ от участия в матче
+
+class OutboxStatus(enum.Enum):
+    PENDING = "pending"                                  # Ожидает вызова API
+    DONE = "done"                                        # API вызван успешно
+    FAILED = "failed"                                    # Попытки исчерпаны или ошибка неустранима
+
 class User(Base):
     """Модель пользователя системы"""
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True)
     phone_number = Column(String(20), unique=True, nullable=False)
+    phone_e164 = Column(String(16), nullable=True)  # Номер в формате E.164, по нему выполняются все поиски
     telegram_id = Column(String(20), unique=True, nullable=True)
     first_name = Column(String(80), nullable=False)
     last_name = Column(String(80), nullable=False)
@@ -35,26 +54,108 @@ class User(Base):
     # Отношения
     notifications = relationship("Notification", back_populates="user")
 
+    __table_args__ = (
+        Index("ux_users_phone_e164", "phone_e164", unique=True),
+    )
+
     def __repr__(self):
         return f"<User {self.first_name} {self.last_name}>"
 
 class Notification(Base):
-    """Модель уведомления"""
+    """
+    Модель уведомления.
+    Таблица секционирована по диапазонам created_at (по месяцам), поэтому
+    created_at входит в первичный ключ. Секции создаются заранее и удаляются
+    целиком по истечении срока хранения (см. database/partitions.py).
+    """
     __tablename__ = "notifications"
 
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     type = Column(Enum(NotificationType), nullable=False)
     title = Column(String(200), nullable=False)
     content = Column(Text, nullable=False)
     is_sent = Column(Boolean, default=False)
     sent_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, primary_key=True, default=func.now(), server_default=func.now())
     scheduled_for = Column(DateTime, nullable=True)
-    metadata_json = Column(Text, nullable=True)  # JSON строка с дополнительными данными (переименовано с metadata)
+    expires_at = Column(DateTime, nullable=True)  # После этого времени уведомление не отправляется
+    metadata_json = Column(JSONB, nullable=True)  # Дополнительные данные (переименовано с metadata)
+    cancelled_at = Column(DateTime, nullable=True)  # Время отмены неотправленного уведомления
+    cancel_reason = Column(String(30), nullable=True)  # Причина отмены (значение CancelReason)
 
     # Отношения
     user = relationship("User", back_populates="notifications")
 
+    __table_args__ = (
+        # Очередь неотправленных и неотмененных уведомлений в порядке постраничного обхода
+        Index(
+            "ix_notifications_pending_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_sent = false AND cancelled_at IS NULL")
+        ),
+        # Поиск просроченных уведомлений в очереди
+        Index(
+            "ix_notifications_pending_expires_at",
+            "expires_at",
+            postgresql_where=text("is_sent = false AND cancelled_at IS NULL")
+        ),
+        # Индексы по часто используемым ключам метаданных среди уведомлений в очереди
+        Index(
+            "ix_notifications_pending_match_id",
+            text("(metadata_json ->> 'match_id')"),
+            postgresql_where=text("is_sent = false AND cancelled_at IS NULL")
+        ),
+        Index(
+            "ix_notifications_pending_championship_id",
+            text("(metadata_json ->> 'championship_id')"),
+            postgresql_where=text("is_sent = false AND cancelled_at IS NULL")
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    def __repr__(self):
+        return f"<Notification {self.id}: {self.title}>"
+
+class ApiOutbox(Base):
+    """
+    Модель отложенного вызова API основного приложения.
+    Обработчик кнопки записывает намерение пользователя и сразу отвечает,
+    а фоновый обработчик вызывает API с повторными попытками.
+    """
+    __tablename__ = "api_outbox"
+
+    id = Column(Integer, primary_key=True)
+    action = Column(String(40), nullable=False)  # Значение OutboxAction
+    payload = Column(JSONB, nullable=False)  # Аргументы вызова API
+    dedup_key = Column(String(60), nullable=True)  # Ключ объекта действия, не более одной ожидающей записи
+    chat_id = Column(String(20), nullable=False)  # Чат для сообщения о результате
+    message_id = Column(Integer, nullable=True)  # Сообщение с кнопками, которое нужно отредактировать
+    message_text = Column(Text, nullable=True)  # Исходный текст этого сообщения
+    status = Column(String(20), nullable=False, default=OutboxStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=func.now())
+    last_error = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)  # Ответ API
+    created_at = Column(DateTime, default=func.now())
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Очередь вызовов, ожидающих обработки
+        Index(
+            "ix_api_outbox_pending_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+        # Повторное нажатие не создает второй ожидающий вызов для того же объекта
+        Index(
+            "ux_api_outbox_pending_dedup_key",
+            "dedup_key",
+            unique=True,
+            postgresql_where=text("status = 'pending'")
+        ),
+    )
+
     def __repr__(self):
-        return f"<Notification {self.id}: {self.title}>"
\ No newline at end of file
+        return f"<ApiOutbox {self.id}: {self.action} ({self.status})>"
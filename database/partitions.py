@@ -0,0 +1,337 @@
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy import column, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from database.connection import engine
+from database.models import Notification
+from database.archive import notification_archive
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "notifications"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_NAME_REGEX = re.compile(r"^notifications_(\d{4})(\d{2})$")
+
+# Количество строк, читаемых за раз при архивировании секции
+ARCHIVE_FETCH_SIZE = 5000
+
+
+def month_start(value: datetime) -> datetime:
+    """
+    Начало месяца, к которому относится дата
+
+    Args:
+        value: Дата
+
+    Returns:
+        Первое число месяца, 00:00
+    """
+    return datetime(value.year, value.month, 1)
+
+
+def next_month(value: datetime) -> datetime:
+    """
+    Начало следующего месяца
+
+    Args:
+        value: Начало месяца
+
+    Returns:
+        Первое число следующего месяца, 00:00
+    """
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def partition_name(start: datetime) -> str:
+    """
+    Имя секции таблицы уведомлений для месяца
+
+    Args:
+        start: Начало месяца
+
+    Returns:
+        Имя секции вида notifications_YYYYMM
+    """
+    return f"{PARENT_TABLE}_{start.year:04d}{start.month:02d}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """
+    Проверка, является ли таблица уведомлений секционированной
+
+    Args:
+        connection: Соединение с базой данных
+
+    Returns:
+        True, если таблица секционирована
+    """
+    return bool(connection.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = :table
+        )
+    """), {"table": PARENT_TABLE}).scalar())
+
+
+def list_partitions(connection: Connection) -> List[datetime]:
+    """
+    Получение списка месячных секций таблицы уведомлений
+
+    Args:
+        connection: Соединение с базой данных
+
+    Returns:
+        Отсортированный список начал месяцев существующих секций
+    """
+    rows = connection.execute(text("""
+        SELECT child.relname FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = :table
+    """), {"table": PARENT_TABLE})
+
+    starts = []
+    for (name,) in rows:
+        match = PARTITION_NAME_REGEX.match(name)
+        if match:
+            starts.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(starts)
+
+
+def create_default_partition(connection: Connection):
+    """
+    Создание секции по умолчанию для строк, не попадающих ни в одну месячную секцию
+
+    Args:
+        connection: Соединение с базой данных
+    """
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+
+def create_partitions(connection: Connection, start: datetime, end: datetime) -> int:
+    """
+    Создание месячных секций, покрывающих диапазон дат.
+    Строки месяца, уже попавшие в секцию по умолчанию, переносятся в новую секцию.
+
+    Args:
+        connection: Соединение с базой данных
+        start: Начало диапазона
+        end: Конец диапазона (включительно)
+
+    Returns:
+        Количество созданных секций
+    """
+    existing = set(list_partitions(connection))
+    created = 0
+    current = month_start(start)
+    while current <= end:
+        if current not in existing:
+            bounds = {"start": current, "end": next_month(current)}
+            # Новая секция не может быть создана, пока строки ее месяца лежат в секции по умолчанию
+            connection.execute(text(f"""
+                CREATE TEMPORARY TABLE {PARENT_TABLE}_moved ON COMMIT DROP AS
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end RETURNING *
+                )
+                SELECT * FROM moved
+            """), bounds)
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(current)} PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{current.isoformat()}') TO ('{next_month(current).isoformat()}')"
+            ))
+            connection.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {PARENT_TABLE}_moved"))
+            connection.execute(text(f"DROP TABLE {PARENT_TABLE}_moved"))
+            created += 1
+        current = next_month(current)
+    return created
+
+
+def ensure_partitions(months_ahead: int = 2) -> int:
+    """
+    Создание секций таблицы уведомлений на текущий и следующие месяцы
+
+    Args:
+        months_ahead: На сколько месяцев вперед создавать секции
+
+    Returns:
+        Количество созданных секций
+    """
+    try:
+        with engine.begin() as connection:
+            if not is_partitioned(connection):
+                return 0
+            create_default_partition(connection)
+            now = datetime.now()
+            end = now + timedelta(days=31 * months_ahead)
+            created = create_partitions(connection, now, end)
+            if created:
+                logger.info(f"Создано {created} секций таблицы уведомлений")
+            return created
+    except SQLAlchemyError as e:
+        logger.error(f"Ошибка при создании секций таблицы уведомлений: {e}")
+        return 0
+
+
+def archive_partition(name: str) -> int:
+    """
+    Потоковая запись строк секции в архив через серверный курсор
+
+    Args:
+        name: Имя секции
+
+    Returns:
+        Количество записанных строк
+    """
+    partition = table(name, *(column(c.name, c.type) for c in Notification.__table__.columns))
+    written = 0
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=ARCHIVE_FETCH_SIZE).execute(
+            select(partition)
+        )
+        for rows in result.mappings().partitions():
+            written += notification_archive.write(rows)
+    return written
+
+
+def has_retained_rows(connection: Connection, name: str, cutoff: datetime) -> bool:
+    """
+    Проверка, есть ли в секции строки, которые еще нельзя удалять:
+    неотправленные, запланированные и отправленные или отмененные позже срока хранения
+    (те же условия, что при удалении старых уведомлений порциями)
+
+    Args:
+        connection: Соединение с базой данных
+        name: Имя секции
+        cutoff: Граница срока хранения
+
+    Returns:
+        True, если такие строки есть
+    """
+    return bool(connection.execute(text(f"""
+        SELECT EXISTS (
+            SELECT 1 FROM {name}
+            WHERE NOT COALESCE((is_sent AND sent_at <= :cutoff) OR cancelled_at <= :cutoff, false)
+        )
+    """), {"cutoff": cutoff}).scalar())
+
+
+def drop_expired_partitions(days: int = 30) -> List[str]:
+    """
+    Отсоединение и удаление секций, все строки которых старше срока хранения.
+    Удаление секции целиком не требует сканирования строк и не оставляет
+    мертвых кортежей для VACUUM. Секция удаляется, только если все ее строки
+    отправлены или отменены раньше срока хранения; иначе она остается, и старые
+    строки из нее удаляет очистка порциями. Если архивирование включено, строки
+    секции предварительно записываются в архив; секция, которую не удалось
+    заархивировать, не удаляется.
+
+    Args:
+        days: Срок хранения уведомлений в днях
+
+    Returns:
+        Имена удаленных секций
+    """
+    cutoff = datetime.now() - timedelta(days=days)
+    dropped = []
+
+    try:
+        with engine.begin() as connection:
+            if not is_partitioned(connection):
+                return dropped
+            expired = [start for start in list_partitions(connection) if next_month(start) <= cutoff]
+
+        # Каждую секцию удаляем в отдельной транзакции, чтобы не держать блокировки дольше необходимого
+        for start in expired:
+            name = partition_name(start)
+            with engine.connect() as connection:
+                retained = has_retained_rows(connection, name, cutoff)
+            if retained:
+                logger.info(f"Секция {name} содержит неотправленные или недавние уведомления и не удаляется")
+                continue
+            if notification_archive:
+                archived = archive_partition(name)
+                logger.info(f"Секция {name}: в архив записано {archived} строк")
+            with engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                # Повторная проверка под блокировкой: строки могли измениться после архивирования
+                if has_retained_rows(connection, name, cutoff):
+                    connection.rollback()
+                    logger.info(f"Секция {name} изменилась во время архивирования и не удаляется")
+                    continue
+                connection.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+            logger.info(f"Удалена секция {name} таблицы уведомлений")
+    except (SQLAlchemyError, OSError) as e:
+        logger.error(f"Ошибка при удалении устаревших секций таблицы уведомлений: {e}")
+
+    return dropped
+
+
+def convert_to_partitioned(months_ahead: int = 2):
+    """
+    Перевод существующей несекционированной таблицы уведомлений в секционированную.
+    Таблица переименовывается, создается секционированная таблица с секциями,
+    покрывающими все существующие данные, и секцией по умолчанию для строк вне их диапазона,
+    строки копируются, старая таблица удаляется.
+    Выполняется в одной транзакции; если таблица уже секционирована, ничего не делает.
+
+    Args:
+        months_ahead: На сколько месяцев вперед создавать секции
+
+    Raises:
+        SQLAlchemyError: Если перевод не удался
+    """
+    with engine.begin() as connection:
+        if is_partitioned(connection):
+            return
+
+        logger.info("Перевод таблицы уведомлений в секционированную")
+
+        # Переименовываем старую таблицу и ее индексы, чтобы освободить имена
+        connection.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {PARENT_TABLE}_legacy"))
+        connection.execute(text(f"""
+            DO $$
+            DECLARE index_name TEXT;
+            BEGIN
+                FOR index_name IN
+                    SELECT indexname FROM pg_indexes WHERE tablename = '{PARENT_TABLE}_legacy'
+                LOOP
+                    EXECUTE format('ALTER INDEX %I RENAME TO %I', index_name, index_name || '_legacy');
+                END LOOP;
+            END $$;
+        """))
+
+        # Типы перечислений (notificationtype) уже существуют и используются повторно
+        Notification.__table__.create(connection, checkfirst=True)
+
+        oldest = connection.execute(text(
+            f"SELECT MIN(COALESCE(created_at, sent_at, now())) FROM {PARENT_TABLE}_legacy"
+        )).scalar() or datetime.now()
+        create_default_partition(connection)
+        create_partitions(connection, oldest, datetime.now() + timedelta(days=31 * months_ahead))
+
+        columns = ", ".join(column.name for column in Notification.__table__.columns)
+        source_columns = ", ".join(
+            "COALESCE(created_at, sent_at, now())" if column.name == "created_at" else column.name
+            for column in Notification.__table__.columns
+        )
+        copied = connection.execute(text(
+            f"INSERT INTO {PARENT_TABLE} ({columns}) SELECT {source_columns} FROM {PARENT_TABLE}_legacy"
+        )).rowcount
+
+        # Продолжаем нумерацию уведомлений с последнего идентификатора
+        connection.execute(text(f"""
+            SELECT setval(
+                pg_get_serial_sequence('{PARENT_TABLE}', 'id'),
+                COALESCE((SELECT MAX(id) FROM {PARENT_TABLE}), 0) + 1,
+                false
+            )
+        """))
+        connection.execute(text(f"DROP TABLE {PARENT_TABLE}_legacy"))
+
+        logger.info(f"Таблица уведомлений секционирована, перенесено {copied} строк")
@@ -0,0 +1,119 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from database.models import NotificationType
+
+
+class PendingNotification:
+    """
+    Компактная запись неотправленного уведомления для рассылки.
+    Содержит только поля, необходимые для отправки, и не привязана к сессии.
+    """
+
+    __slots__ = ("id", "user_id", "telegram_id", "type", "content", "metadata", "created_at")
+
+    def __init__(
+            self,
+            id: int,
+            user_id: int,
+            telegram_id: str,
+            type: NotificationType,
+            content: str,
+            metadata: Optional[Dict[str, Any]],
+            created_at: datetime
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.telegram_id = telegram_id
+        self.type = type
+        self.content = content
+        self.metadata = metadata or {}
+        self.created_at = created_at
+
+    def __repr__(self):
+        return f"<PendingNotification {self.id}: {self.type.value} -> {self.telegram_id}>"
+
+
+class PurgeProgress:
+    """
+    Ход очистки старых уведомлений
+    """
+
+    __slots__ = ("cutoff", "started_at", "finished_at", "chunks", "deleted")
+
+    def __init__(self):
+        self.cutoff = None
+        self.started_at = None
+        self.finished_at = None
+        self.chunks = 0
+        self.deleted = 0
+
+    @property
+    def running(self) -> bool:
+        """
+        Выполняется ли очистка в данный момент
+        """
+        return self.started_at is not None and self.finished_at is None
+
+    def start(self, cutoff: datetime):
+        """
+        Начало очистки
+
+        Args:
+            cutoff: Граница, старше которой уведомления удаляются
+        """
+        self.cutoff = cutoff
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self.chunks = 0
+        self.deleted = 0
+
+    def add_chunk(self, deleted: int):
+        """
+        Учет удаленной порции
+
+        Args:
+            deleted: Количество удаленных строк
+        """
+        self.chunks += 1
+        self.deleted += deleted
+
+    def finish(self):
+        """
+        Завершение очистки
+        """
+        self.finished_at = datetime.now()
+
+    def __repr__(self):
+        return f"<PurgeProgress {self.deleted} rows in {self.chunks} chunks, running={self.running}>"
+
+
+class OutboxRecord:
+    """
+    Запись отложенного вызова API, выбранная для обработки
+    """
+
+    __slots__ = ("id", "action", "payload", "dedup_key", "chat_id", "message_id", "message_text", "attempts")
+
+    def __init__(
+            self,
+            id: int,
+            action: str,
+            payload: Dict[str, Any],
+            dedup_key: Optional[str],
+            chat_id: str,
+            message_id: Optional[int],
+            message_text: Optional[str],
+            attempts: int
+    ):
+        self.id = id
+        self.action = action
+        self.payload = payload or {}
+        self.dedup_key = dedup_key
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.message_text = message_text
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"<OutboxRecord {self.id}: {self.action}, attempt {self.attempts}>"
@@ -1,21 +1,214 @@
 import logging
-import json
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+import time
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, timedelta
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select, tuple_, delete, exists, func, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
 
+from config.config import PURGE_CHUNK_SIZE, PURGE_CHUNK_PAUSE
 from database.connection import get_db_session
-from database.models import Notification, NotificationType, User
+from database.models import Notification, NotificationType, CancelReason, User
+from database.records import PendingNotification, PurgeProgress
+from database.archive import notification_archive
+from api.models import Match, Team
 
 logger = logging.getLogger(__name__)
 
+# Ход последней (или текущей) очистки старых уведомлений
+purge_progress = PurgeProgress()
+
+# Правила замены неотправленных уведомлений: при создании уведомления типа-ключа
+# отменяются ожидающие уведомления перечисленных типов с тем же значением ключа
+# метаданных. per_user ограничивает отмену уведомлениями того же пользователя.
+# Правила применяются при создании уведомления ботом и перед каждой выборкой очереди
+# (для уведомлений, которые платформа добавляет в таблицу напрямую).
+SUPERSEDE_RULES = {
+    NotificationType.MATCH_RESCHEDULE: {
+        "key": "match_id",
+        "types": (NotificationType.MATCH_RESCHEDULE, NotificationType.MATCH_REMINDER),
+        "per_user": True,
+        "reason": CancelReason.SUPERSEDED
+    },
+    NotificationType.MATCH_REMINDER: {
+        "key": "match_id",
+        "types": (NotificationType.MATCH_REMINDER,),
+        "per_user": True,
+        "reason": CancelReason.SUPERSEDED
+    },
+    NotificationType.CHAMPIONSHIP_CANCEL: {
+        "key": "championship_id",
+        "types": (NotificationType.MATCH_REMINDER, NotificationType.NEW_MATCH, NotificationType.MATCH_RESCHEDULE),
+        "per_user": False,
+        "reason": CancelReason.CHAMPIONSHIP_CANCELLED
+    },
+}
+
+
+# Срок актуальности уведомлений по умолчанию, отсчитываемый от момента создания.
+# Для уведомлений о матчах с известным временем начала используется начало матча.
+NOTIFICATION_TTL = {
+    NotificationType.MATCH_REMINDER: timedelta(days=1),
+    NotificationType.NEW_CHAMPIONSHIP: timedelta(days=7),
+}
+
+# Поля метаданных с датой и временем начала матча по типам уведомлений
+MATCH_START_FIELDS = {
+    NotificationType.NEW_MATCH: ("match_date", "match_time"),
+    NotificationType.MATCH_REMINDER: ("match_date", "match_time"),
+    NotificationType.MATCH_RESCHEDULE: ("new_date", "new_time"),
+}
+
+# Типы уведомлений, для которых срок актуальности вычисляется по умолчанию
+DEFAULT_EXPIRY_TYPES = tuple(NOTIFICATION_TTL.keys() | MATCH_START_FIELDS.keys())
+
+# Отметка "срок актуальности не определен": записывается вместо NULL, когда срок
+# по умолчанию вычислить не удалось, чтобы уведомление проверялось только один раз
+NO_EXPIRY = datetime(9999, 12, 31)
+
+
+def parse_match_start(match_date: Any, match_time: Any) -> Optional[datetime]:
+    """
+    Разбор даты и времени начала матча из метаданных
+
+    Args:
+        match_date: Дата в ISO формате (YYYY-MM-DD, допускается полная дата со временем)
+        match_time: Время (HH:MM или HH:MM:SS, опционально)
+
+    Returns:
+        Время начала матча или None, если дату не удалось разобрать
+    """
+    if not match_date:
+        return None
+    try:
+        start = datetime.fromisoformat(str(match_date).split("T")[0])
+        if match_time:
+            parts = [int(part) for part in str(match_time).split(":")[:2]]
+            start = start.replace(hour=parts[0], minute=parts[1] if len(parts) > 1 else 0)
+        return start
+    except (ValueError, IndexError):
+        return None
+
+
+def default_expires_at(
+        notification_type: NotificationType,
+        metadata: Optional[Dict[str, Any]],
+        now: datetime = None
+) -> Optional[datetime]:
+    """
+    Срок актуальности уведомления по умолчанию.
+    Уведомления о матчах теряют актуальность с началом матча; если время
+    начала неизвестно, используется NOTIFICATION_TTL.
+
+    Args:
+        notification_type: Тип уведомления
+        metadata: Метаданные уведомления
+        now: Время создания уведомления (по умолчанию текущее)
+
+    Returns:
+        Время, после которого уведомление не отправляется, или None
+    """
+    fields = MATCH_START_FIELDS.get(notification_type)
+    if fields and metadata:
+        match_start = parse_match_start(metadata.get(fields[0]), metadata.get(fields[1]))
+        if match_start:
+            return match_start
+
+    ttl = NOTIFICATION_TTL.get(notification_type)
+    if ttl:
+        return (now or datetime.now()) + ttl
+    return None
+
+
+def pending_to_send(statement: Select, after: Tuple[datetime, int] = None) -> Select:
+    """
+    Условия выборки очереди: уведомления, которые еще не отправлены и не отменены,
+    не запланированы на будущее и не просрочены, у активных пользователей
+    с привязанным Telegram ID. Общие для выборки страницы и подсчета глубины очереди.
+
+    Args:
+        statement: Запрос с выбираемыми колонками
+        after: Курсор (created_at, id) последней выбранной записи (опционально)
+
+    Returns:
+        Запрос с JOIN пользователей и условиями очереди
+    """
+    now = datetime.now()
+    statement = statement.join(User, User.id == Notification.user_id).where(
+        and_(
+            Notification.is_sent == False,
+            Notification.cancelled_at.is_(None),
+            User.telegram_id.isnot(None),
+            User.is_active == True,
+            or_(
+                Notification.scheduled_for.is_(None),
+                Notification.scheduled_for <= now
+            ),
+            or_(
+                Notification.expires_at.is_(None),
+                Notification.expires_at > now
+            )
+        )
+    )
+    if after is not None:
+        statement = statement.where(tuple_(Notification.created_at, Notification.id) > tuple_(*after))
+    return statement
+
 
 class NotificationRepository:
     """
     Репозиторий для работы с уведомлениями
     """
 
+    @staticmethod
+    def supersede_pending(
+            session,
+            user_id: int,
+            notification_type: NotificationType,
+            metadata: Optional[Dict[str, Any]]
+    ) -> int:
+        """
+        Отмена ожидающих уведомлений, которые потеряли актуальность
+        из-за создаваемого уведомления (см. SUPERSEDE_RULES).
+        Выполняется в транзакции создания нового уведомления.
+
+        Args:
+            session: Сессия базы данных
+            user_id: ID пользователя создаваемого уведомления
+            notification_type: Тип создаваемого уведомления
+            metadata: Метаданные создаваемого уведомления
+
+        Returns:
+            Количество отмененных уведомлений
+        """
+        rule = SUPERSEDE_RULES.get(notification_type)
+        if not rule or not metadata or metadata.get(rule["key"]) is None:
+            return 0
+
+        conditions = [
+            Notification.is_sent == False,
+            Notification.cancelled_at.is_(None),
+            Notification.type.in_(rule["types"]),
+            Notification.metadata_json[rule["key"]].astext == str(metadata[rule["key"]])
+        ]
+        if rule["per_user"]:
+            conditions.append(Notification.user_id == user_id)
+
+        cancelled = session.execute(
+            update(Notification)
+            .where(and_(*conditions))
+            .values(cancelled_at=datetime.now(), cancel_reason=rule["reason"].value)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        if cancelled:
+            logger.info(
+                f"Отменено {cancelled} неактуальных уведомлений "
+                f"({rule['key']}={metadata[rule['key']]}, причина: {rule['reason'].value})"
+            )
+        return cancelled
+
     @staticmethod
     def create(
             user_id: int,
@@ -23,10 +216,13 @@ class NotificationRepository:
             title: str,
             content: str,
             metadata: Dict[str, Any] = None,
-            scheduled_for: datetime = None
+            scheduled_for: datetime = None,
+            expires_at: datetime = None
     ) -> Optional[Notification]:
         """
-        Создание нового уведомления
+        Создание нового уведомления.
+        В той же транзакции отменяются ожидающие уведомления, которые
+        новое уведомление делает неактуальными (см. SUPERSEDE_RULES).
 
         Args:
             user_id: ID пользователя
@@ -35,21 +231,24 @@ class NotificationRepository:
             content: Содержание уведомления
             metadata: Дополнительные данные (опционально)
             scheduled_for: Время запланированной отправки (опционально)
+            expires_at: Время, после которого уведомление не отправляется
+                (опционально, по умолчанию см. default_expires_at)
 
         Returns:
             Объект созданного уведомления или None в случае ошибки
         """
         try:
             with get_db_session() as session:
-                metadata_json = json.dumps(metadata) if metadata else None
+                NotificationRepository.supersede_pending(session, user_id, notification_type, metadata)
 
                 notification = Notification(
                     user_id=user_id,
                     type=notification_type,
                     title=title,
                     content=content,
-                    metadata_json=metadata_json,  # Изменено с metadata на metadata_json
-                    scheduled_for=scheduled_for
+                    metadata_json=metadata or None,  # JSONB, словарь передается без сериализации
+                    scheduled_for=scheduled_for,
+                    expires_at=expires_at or default_expires_at(notification_type, metadata)
                 )
                 session.add(notification)
                 session.flush()
@@ -59,36 +258,155 @@ class NotificationRepository:
             return None
 
     @staticmethod
-    def get_pending_notifications(limit: int = 100) -> List[Notification]:
+    def get_pending_notifications(
+            limit: int = 100,
+            after: Tuple[datetime, int] = None
+    ) -> List[PendingNotification]:
         """
-        Получение списка неотправленных уведомлений, которые нужно отправить
+        Получение страницы неотправленных уведомлений, которые нужно отправить.
+        Выбираются только нужные для отправки колонки одним запросом с JOIN,
+        без загрузки ORM-объектов. Страницы упорядочены по (created_at, id),
+        следующая страница запрашивается по курсору последней записи.
 
         Args:
             limit: Максимальное количество уведомлений
+            after: Курсор (created_at, id) последней записи предыдущей страницы (опционально)
+
+        Returns:
+            Список записей уведомлений
+        """
+        try:
+            with get_db_session() as session:
+                statement = pending_to_send(
+                    select(
+                        Notification.id,
+                        Notification.user_id,
+                        User.telegram_id,
+                        Notification.type,
+                        Notification.content,
+                        Notification.metadata_json,
+                        Notification.created_at
+                    ),
+                    after
+                ).order_by(Notification.created_at, Notification.id).limit(limit)
+
+                return [PendingNotification(*row) for row in session.execute(statement)]
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при получении неотправленных уведомлений: {e}")
+            return []
+
+    @staticmethod
+    def count_pending(after: Tuple[datetime, int] = None, limit: int = 1000) -> int:
+        """
+        Оценка глубины очереди: количество уведомлений, ожидающих отправки после курсора.
+        Учитываются те же условия, что при выборке очереди (см. pending_to_send).
+        Подсчет ограничен limit строками, чтобы не обходить всю очередь.
+
+        Args:
+            after: Курсор (created_at, id) последней выбранной записи (опционально)
+            limit: Максимальное значение результата
 
         Returns:
-            Список уведомлений
+            Количество уведомлений (не больше limit)
+        """
+        try:
+            with get_db_session() as session:
+                statement = pending_to_send(select(Notification.id), after).limit(limit)
+                return session.execute(select(func.count()).select_from(statement.subquery())).scalar()
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при подсчете неотправленных уведомлений: {e}")
+            return 0
+
+    @staticmethod
+    def supersede_queued() -> int:
+        """
+        Отмена ожидающих уведомлений, для которых в таблице есть более новое
+        уведомление, делающее их неактуальными (см. SUPERSEDE_RULES).
+        Выполняется перед выборкой очереди одним запросом на правило.
+
+        Returns:
+            Количество отмененных уведомлений
         """
         try:
             with get_db_session() as session:
                 now = datetime.now()
+                cancelled = 0
+                for notification_type, rule in SUPERSEDE_RULES.items():
+                    newer = aliased(Notification)
+                    conditions = [
+                        newer.type == notification_type,
+                        newer.metadata_json[rule["key"]].astext == Notification.metadata_json[rule["key"]].astext,
+                        tuple_(newer.created_at, newer.id) > tuple_(Notification.created_at, Notification.id)
+                    ]
+                    if rule["per_user"]:
+                        conditions.append(newer.user_id == Notification.user_id)
+
+                    cancelled += session.execute(
+                        update(Notification)
+                        .where(
+                            and_(
+                                Notification.is_sent == False,
+                                Notification.cancelled_at.is_(None),
+                                Notification.type.in_(rule["types"]),
+                                exists().where(and_(*conditions))
+                            )
+                        )
+                        .values(cancelled_at=now, cancel_reason=rule["reason"].value)
+                        .execution_options(synchronize_session=False)
+                    ).rowcount
+                return cancelled
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при отмене неактуальных уведомлений в очереди: {e}")
+            return 0
 
-                # Получаем уведомления, которые еще не отправлены и либо не запланированы,
-                # либо время отправки уже наступило
-                return session.query(Notification).join(User).filter(
-                    and_(
-                        Notification.is_sent == False,
-                        User.telegram_id.isnot(None),
-                        User.is_active == True,
-                        or_(
-                            Notification.scheduled_for.is_(None),
-                            Notification.scheduled_for <= now
+    @staticmethod
+    def close_expired_notifications() -> int:
+        """
+        Закрытие просроченных уведомлений в очереди одним запросом.
+        Уведомления помечаются отмененными с причиной "expired" и больше не выбираются для отправки.
+        Уведомлениям без срока актуальности (добавленным платформой напрямую) срок
+        предварительно вычисляется по default_expires_at от времени создания;
+        если вычислить его нельзя, записывается NO_EXPIRY, и уведомление больше не проверяется.
+
+        Returns:
+            Количество закрытых уведомлений
+        """
+        try:
+            with get_db_session() as session:
+                now = datetime.now()
+                pending = and_(Notification.is_sent == False, Notification.cancelled_at.is_(None))
+
+                missing = session.execute(
+                    select(Notification.id, Notification.created_at, Notification.type, Notification.metadata_json)
+                    .where(
+                        and_(
+                            pending,
+                            Notification.expires_at.is_(None),
+                            Notification.type.in_(DEFAULT_EXPIRY_TYPES)
                         )
                     )
-                ).order_by(Notification.created_at).limit(limit).all()
+                ).all()
+                expiry = [
+                    {
+                        "id": notification_id,
+                        "created_at": created_at,
+                        "expires_at": default_expires_at(notification_type, metadata, created_at) or NO_EXPIRY
+                    }
+                    for notification_id, created_at, notification_type, metadata in missing
+                ]
+                if expiry:
+                    # Обновление по первичному ключу (id, created_at) одним пакетом
+                    session.execute(update(Notification), expiry)
+
+                return session.execute(
+                    update(Notification)
+                    .where(and_(pending, Notification.expires_at <= now))
+                    .values(cancelled_at=now, cancel_reason=CancelReason.EXPIRED.value)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при получении неотправленных уведомлений: {e}")
-            return []
+            logger.error(f"Ошибка при закрытии просроченных уведомлений: {e}")
+            return 0
 
     @staticmethod
     def mark_as_sent(notification_id: int) -> bool:
@@ -114,125 +432,183 @@ class NotificationRepository:
             return False
 
     @staticmethod
-    def delete_old_sent_notifications(days: int = 30) -> int:
+    def mark_many_as_sent(notification_ids: List[int]) -> int:
         """
-        Удаление старых отправленных уведомлений
+        Пометить уведомления как отправленные одним запросом
 
         Args:
-            days: Количество дней, после которых уведомления считаются устаревшими
+            notification_ids: ID уведомлений
 
         Returns:
-            Количество удаленных уведомлений
+            Количество обновленных уведомлений
         """
+        if not notification_ids:
+            return 0
         try:
             with get_db_session() as session:
-                from datetime import timedelta
-                cutoff_date = datetime.now() - timedelta(days=days)
-
-                # Получаем количество уведомлений для удаления
-                count = session.query(Notification).filter(
-                    and_(
-                        Notification.is_sent == True,
-                        Notification.sent_at <= cutoff_date
-                    )
-                ).count()
+                return session.execute(
+                    update(Notification)
+                    .where(Notification.id.in_(notification_ids))
+                    .values(is_sent=True, sent_at=datetime.now())
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при обновлении статуса {len(notification_ids)} уведомлений: {e}")
+            return 0
 
-                # Удаляем уведомления
-                session.query(Notification).filter(
-                    and_(
-                        Notification.is_sent == True,
-                        Notification.sent_at <= cutoff_date
-                    )
-                ).delete(synchronize_session=False)
+    @staticmethod
+    def delete_old_sent_notifications(
+            days: int = 30,
+            chunk_size: int = PURGE_CHUNK_SIZE,
+            pause: float = PURGE_CHUNK_PAUSE
+    ) -> int:
+        """
+        Удаление старых отправленных и отмененных уведомлений порциями.
+        Каждая порция удаляется в отдельной короткой транзакции запросом
+        DELETE ... WHERE id IN (SELECT ... LIMIT N) RETURNING, между порциями делается пауза,
+        чтобы не мешать рассылке. Удаленные строки записываются в архив до фиксации
+        транзакции: если запись в архив не удалась, порция не удаляется.
+        Прерванная очистка продолжается с того же места при следующем запуске.
+        Ход очистки доступен в purge_progress.
 
-                return count
-        except SQLAlchemyError as e:
+        Args:
+            days: Количество дней, после которых уведомления считаются устаревшими
+            chunk_size: Количество строк в одной порции
+            pause: Пауза между порциями (в секундах)
+
+        Returns:
+            Количество удаленных уведомлений
+        """
+        cutoff_date = datetime.now() - timedelta(days=days)
+        purge_progress.start(cutoff_date)
+
+        try:
+            while True:
+                with get_db_session() as session:
+                    chunk = select(Notification.id).where(
+                        and_(
+                            or_(
+                                and_(Notification.is_sent == True, Notification.sent_at <= cutoff_date),
+                                Notification.cancelled_at <= cutoff_date
+                            ),
+                            # Отправка и отмена не раньше создания: условие позволяет не сканировать новые секции
+                            Notification.created_at <= cutoff_date
+                        )
+                    ).limit(chunk_size).with_for_update(skip_locked=True)
+
+                    rows = session.execute(
+                        delete(Notification)
+                        .where(Notification.id.in_(chunk.scalar_subquery()))
+                        .where(Notification.created_at <= cutoff_date)
+                        .returning(*Notification.__table__.columns)
+                        .execution_options(synchronize_session=False)
+                    ).mappings().all()
+
+                    if notification_archive and rows:
+                        notification_archive.write(rows)
+                    deleted = len(rows)
+
+                purge_progress.add_chunk(deleted)
+                logger.debug(
+                    f"Удалена порция из {deleted} уведомлений, всего {purge_progress.deleted}"
+                )
+
+                if deleted < chunk_size:
+                    break
+                time.sleep(pause)
+        except (SQLAlchemyError, OSError) as e:
             logger.error(f"Ошибка при удалении старых уведомлений: {e}")
-            return 0
+        finally:
+            purge_progress.finish()
+
+        return purge_progress.deleted
 
     @staticmethod
-    def create_match_reminder_notifications() -> int:
+    def create_match_reminders(reminders: List[Tuple[Match, Team, Team]]) -> int:
         """
-        Создание напоминаний о матчах, которые будут через 24 часа
+        Создание напоминаний для участников обеих команд пачки матчей одной транзакцией.
+        Получатели загружаются одним запросом на пачку, ранее созданные напоминания
+        о тех же матчах отменяются одним UPDATE, новые добавляются вместе.
+
+        Args:
+            reminders: Список кортежей (матч, первая команда, вторая команда)
 
         Returns:
             Количество созданных уведомлений
         """
-        try:
-            from api.client import ApiClient
-            import asyncio
-            from datetime import datetime, timedelta
-            import json
-
-            # Создаем клиент для взаимодействия с API
-            api_client = ApiClient()
-
-            # Получаем матчи на ближайшие 2 дня
-            # Запускаем асинхронный код в синхронном контексте
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            try:
-                # Получаем матчи на ближайшие 2 дня
-                matches = loop.run_until_complete(api_client.get_upcoming_matches(days=2))
-
-                # Фильтруем матчи, которые будут через 24 часа
-                tomorrow = datetime.now() + timedelta(days=1)
-                tomorrow_start = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 0, 0, 0)
-                tomorrow_end = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 23, 59, 59)
-
-                tomorrow_matches = []
-                for match in matches:
-                    # Предполагается, что в матче есть поле date_time в ISO формате
-                    if 'date_time' in match:
-                        match_date_time = datetime.fromisoformat(match['date_time'])
-                        if tomorrow_start <= match_date_time <= tomorrow_end:
-                            tomorrow_matches.append(match)
-
-                # Создаем уведомления для каждого участника матча
-                notifications_count = 0
+        member_ids = {
+            member.user_id
+            for _, team1, team2 in reminders
+            for member in team1.members + team2.members
+            if member.user_id is not None
+        }
+        if not member_ids:
+            return 0
 
-                with get_db_session() as session:
-                    for match in tomorrow_matches:
-                        # Получаем информацию о командах
-                        team1 = loop.run_until_complete(api_client.get_team_details(match['team1_id']))
-                        team2 = loop.run_until_complete(api_client.get_team_details(match['team2_id']))
-
-                        # Создаем уведомления для участников обеих команд
-                        for team, opponent in [(team1, team2), (team2, team1)]:
-                            for member in team.get('members', []):
-                                user = session.query(User).filter(User.id == member['user_id']).first()
-
-                                if user and user.is_active and user.telegram_id:
-                                    # Формируем метаданные для уведомления
-                                    metadata = {
-                                        'championship_name': match.get('tournament_name', ''),
-                                        'opponent_name': opponent.get('name', ''),
-                                        'match_date': match.get('date', '').split('T')[0] if 'date' in match else '',
-                                        'match_time': match.get('time', ''),
-                                        'venue': match.get('location_name', ''),
-                                        'address': match.get('location_address', '')
-                                    }
-
-                                    # Создаем уведомление
-                                    notification = Notification(
-                                        user_id=user.id,
-                                        type=NotificationType.MATCH_REMINDER,
-                                        title="Напоминание о матче",
-                                        content=f"Завтра у вашей команды матч в {match.get('time', '')}",
-                                        metadata_json=json.dumps(metadata)
-                                    )
-
-                                    session.add(notification)
-                                    notifications_count += 1
-
-                logger.info(f"Создано {notifications_count} напоминаний о матчах")
-                return notifications_count
-
-            finally:
-                # Закрываем event loop
-                loop.close()
-
-        except Exception as e:
-            logger.error(f"Ошибка при создании напоминаний о матчах: {e}")
+        try:
+            with get_db_session() as session:
+                recipients = set(session.scalars(
+                    select(User.id).where(
+                        User.id.in_(member_ids),
+                        User.is_active == True,
+                        User.telegram_id.isnot(None)
+                    )
+                ))
+
+                notifications = []
+                for match, team1, team2 in reminders:
+                    # Создаем уведомления для участников обеих команд
+                    for team, opponent in ((team1, team2), (team2, team1)):
+                        # Формируем метаданные для уведомления
+                        metadata = {
+                            'match_id': match.id,
+                            'championship_id': match.tournament_id,
+                            'championship_name': match.tournament_name or '',
+                            'opponent_name': opponent.name or '',
+                            'match_date': (match.date or '').split('T')[0],
+                            'match_time': match.time or '',
+                            'venue': match.location_name or '',
+                            'address': match.location_address or ''
+                        }
+                        expires_at = default_expires_at(NotificationType.MATCH_REMINDER, metadata)
+
+                        for member in team.members:
+                            if member.user_id not in recipients:
+                                continue
+                            notifications.append(Notification(
+                                user_id=member.user_id,
+                                type=NotificationType.MATCH_REMINDER,
+                                title="Напоминание о матче",
+                                content=f"Завтра у вашей команды матч в {match.time or ''}",
+                                metadata_json=metadata,
+                                expires_at=expires_at
+                            ))
+
+                if not notifications:
+                    return 0
+
+                # Ранее созданные напоминания о тех же матчах отменяем одним запросом на пачку
+                rule = SUPERSEDE_RULES[NotificationType.MATCH_REMINDER]
+                superseded = session.execute(
+                    update(Notification)
+                    .where(
+                        Notification.is_sent == False,
+                        Notification.cancelled_at.is_(None),
+                        Notification.type.in_(rule["types"]),
+                        tuple_(Notification.user_id, Notification.metadata_json[rule["key"]].astext).in_(list({
+                            (n.user_id, str(n.metadata_json[rule["key"]]))
+                            for n in notifications
+                            if n.metadata_json[rule["key"]] is not None
+                        }))
+                    )
+                    .values(cancelled_at=datetime.now(), cancel_reason=rule["reason"].value)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if superseded:
+                    logger.info(f"Отменено {superseded} напоминаний, замененных новыми")
+
+                session.add_all(notifications)
+                return len(notifications)
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при создании напоминаний о {len(reminders)} матчах: {e}")
             return 0
\ No newline at end of file
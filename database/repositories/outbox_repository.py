@@ -0,0 +1,237 @@
+import logging
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import and_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from database.connection import get_db_session
+from database.models import ApiOutbox, OutboxAction, OutboxStatus
+from database.records import OutboxRecord
+
+logger = logging.getLogger(__name__)
+
+
+def outbox_dedup_key(action: OutboxAction, payload: Dict[str, Any]) -> str:
+    """
+    Ключ объекта, над которым выполняется действие.
+    Принятие и отклонение одного приглашения имеют общий ключ,
+    поэтому одновременно может ожидать только одно решение.
+
+    Args:
+        action: Действие
+        payload: Аргументы вызова API
+
+    Returns:
+        Ключ действия
+    """
+    if action in (OutboxAction.ACCEPT_TEAM_INVITATION, OutboxAction.DECLINE_TEAM_INVITATION):
+        return f"team_invitation:{payload['invitation_id']}"
+    if action in (OutboxAction.ACCEPT_COMMITTEE_INVITATION, OutboxAction.DECLINE_COMMITTEE_INVITATION):
+        return f"committee_invitation:{payload['invitation_id']}"
+    return f"match_withdraw:{payload['match_id']}:{payload['team_id']}"
+
+
+class OutboxRepository:
+    """
+    Репозиторий для работы с отложенными вызовами API
+    """
+
+    @staticmethod
+    def enqueue(
+            action: OutboxAction,
+            payload: Dict[str, Any],
+            chat_id: str,
+            message_id: int = None,
+            message_text: str = None
+    ) -> Optional[int]:
+        """
+        Запись намерения пользователя для последующего вызова API.
+        Если по тому же объекту уже есть ожидающая запись, новая не создается.
+
+        Args:
+            action: Действие
+            payload: Аргументы вызова API
+            chat_id: Чат для сообщения о результате
+            message_id: Сообщение, которое нужно отредактировать по результату (опционально)
+            message_text: Исходный текст этого сообщения (опционально)
+
+        Returns:
+            ID новой или уже ожидающей записи, None в случае ошибки
+        """
+        dedup_key = outbox_dedup_key(action, payload)
+        try:
+            with get_db_session() as session:
+                entry_id = session.execute(
+                    insert(ApiOutbox)
+                    .values(
+                        action=action.value,
+                        payload=payload,
+                        dedup_key=dedup_key,
+                        chat_id=chat_id,
+                        message_id=message_id,
+                        message_text=message_text
+                    )
+                    .on_conflict_do_nothing(
+                        index_elements=[ApiOutbox.dedup_key],
+                        index_where=ApiOutbox.status == OutboxStatus.PENDING.value
+                    )
+                    .returning(ApiOutbox.id)
+                ).scalar()
+
+                if entry_id is None:
+                    # Решение по этому объекту уже ожидает обработки
+                    entry_id = session.execute(
+                        select(ApiOutbox.id).where(
+                            and_(
+                                ApiOutbox.dedup_key == dedup_key,
+                                ApiOutbox.status == OutboxStatus.PENDING.value
+                            )
+                        )
+                    ).scalar()
+                    logger.info(f"Действие {action.value} для {dedup_key} уже ожидает обработки (запись {entry_id})")
+
+                return entry_id
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при записи действия {action.value} в outbox: {e}")
+            return None
+
+    @staticmethod
+    def claim_due(limit: int = 50, lease_seconds: int = 60) -> List[OutboxRecord]:
+        """
+        Выбор записей, готовых к обработке.
+        Записи блокируются через FOR UPDATE SKIP LOCKED, а время следующей попытки
+        сдвигается на срок аренды: если обработчик упадет, запись будет обработана повторно.
+
+        Args:
+            limit: Максимальное количество записей
+            lease_seconds: Срок аренды записи (в секундах)
+
+        Returns:
+            Список записей
+        """
+        try:
+            with get_db_session() as session:
+                now = datetime.now()
+                rows = session.execute(
+                    select(
+                        ApiOutbox.id,
+                        ApiOutbox.action,
+                        ApiOutbox.payload,
+                        ApiOutbox.dedup_key,
+                        ApiOutbox.chat_id,
+                        ApiOutbox.message_id,
+                        ApiOutbox.message_text,
+                        ApiOutbox.attempts
+                    ).where(
+                        and_(
+                            ApiOutbox.status == OutboxStatus.PENDING.value,
+                            ApiOutbox.next_attempt_at <= now
+                        )
+                    ).order_by(ApiOutbox.id).limit(limit).with_for_update(skip_locked=True)
+                ).all()
+
+                if not rows:
+                    return []
+
+                session.execute(
+                    update(ApiOutbox)
+                    .where(ApiOutbox.id.in_([row.id for row in rows]))
+                    .values(
+                        attempts=ApiOutbox.attempts + 1,
+                        next_attempt_at=now + timedelta(seconds=lease_seconds)
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+
+                return [
+                    OutboxRecord(row.id, row.action, row.payload, row.dedup_key, row.chat_id,
+                                 row.message_id, row.message_text, row.attempts + 1)
+                    for row in rows
+                ]
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при выборе записей outbox: {e}")
+            return []
+
+    @staticmethod
+    def mark_done(entry_id: int, result: Dict[str, Any] = None) -> bool:
+        """
+        Пометить запись как успешно обработанную
+
+        Args:
+            entry_id: ID записи
+            result: Ответ API (опционально)
+
+        Returns:
+            True, если обновление успешно, иначе False
+        """
+        return OutboxRepository._update(
+            entry_id,
+            status=OutboxStatus.DONE.value,
+            result=result,
+            last_error=None,
+            processed_at=datetime.now()
+        )
+
+    @staticmethod
+    def mark_retry(entry_id: int, error: str, delay: float) -> bool:
+        """
+        Отложить повторную попытку обработки записи
+
+        Args:
+            entry_id: ID записи
+            error: Описание ошибки
+            delay: Задержка перед следующей попыткой (в секундах)
+
+        Returns:
+            True, если обновление успешно, иначе False
+        """
+        return OutboxRepository._update(
+            entry_id,
+            last_error=error,
+            next_attempt_at=datetime.now() + timedelta(seconds=delay)
+        )
+
+    @staticmethod
+    def mark_failed(entry_id: int, error: str) -> bool:
+        """
+        Пометить запись как окончательно не обработанную
+
+        Args:
+            entry_id: ID записи
+            error: Описание ошибки
+
+        Returns:
+            True, если обновление успешно, иначе False
+        """
+        return OutboxRepository._update(
+            entry_id,
+            status=OutboxStatus.FAILED.value,
+            last_error=error,
+            processed_at=datetime.now()
+        )
+
+    @staticmethod
+    def _update(entry_id: int, **values) -> bool:
+        """
+        Обновление полей записи
+
+        Args:
+            entry_id: ID записи
+            values: Новые значения полей
+
+        Returns:
+            True, если обновление успешно, иначе False
+        """
+        try:
+            with get_db_session() as session:
+                updated = session.execute(
+                    update(ApiOutbox)
+                    .where(ApiOutbox.id == entry_id)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                return updated > 0
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при обновлении записи outbox {entry_id}: {e}")
+            return False
@@ -1,13 +1,37 @@
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload
 
-from database.connection import get_db_session
+from database.connection import engine, get_db_session
 from database.models import User
+from utils.phone import normalize_phone
 
 logger = logging.getLogger(__name__)
 
+# Количество строк, которое серверный курсор передает за один раз
+RECIPIENTS_CHUNK_SIZE = 1000
+
+
+def _phone_filter(phone_number: str):
+    """
+    Условие поиска пользователя по номеру телефона: по индексу phone_e164,
+    а для номеров, которые не удалось нормализовать, — по исходной записи
+
+    Args:
+        phone_number: Номер телефона в произвольном формате
+
+    Returns:
+        Условие SQLAlchemy
+    """
+    normalized = normalize_phone(phone_number)
+    if normalized:
+        return User.phone_e164 == normalized
+    return User.phone_number == phone_number
+
 
 class UserRepository:
     """
@@ -45,7 +69,8 @@ class UserRepository:
     @staticmethod
     def get_by_phone(phone_number: str) -> Optional[Dict[str, Any]]:
         """
-        Получение пользователя по номеру телефона
+        Получение пользователя по номеру телефона.
+        Эквивалентные записи номера ("+7...", "7...", "8...") находят одного пользователя.
 
         Args:
             phone_number: Номер телефона пользователя
@@ -55,7 +80,7 @@ class UserRepository:
         """
         try:
             with get_db_session() as session:
-                user = session.query(User).filter(User.phone_number == phone_number).first()
+                user = session.query(User).filter(_phone_filter(phone_number)).first()
                 if user:
                     return {
                         "id": user.id,
@@ -121,7 +146,7 @@ class UserRepository:
                     session.flush()
 
                 # Теперь находим пользователя по номеру телефона и обновляем telegram_id
-                user = session.query(User).filter(User.phone_number == phone_number).first()
+                user = session.query(User).filter(_phone_filter(phone_number)).first()
                 if user:
                     user.telegram_id = telegram_id
                     return True
@@ -133,7 +158,9 @@ class UserRepository:
     @staticmethod
     def get_all_active_with_telegram() -> List[Dict[str, Any]]:
         """
-        Получение всех активных пользователей с привязанным Telegram ID
+        Получение всех активных пользователей с привязанным Telegram ID.
+        Загружает всех пользователей в память; для рассылок и синхронизации
+        используйте iter_active_with_telegram или iter_active_with_telegram_chunks.
 
         Returns:
             Список словарей с данными пользователей
@@ -161,6 +188,114 @@ class UserRepository:
             logger.error(f"Ошибка при получении активных пользователей с Telegram: {e}")
             return []
 
+    @staticmethod
+    def iter_active_with_telegram_chunks(chunk_size: int = RECIPIENTS_CHUNK_SIZE) -> Iterator[List[Row]]:
+        """
+        Потоковое получение активных пользователей с привязанным Telegram ID порциями.
+        Строки читаются через серверный курсор и не превращаются в объекты ORM,
+        поэтому потребление памяти не зависит от количества пользователей.
+        Соединение с базой занято, пока итератор не исчерпан или не закрыт.
+
+        Args:
+            chunk_size: Количество строк в порции
+
+        Returns:
+            Итератор порций строк (id, telegram_id, first_name, last_name), упорядоченных по id
+
+        Raises:
+            SQLAlchemyError: Если чтение прервалось ошибкой базы данных: вызывающий код
+                не должен принимать неполный список за полный
+        """
+        query = select(User.id, User.telegram_id, User.first_name, User.last_name).where(
+            User.is_active == True,
+            User.telegram_id.isnot(None)
+        ).order_by(User.id)
+
+        try:
+            with engine.connect() as connection:
+                result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+                for rows in result.partitions():
+                    yield rows
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при потоковом получении активных пользователей с Telegram: {e}")
+            raise
+
+    @staticmethod
+    def iter_active_with_telegram(chunk_size: int = RECIPIENTS_CHUNK_SIZE) -> Iterator[Row]:
+        """
+        Потоковое получение активных пользователей с привязанным Telegram ID по одному
+
+        Args:
+            chunk_size: Количество строк, читаемых из базы за один раз
+
+        Returns:
+            Итератор строк (id, telegram_id, first_name, last_name), упорядоченных по id
+
+        Raises:
+            SQLAlchemyError: Если чтение прервалось ошибкой базы данных
+        """
+        for rows in UserRepository.iter_active_with_telegram_chunks(chunk_size):
+            yield from rows
+
+    @staticmethod
+    def bulk_upsert(users: Iterable[Dict[str, Any]]) -> int:
+        """
+        Пакетная запись пользователей платформы одним запросом
+        INSERT ... ON CONFLICT (phone_e164) DO UPDATE.
+        Telegram ID не изменяется, строки без изменений не перезаписываются,
+        пользователи с нераспознанным номером пропускаются.
+
+        Args:
+            users: Пользователи из API (phone_number или phone, first_name, last_name, is_active)
+
+        Returns:
+            Количество переданных в запрос пользователей
+        """
+        rows = {}
+        for user in users:
+            phone_number = user.get("phone_number") or user.get("phone")
+            if not phone_number:
+                continue
+            phone_number = normalize_phone(phone_number)
+            if not phone_number:
+                continue
+            # В одном запросе ON CONFLICT не может обновить строку дважды
+            rows[phone_number] = {
+                "phone_number": phone_number,
+                "phone_e164": phone_number,
+                "first_name": (user.get("first_name") or "Пользователь")[:80],
+                "last_name": (user.get("last_name") or "")[:80],
+                "is_active": user.get("is_active") is not False
+            }
+
+        if not rows:
+            return 0
+
+        statement = insert(User).values(list(rows.values()))
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[User.phone_e164],
+            set_={
+                "first_name": excluded.first_name,
+                "last_name": excluded.last_name,
+                "is_active": excluded.is_active,
+                "updated_at": func.now()
+            },
+            where=or_(
+                User.first_name.is_distinct_from(excluded.first_name),
+                User.last_name.is_distinct_from(excluded.last_name),
+                User.is_active.is_distinct_from(excluded.is_active)
+            )
+        )
+
+        try:
+            with get_db_session() as session:
+                session.execute(statement)
+            return len(rows)
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при пакетной записи {len(rows)} пользователей: {e}")
+            return 0
+
     @staticmethod
     def create(phone_number: str, first_name: str, last_name: str, telegram_id: str = None) -> Optional[Dict[str, Any]]:
         """
@@ -187,6 +322,7 @@ class UserRepository:
 
                 user = User(
                     phone_number=phone_number,
+                    phone_e164=normalize_phone(phone_number),
                     first_name=first_name,
                     last_name=last_name,
                     telegram_id=telegram_id
@@ -0,0 +1,26 @@
+from utils.paging import slice_page
+
+
+def test_last_page_when_api_ignores_offset():
+    items = [{"id": 1}, {"id": 2}]
+    head = items[0]
+
+    first, has_next = slice_page(items, 0, 1)
+    assert first == [{"id": 1}] and has_next
+
+    # API вернул весь список из page_size + 1 элементов для offset=1
+    last, has_next = slice_page(items, 1, 1, head)
+    assert last == [{"id": 2}]
+    assert not has_next
+
+
+def test_long_list_is_sliced_without_head():
+    items = [{"id": i} for i in range(5)]
+    page, has_next = slice_page(items, 2, 2)
+    assert page == [{"id": 2}, {"id": 3}] and has_next
+
+
+def test_api_page_is_kept_when_offset_supported():
+    head = {"id": 1}
+    page, has_next = slice_page([{"id": 3}, {"id": 4}], 2, 2, head)
+    assert page == [{"id": 3}, {"id": 4}] and not has_next
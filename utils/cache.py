@@ -0,0 +1,83 @@
+"""
+Кэш в памяти процесса с ограничением размера и сроком жизни записей
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU-кэш, записи которого устаревают через заданное время.
+    При переполнении вытесняются давно не использованные записи.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Args:
+            maxsize: Максимальное количество записей
+            ttl: Срок жизни записи (в секундах)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Получение значения из кэша
+
+        Args:
+            key: Ключ
+            default: Значение, если записи нет или она устарела
+
+        Returns:
+            Значение из кэша или default
+        """
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Сохранение значения в кэше
+
+        Args:
+            key: Ключ
+            value: Значение
+            ttl: Срок жизни записи, если отличается от срока по умолчанию (опционально)
+        """
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        """
+        Удаление записи из кэша
+
+        Args:
+            key: Ключ
+        """
+        self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Очистка кэша
+        """
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,69 @@
+"""
+Реестр выполняющихся действий пользователей.
+
+Защищает от повторных нажатий на инлайн-кнопку: пока действие с тем же
+ключом не завершено, повторные нажатия отклоняются без обращения к API.
+Ключ автоматически освобождается по истечении срока, чтобы действие,
+обработчик которого упал, не оставалось заблокированным навсегда.
+"""
+import time
+from typing import Dict
+
+from config.config import INFLIGHT_TTL
+
+
+class InFlightRegistry:
+    """
+    Реестр ключей выполняющихся действий со сроком жизни
+    """
+
+    def __init__(self, ttl: float = INFLIGHT_TTL, max_size: int = 10000):
+        """
+        Args:
+            ttl: Срок, после которого ключ освобождается автоматически (в секундах)
+            max_size: Размер реестра, при достижении которого удаляются просроченные ключи
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._expires: Dict[str, float] = {}
+
+    def try_acquire(self, key: str) -> bool:
+        """
+        Захват ключа действия
+
+        Args:
+            key: Ключ действия
+
+        Returns:
+            True, если ключ захвачен, False, если действие уже выполняется
+        """
+        now = time.monotonic()
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at > now:
+            return False
+
+        if len(self._expires) >= self.max_size:
+            self._expires = {k: v for k, v in self._expires.items() if v > now}
+
+        self._expires[key] = now + self.ttl
+        return True
+
+    def release(self, key: str):
+        """
+        Освобождение ключа действия
+
+        Args:
+            key: Ключ действия
+        """
+        self._expires.pop(key, None)
+
+    def __contains__(self, key: str) -> bool:
+        expires_at = self._expires.get(key)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+# Действия пользователей, ожидающие вызова API
+inflight_actions = InFlightRegistry()
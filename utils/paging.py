@@ -0,0 +1,45 @@
+"""
+Выделение страницы из ответа API на постраничный запрос
+
+API может не поддерживать limit и offset и возвращать список целиком.
+Если список длиннее запрошенного, это видно сразу; если же элементов ровно
+столько, сколько запрошено, игнорирование offset распознается по тому,
+что ответ для ненулевого смещения начинается с первого элемента списка.
+"""
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+def offset_ignored(items: Sequence[Any], offset: int, page_size: int, head: Optional[Any] = None) -> bool:
+    """
+    Проверка, вернул ли API список целиком вместо запрошенной страницы
+
+    Args:
+        items: Элементы из ответа на запрос page_size + 1 элементов
+        offset: Смещение страницы
+        page_size: Размер страницы
+        head: Первый элемент списка (из ответа для нулевого смещения), если известен
+
+    Returns:
+        True, если страницу нужно вырезать из ответа
+    """
+    if len(items) > page_size + 1:
+        return True
+    return offset > 0 and head is not None and bool(items) and items[0] == head
+
+
+def slice_page(items: Sequence[Any], offset: int, page_size: int, head: Optional[Any] = None) -> Tuple[List[Any], bool]:
+    """
+    Страница из ответа на запрос page_size + 1 элементов
+
+    Args:
+        items: Элементы из ответа API
+        offset: Смещение страницы
+        page_size: Размер страницы
+        head: Первый элемент списка (из ответа для нулевого смещения), если известен
+
+    Returns:
+        Кортеж (элементы страницы, есть ли следующая страница)
+    """
+    if offset_ignored(items, offset, page_size, head):
+        items = items[offset:offset + page_size + 1]
+    return list(items[:page_size]), len(items) > page_size
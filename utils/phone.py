@@ -0,0 +1,57 @@
+"""
+Приведение номеров телефонов к формату E.164
+
+Пользователи вводят один и тот же номер по-разному: "+79991234567",
+"79991234567", "89991234567", "8 (999) 123-45-67". Все поиски по номеру
+выполняются по каноническому виду "+79991234567", поэтому эквивалентные
+номера всегда находят одну и ту же запись.
+"""
+import re
+from typing import Optional
+
+# Код страны по умолчанию для номеров без "+"
+DEFAULT_COUNTRY_CODE = "7"
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(phone_number: Optional[str]) -> Optional[str]:
+    """
+    Приведение номера телефона к формату E.164
+
+    Args:
+        phone_number: Номер телефона в произвольном формате
+
+    Returns:
+        Номер в формате E.164 ("+79991234567") или None, если номер не распознан
+    """
+    if not phone_number:
+        return None
+
+    phone_number = str(phone_number).strip()
+    digits = _NON_DIGITS.sub("", phone_number)
+
+    # Номер с "+" уже содержит код страны
+    if phone_number.startswith("+"):
+        return f"+{digits}" if 8 <= len(digits) <= 15 else None
+
+    # Российские номера: 7XXXXXXXXXX, 8XXXXXXXXXX или 10 цифр без кода страны
+    if len(digits) == 11 and digits[0] in "78":
+        return f"+{DEFAULT_COUNTRY_CODE}{digits[1:]}"
+    if len(digits) == 10 and digits[0] == "9":
+        return f"+{DEFAULT_COUNTRY_CODE}{digits}"
+    return None
+
+
+def phone_digits(phone_number: Optional[str]) -> Optional[str]:
+    """
+    Номер в формате E.164 без "+", для передачи в пути запроса к API
+
+    Args:
+        phone_number: Номер телефона в произвольном формате
+
+    Returns:
+        Цифры номера ("79991234567") или None, если номер не распознан
+    """
+    normalized = normalize_phone(phone_number)
+    return normalized[1:] if normalized else None
@@ -0,0 +1,37 @@
+"""
+Объединение одновременных одинаковых запросов
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Пока выполняется запрос с данным ключом, остальные вызовы с тем же ключом
+    не запускают новый запрос, а ожидают результат уже выполняющегося
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполнение запроса или присоединение к уже выполняющемуся
+
+        Args:
+            key: Ключ запроса
+            factory: Функция, создающая запрос
+
+        Returns:
+            Результат запроса
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        # Отмена одного из ожидающих не отменяет запрос для остальных
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._calls)